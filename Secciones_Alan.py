@@ -1,15 +1,21 @@
 import sys
-import psycopg2
 from PyQt6.QtWidgets import (QApplication, QWidget, QVBoxLayout, QHBoxLayout, QTabWidget,
-                             QLabel, QLineEdit, QComboBox, QPushButton, QTableWidget,
-                             QTableWidgetItem, QMessageBox, QFormLayout, QProgressDialog,
-                             QGridLayout, QSizePolicy)
-from PyQt6.QtGui import QColor, QFont
-from PyQt6.QtCore import Qt, QRunnable, QThreadPool, pyqtSignal, QObject, QTimer # Importar QTimer
+                             QLabel, QLineEdit, QComboBox, QPushButton, QTableView,
+                             QAbstractItemView, QHeaderView, QMessageBox, QFormLayout, QProgressDialog,
+                             QGridLayout, QSizePolicy, QCompleter, QFileDialog, QInputDialog, QDialog,
+                             QDialogButtonBox, QCheckBox)
+from PyQt6.QtGui import QColor, QFont, QStandardItemModel, QStandardItem
+from PyQt6.QtCore import (Qt, QRunnable, QThreadPool, pyqtSignal, QObject, QTimer, # Importar QTimer
+                          QAbstractTableModel, QModelIndex)
 
 # --- Configuración de Logging ---
+import bisect
+import difflib
+import json
 import logging
 import os
+import time
+from collections import OrderedDict
 from datetime import datetime
 
 log_directory = "logs"
@@ -21,20 +27,67 @@ logging.basicConfig(
     level=logging.ERROR,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
     handlers=[
-        logging.FileHandler(log_filename),
+        logging.FileHandler(log_filename, delay=True), # El archivo se crea con el primer mensaje
         logging.StreamHandler(sys.stdout) # También imprime en consola para depuración
     ]
 )
 logger = logging.getLogger(__name__)
 # --- Fin Configuración de Logging ---
 
-DB_PARAMS = {
-    'dbname': 'Sigme2',
-    'user': 'postgres',
-    'password': '12345678',
-    'host': 'localhost',
-    'port': '5432'
-}
+from sigme_datos import (DB_PARAMS, CANAL_ANO_ESCOLAR, CANAL_RECONEXION, CANAL_SECCIONES, ENCABEZADOS_SECCIONES,
+                         ESCRITORES_EXPORTACION, ESQUEMA_DISPONIBLE, LETRAS_SECCION, TURNOS_SECCION, EscuchaNotificaciones,
+                         OperacionCancelada, PoolConexiones, RegistroOperaciones, SentenciasPreparadas, ServicioSecciones, TokenCancelacion,
+                         EXCEL_DISPONIBLE, TrazaOperacion,
+                         verificar_esquema)
+
+# Motor de base de datos: "hilos" (DBWorker en el QThreadPool) o "asincrono" (asyncio y psycopg 3)
+MOTOR_BD = os.environ.get("SIGME_MOTOR", "hilos")
+CONEXIONES_ASINCRONAS = 3 # Conexiones del motor asíncrono, compartidas por todas sus tareas
+
+# Tamaños de página disponibles en la tabla de secciones
+TAMANOS_PAGINA = [10, 50, 100, 500, 1000, 5000]
+LIMITE_SUGERENCIAS_DOCENTES = 20 # Docentes mostrados por búsqueda en el selector
+CAPACIDAD_CACHE_DOCENTES = 50 # Prefijos de búsqueda de docentes recordados
+
+# Instantánea de la última página vista y de las últimas búsquedas de docentes. Al iniciar se
+# muestra de inmediato, antes de conectar con el servidor, y se actualiza en segundo plano.
+RUTA_INSTANTANEA = os.environ.get("SIGME_INSTANTANEA", os.path.join("cache", "inicio.json"))
+VERSION_INSTANTANEA = 1
+PREFIJOS_DOCENTES_INSTANTANEA = 10 # Búsquedas de docentes guardadas en la instantánea
+MEDIR_ARRANQUE = bool(os.environ.get("SIGME_MEDIR_ARRANQUE")) # Lo activa benchmarks/arranque.py
+
+# Réplica local opcional (ver sigme_replica.py): ruta del archivo SQLite o vacío para leer del servidor
+RUTA_REPLICA = os.environ.get("SIGME_REPLICA", "")
+INTERVALO_SINCRONIZACION_REPLICA = 30000 # Milisegundos entre sincronizaciones de la réplica
+
+def _base_datos_actual():
+    return f"{DB_PARAMS['host']}:{DB_PARAMS['port']}/{DB_PARAMS['dbname']}"
+
+def leer_instantanea(ruta=RUTA_INSTANTANEA):
+    """Retorna la instantánea guardada para la base de datos actual o None si no hay una válida."""
+    try:
+        with open(ruta, encoding="utf-8") as archivo:
+            instantanea = json.load(archivo)
+    except (OSError, ValueError):
+        return None
+    if instantanea.get("version") != VERSION_INSTANTANEA or instantanea.get("base_datos") != _base_datos_actual():
+        return None
+    return instantanea
+
+def guardar_instantanea(instantanea, ruta=RUTA_INSTANTANEA):
+    """Escribe la instantánea en un archivo temporal y lo renombra, para no dejarla a medias."""
+    instantanea = dict(instantanea, version=VERSION_INSTANTANEA, base_datos=_base_datos_actual())
+    if os.path.dirname(ruta):
+        os.makedirs(os.path.dirname(ruta), exist_ok=True)
+    temporal = f"{ruta}.tmp"
+    with open(temporal, "w", encoding="utf-8") as archivo:
+        json.dump(instantanea, archivo, ensure_ascii=False, default=str) # default: claves Decimal de relevancia
+    os.replace(temporal, ruta)
+
+def marcar_arranque(evento):
+    """Informa un hito del arranque a benchmarks/arranque.py por la salida estándar."""
+    if MEDIR_ARRANQUE:
+        print(f"SIGME_ARRANQUE {evento}", flush=True)
 
 class WorkerSignals(QObject):
     """
@@ -55,35 +108,560 @@ class DBWorker(QRunnable):
         self.args = args
         self.kwargs = kwargs
         self.signals = WorkerSignals()
+        # La traza mide la espera en la cola desde aquí: el worker se encola al crearse
+        self.traza = TrazaOperacion(fn.__name__.removeprefix("_perform_"))
+        self._encolado = time.monotonic()
 
     def run(self):
         """
         Inicializa la función de trabajo con los argumentos y señales.
         """
+        inicio = time.monotonic()
+        self.traza.espera_cola = inicio - self._encolado
         try:
-            result = self.fn(self.signals.progress, *self.args, **self.kwargs)
+            with self.traza:
+                result = self.fn(self.signals.progress, *self.args, **self.kwargs)
+            self.traza.estado = "ok"
+            self.traza.ejecucion = time.monotonic() - inicio
             self.signals.result.emit(result)
+        except OperacionCancelada:
+            self.traza.estado = "cancelada" # Nadie espera el resultado de una operación cancelada
         except Exception as e:
             import traceback
+            self.traza.estado = "error"
             exctype, value = sys.exc_info()[:2]
             logger.error(f"Error en DBWorker: {value}", exc_info=True)
             self.signals.error.emit((exctype, value, traceback.format_exc()))
         finally:
+            if self.traza.ejecucion is None:
+                self.traza.ejecucion = time.monotonic() - inicio
             self.signals.finished.emit()
 
-def conectar_db():
+class TareaAsincrona:
     """
-    Establece una conexión a la base de datos PostgreSQL.
+    Equivalente de DBWorker para el motor asíncrono: las mismas señales y la misma traza.
+
+    fn se llama en el bucle de asyncio; si retorna una corrutina (los métodos de
+    ServicioSeccionesAsincrono), se espera su resultado sin ocupar un hilo.
     """
-    try:
-        conn = psycopg2.connect(**DB_PARAMS)
-        conn.set_client_encoding('UTF8')
-        return conn
-    except psycopg2.Error as e:
-        logger.critical(f"Error al conectar a la base de datos: {e}", exc_info=True)
-        raise Exception(f"No se pudo conectar a la base de datos. Por favor, verifique la configuración y el estado del servidor.")
+    def __init__(self, fn, *args, **kwargs):
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = WorkerSignals()
+        self.traza = TrazaOperacion(fn.__name__.removeprefix("_perform_"))
+        self._encolado = time.monotonic()
+        self.iniciada = False
+        self.tarea = None # asyncio.Task asignada por MotorAsincrono.iniciar()
+
+    async def ejecutar(self):
+        import asyncio, inspect # Solo se cargan con el motor asíncrono
+        self.iniciada = True
+        inicio = time.monotonic()
+        self.traza.espera_cola = inicio - self._encolado
+        try:
+            with self.traza:
+                result = self.fn(self.signals.progress, *self.args, **self.kwargs)
+                if inspect.isawaitable(result):
+                    result = await result
+            self.traza.estado = "ok"
+            self.traza.ejecucion = time.monotonic() - inicio
+            self.signals.result.emit(result)
+        except (OperacionCancelada, asyncio.CancelledError):
+            self.traza.estado = "cancelada"
+        except Exception:
+            import traceback
+            self.traza.estado = "error"
+            exctype, value = sys.exc_info()[:2]
+            logger.error(f"Error en TareaAsincrona: {value}", exc_info=True)
+            self.signals.error.emit((exctype, value, traceback.format_exc()))
+        finally:
+            if self.traza.ejecucion is None:
+                self.traza.ejecucion = time.monotonic() - inicio
+            self.signals.finished.emit()
+
+class MotorHilos:
+    """
+    Motor por defecto: cada operación es un DBWorker en el QThreadPool y usa el servicio síncrono.
+    """
+    def __init__(self, threadpool, servicio):
+        self.threadpool = threadpool
+        self.servicio = servicio
+
+    def crear(self, fn, *args, **kwargs):
+        return DBWorker(fn, *args, **kwargs)
+
+    def iniciar(self, worker):
+        self.threadpool.start(worker)
+
+    def retirar(self, worker):
+        """Quita el worker de la cola; retorna True si nunca llegó a ejecutarse."""
+        return self.threadpool.tryTake(worker)
+
+    def cerrar(self):
+        pass
+
+class MotorQtAsincrono:
+    """
+    Motor asíncrono (SIGME_MOTOR=asincrono): las operaciones son TareaAsincrona en el bucle de
+    sigme_async.MotorAsincrono y usan ServicioSeccionesAsincrono.
+    """
+    def __init__(self, servicio, max_conexiones):
+        from sigme_async import MotorAsincrono, ServicioSeccionesAsincrono # psycopg y asyncio tardan en cargarse
+        self.servicio = ServicioSeccionesAsincrono(servicio, max_conexiones)
+        self.motor = MotorAsincrono()
+
+    def crear(self, fn, *args, **kwargs):
+        return TareaAsincrona(fn, *args, **kwargs)
+
+    def iniciar(self, tarea):
+        self.motor.iniciar(tarea)
+
+    def retirar(self, tarea):
+        return self.motor.retirar(tarea)
+
+    def cerrar(self):
+        self.motor.cerrar(self.servicio.pool.cerrar())
+
+class CachePaginas:
+    """
+    Caché LRU de páginas de la tabla de secciones.
+
+    Las páginas se indexan por (término de búsqueda, página, tamaño de página, año escolar)
+    y guardan el resultado de consultar_pagina_secciones(). Los totales de registros se
+    guardan aparte por (término de búsqueda, año escolar).
+    """
+    def __init__(self, capacidad=50):
+        self.capacidad = capacidad
+        self.version = 0 # Aumenta con cada invalidación, para descartar precargas obsoletas
+        self._paginas = OrderedDict()
+        self._totales = {}
+
+    def obtener(self, search_term, pagina, page_size, ano_escolar):
+        clave = (search_term, pagina, page_size, ano_escolar)
+        resultado = self._paginas.get(clave)
+        if resultado is not None:
+            self._paginas.move_to_end(clave)
+        return resultado
+
+    def guardar(self, search_term, pagina, page_size, ano_escolar, resultado):
+        clave = (search_term, pagina, page_size, ano_escolar)
+        self._paginas[clave] = resultado
+        self._paginas.move_to_end(clave)
+        while len(self._paginas) > self.capacidad:
+            self._paginas.popitem(last=False)
+
+    def total(self, search_term, ano_escolar):
+        return self._totales.get((search_term, ano_escolar))
+
+    def guardar_total(self, search_term, ano_escolar, total_records):
+        self._totales[(search_term, ano_escolar)] = total_records
+
+    def invalidar(self, ano_escolar=None, claves=(), codigos=(), desplaza_filas=True):
+        """
+        Descarta las entradas afectadas por una escritura en el año escolar indicado.
+
+        claves son las claves de ordenamiento de las filas insertadas o eliminadas y codigos
+        los códigos de las secciones afectadas. desplaza_filas indica si la escritura inserta
+        o elimina filas (lo que mueve los límites de las páginas siguientes y cambia los
+        totales) o solo modifica filas existentes. Las búsquedas se descartan siempre.
+        """
+        self.version += 1
+        afectadas = [clave for clave in self._paginas if ano_escolar is None or clave[3] in (None, ano_escolar)]
+
+        # Completar las claves con las filas en caché de las secciones afectadas
+        claves = list(claves)
+        codigos = set(codigos)
+        codigos_ubicados = set()
+        for clave_cache in afectadas:
+            if clave_cache[0]:
+                continue
+            for fila in self._paginas[clave_cache]["secciones"]:
+                if fila[0] in codigos:
+                    codigos_ubicados.add(fila[0])
+                    claves.append((fila[1], fila[2], fila[3], fila[0]))
+        clave_minima = min(claves) if claves and codigos_ubicados == codigos else None
+
+        for clave_cache in afectadas:
+            search_term, pagina, page_size, _ = clave_cache
+            resultado = self._paginas[clave_cache]
+            if search_term:
+                descartar = True
+            elif not desplaza_filas:
+                descartar = any(fila[0] in codigos for fila in resultado["secciones"])
+            elif clave_minima is None:
+                descartar = True
+            else:
+                # Solo se conservan las páginas completas que terminan antes de la primera fila afectada
+                es_ultima = pagina * page_size >= resultado["total_records"]
+                descartar = es_ultima or resultado["ultima_clave"] >= clave_minima
+            if descartar:
+                del self._paginas[clave_cache]
+
+        for clave_total in list(self._totales):
+            search_term, ano = clave_total
+            if (ano_escolar is None or ano in (None, ano_escolar)) and (search_term or desplaza_filas):
+                del self._totales[clave_total]
+
+class SeccionesTableModel(QAbstractTableModel):
+    """
+    Modelo de la tabla de secciones sobre una lista de tuplas.
+
+    Los valores se convierten a texto solo cuando la vista los pinta. Las filas se exponen a
+    la vista en lotes (canFetchMore/fetchMore) y se ordenan en memoria sin volver a consultar.
+    """
+    ENCABEZADOS = ENCABEZADOS_SECCIONES
+    LOTE_FILAS = 200
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._filas = []
+        self._filas_originales = [] # Orden recibido de la base de datos
+        self._visibles = 0
+        self._orden = (-1, Qt.SortOrder.AscendingOrder)
+
+    def establecer_filas(self, filas):
+        """
+        Reemplaza las filas. Si se conserva la mayoría de las visibles (la misma página vuelta a
+        consultar), solo se insertan, quitan o actualizan las que cambiaron, sin perder la
+        selección ni el desplazamiento de la vista.
+        """
+        filas_originales = list(filas)
+        nuevas = self._ordenar(filas_originales, *self._orden)
+        anteriores = self._filas[:self._visibles]
+        visibles = min(max(self._visibles, self.LOTE_FILAS), len(nuevas))
+        comparacion = difflib.SequenceMatcher(None, [fila[0] for fila in anteriores],
+                                              [fila[0] for fila in nuevas[:visibles]], autojunk=False)
+        if not anteriores or comparacion.ratio() < 0.5:
+            self.beginResetModel()
+            self._filas_originales = filas_originales
+            self._filas = nuevas
+            self._visibles = min(self.LOTE_FILAS, len(nuevas))
+            self.endResetModel()
+            return
+
+        # De atrás hacia adelante, para que los índices de los bloques pendientes sigan valiendo
+        actuales = list(anteriores)
+        cambiadas = []
+        for operacion, i1, i2, j1, j2 in reversed(comparacion.get_opcodes()):
+            if operacion == "equal":
+                cambiadas.extend(j1 + k for k in range(i2 - i1) if anteriores[i1 + k] != nuevas[j1 + k])
+                continue
+            if i2 > i1: # "delete" o "replace"
+                self.beginRemoveRows(QModelIndex(), i1, i2 - 1)
+                del actuales[i1:i2]
+                self._filas, self._visibles = actuales, len(actuales)
+                self.endRemoveRows()
+            if j2 > j1: # "insert" o "replace"
+                self.beginInsertRows(QModelIndex(), i1, i1 + j2 - j1 - 1)
+                actuales[i1:i1] = nuevas[j1:j2]
+                self._filas, self._visibles = actuales, len(actuales)
+                self.endInsertRows()
+        self._filas_originales = filas_originales
+        self._filas = nuevas
+        self._visibles = visibles
+        for row in cambiadas: # Índices en la lista final
+            self.dataChanged.emit(self.index(row, 0), self.index(row, self.columnCount() - 1))
+
+    def fila(self, row):
+        return self._filas[row]
+
+    def filas(self):
+        """Filas en el orden recibido de la base de datos."""
+        return list(self._filas_originales)
+
+    def codigo(self, row):
+        return self._filas[row][0] # Columna 0 es el código
+
+    def reemplazar_fila(self, fila):
+        """Reemplaza la fila con el mismo código (columna 0)."""
+        indice = next(i for i, actual in enumerate(self._filas_originales) if actual[0] == fila[0])
+        self._filas_originales[indice] = fila
+        row = next(i for i, actual in enumerate(self._filas) if actual[0] == fila[0])
+        self._filas[row] = fila
+        if self._orden[0] >= 0:
+            self.sort(*self._orden) # El valor de la columna ordenada pudo cambiar
+        elif row < self._visibles:
+            self.dataChanged.emit(self.index(row, 0), self.index(row, self.columnCount() - 1))
+
+    def insertar_fila(self, posicion, fila):
+        """Inserta la fila en esa posición del orden recibido de la base de datos."""
+        self._filas_originales.insert(posicion, fila)
+        filas = self._ordenar(self._filas_originales, *self._orden)
+        row = next(i for i, actual in enumerate(filas) if actual is fila)
+        if row > self._visibles:
+            self._filas = filas # Todavía no se expone a la vista (fetchMore)
+            return
+        self.beginInsertRows(QModelIndex(), row, row)
+        self._filas = filas
+        self._visibles += 1
+        self.endInsertRows()
+
+    def eliminar_fila(self, codigo):
+        self._filas_originales = [fila for fila in self._filas_originales if fila[0] != codigo]
+        row = next(i for i, fila in enumerate(self._filas) if fila[0] == codigo)
+        if row >= self._visibles:
+            del self._filas[row]
+            return
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self._filas[row]
+        self._visibles -= 1
+        self.endRemoveRows()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._visibles
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.ENCABEZADOS)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole or not index.isValid():
+            return None
+        valor = self._filas[index.row()][index.column()]
+        return "" if valor is None else str(valor)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.ENCABEZADOS[section]
+        return None
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self._visibles < len(self._filas)
+
+    def fetchMore(self, parent=QModelIndex()):
+        cantidad = min(self.LOTE_FILAS, len(self._filas) - self._visibles)
+        if cantidad <= 0:
+            return
+        self.beginInsertRows(QModelIndex(), self._visibles, self._visibles + cantidad - 1)
+        self._visibles += cantidad
+        self.endInsertRows()
+
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        self.layoutAboutToBeChanged.emit()
+        self._orden = (column, order)
+        self._filas = self._ordenar(self._filas_originales, column, order)
+        self.layoutChanged.emit()
+
+    def _ordenar(self, filas, column, order):
+        if column < 0:
+            return list(filas)
+        # Los valores nulos van al final en orden ascendente
+        return sorted(filas, key=lambda fila: (fila[column] is None, fila[column] if fila[column] is not None else 0),
+                      reverse=order == Qt.SortOrder.DescendingOrder)
+
+class PanelDiagnostico(QWidget):
+    """
+    Pestaña opcional (variable de entorno SIGME_DIAGNOSTICO=1) con las últimas operaciones de
+    base de datos, sus sentencias, los percentiles de duración por operación y el uso de las
+    sentencias preparadas.
+    """
+    COLUMNAS_RECIENTES = ["Hora", "Operación", "Estado", "Cola (ms)", "Conexión (ms)", "Ejecución (ms)",
+                          "Presentación (ms)", "Total (ms)", "Sentencias", "Filas"]
+    COLUMNAS_PERCENTILES = ["Operación", "Cantidad", "p50 (ms)", "p90 (ms)", "p99 (ms)"]
+    COLUMNAS_SENTENCIAS = ["Sentencia", "Duración (ms)", "Filas"]
+    COLUMNAS_PREPARADAS = ["Sentencia preparada", "Ejecuciones", "Planificación sin preparar (ms)",
+                           "Planificación preparada (ms)", "Ahorro estimado (ms)"]
+
+    def __init__(self, registro, pool, parent=None):
+        super().__init__(parent)
+        self.registro = registro
+        self.pool = pool
+        self._trazas = []
+
+        layout = QVBoxLayout()
+        self.label_pool = QLabel()
+        self.btn_actualizar = QPushButton("Actualizar")
+        self.btn_actualizar.clicked.connect(self.actualizar)
+        self.btn_actualizar.setSizePolicy(QSizePolicy.Policy.Fixed, QSizePolicy.Policy.Fixed)
+        cabecera = QHBoxLayout()
+        cabecera.addWidget(self.label_pool)
+        cabecera.addStretch()
+        cabecera.addWidget(self.btn_actualizar)
+        layout.addLayout(cabecera)
+
+        self.modelo_recientes, self.tabla_recientes = self._crear_tabla(self.COLUMNAS_RECIENTES)
+        self.tabla_recientes.selectionModel().currentRowChanged.connect(self._mostrar_sentencias)
+        self.modelo_percentiles, self.tabla_percentiles = self._crear_tabla(self.COLUMNAS_PERCENTILES)
+        self.modelo_sentencias, self.tabla_sentencias = self._crear_tabla(self.COLUMNAS_SENTENCIAS)
+        self.modelo_preparadas, self.tabla_preparadas = self._crear_tabla(self.COLUMNAS_PREPARADAS)
+        layout.addWidget(QLabel("Operaciones recientes"))
+        layout.addWidget(self.tabla_recientes, 3)
+        layout.addWidget(QLabel("Sentencias de la operación seleccionada"))
+        layout.addWidget(self.tabla_sentencias, 2)
+        layout.addWidget(QLabel("Percentiles de duración total por operación"))
+        layout.addWidget(self.tabla_percentiles, 2)
+        layout.addWidget(QLabel("Sentencias preparadas"))
+        layout.addWidget(self.tabla_preparadas, 2)
+        self.setLayout(layout)
+
+        self.timer = QTimer(self) # Se actualiza solo mientras la pestaña está visible
+        self.timer.timeout.connect(lambda: self.actualizar() if self.isVisible() else None)
+        self.timer.start(2000)
+
+    def _crear_tabla(self, columnas):
+        modelo = QStandardItemModel(0, len(columnas), self)
+        modelo.setHorizontalHeaderLabels(columnas)
+        tabla = QTableView()
+        tabla.setModel(modelo)
+        tabla.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        tabla.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        tabla.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+        tabla.verticalHeader().setVisible(False)
+        tabla.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
+        tabla.horizontalHeader().setStretchLastSection(True)
+        return modelo, tabla
+
+    @staticmethod
+    def _ms(segundos):
+        return "" if segundos is None else f"{segundos * 1000:.1f}"
+
+    def _llenar(self, modelo, filas):
+        modelo.removeRows(0, modelo.rowCount())
+        for fila in filas:
+            modelo.appendRow([QStandardItem(str(valor)) for valor in fila])
+
+    def actualizar(self):
+        estadisticas = self.pool.estadisticas()
+        self.label_pool.setText(f"Conexiones: {estadisticas['en_uso']} en uso, {estadisticas['libres']} libres "
+                                f"de {estadisticas['max_conexiones']} | Creadas: {estadisticas['creadas']}, "
+                                f"reconexiones: {estadisticas['reconexiones']}, esperas: {estadisticas['esperas']}")
+        self._trazas = self.registro.recientes()
+        self._llenar(self.modelo_recientes, [
+            (datetime.fromtimestamp(t.creada).strftime("%H:%M:%S"), t.nombre, t.estado, self._ms(t.espera_cola),
+             self._ms(t.conexion), self._ms(t.ejecucion), self._ms(t.presentacion), self._ms(t.total),
+             len(t.sentencias), t.filas)
+            for t in self._trazas
+        ])
+        self._llenar(self.modelo_percentiles, [
+            (nombre, datos["cantidad"], self._ms(datos["p50"]), self._ms(datos["p90"]), self._ms(datos["p99"]))
+            for nombre, datos in self.registro.percentiles().items()
+        ])
+        self.modelo_sentencias.removeRows(0, self.modelo_sentencias.rowCount())
+        self._llenar(self.modelo_preparadas, [
+            (" ".join(e.sql.split()), e.ejecuciones, self._ms(e.planificacion_adhoc), self._ms(e.planificacion_preparada),
+             self._ms(e.ahorro))
+            for e in sorted(SentenciasPreparadas.estadisticas(), key=lambda e: -(e.ahorro or 0))
+        ])
+
+    def _mostrar_sentencias(self, actual, anterior=None):
+        if not actual.isValid() or actual.row() >= len(self._trazas):
+            return
+        self._llenar(self.modelo_sentencias, [
+            (sql, self._ms(duracion), filas) for sql, duracion, filas in self._trazas[actual.row()].sentencias
+        ])
+
+class PanelResumen(QWidget):
+    """
+    Pestaña con los totales de secciones, cupos, estudiantes y aulas por grado y turno del año
+    escolar activo. Lee la tabla de resumen que mantienen los disparadores de SECCION.
+    """
+    COLUMNAS = ["Grado", "Turno", "Secciones", "Capacidad", "Estudiantes", "Ocupación", "Aulas usadas"]
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        layout = QVBoxLayout()
+        self.label_ano = QLabel()
+        self.btn_actualizar = QPushButton("Actualizar")
+        self.btn_actualizar.setSizePolicy(QSizePolicy.Policy.Fixed, QSizePolicy.Policy.Fixed)
+        cabecera = QHBoxLayout()
+        cabecera.addWidget(self.label_ano)
+        cabecera.addStretch()
+        cabecera.addWidget(self.btn_actualizar)
+        layout.addLayout(cabecera)
+
+        self.modelo = QStandardItemModel(0, len(self.COLUMNAS), self)
+        self.modelo.setHorizontalHeaderLabels(self.COLUMNAS)
+        self.tabla = QTableView()
+        self.tabla.setModel(self.modelo)
+        self.tabla.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.tabla.verticalHeader().setVisible(False)
+        self.tabla.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        layout.addWidget(self.tabla)
+        self.setLayout(layout)
+
+    @staticmethod
+    def _fila(grado, turno, secciones, capacidad, estudiantes, aulas):
+        ocupacion = f"{estudiantes * 100 / capacidad:.1f}%" if capacidad else ""
+        return [QStandardItem(str(valor)) for valor in (grado, turno, secciones, capacidad, estudiantes, ocupacion, aulas)]
+
+    def mostrar(self, resultado):
+        ano_escolar, filas = resultado
+        self.label_ano.setText(f"Año escolar activo: {ano_escolar}" if ano_escolar else "No hay un año escolar activo.")
+        self.modelo.removeRows(0, self.modelo.rowCount())
+        for fila in filas:
+            self.modelo.appendRow(self._fila(*fila))
+        if filas:
+            totales = [sum(fila[i] for fila in filas) for i in range(2, 6)]
+            items = self._fila("Total", "", *totales)
+            for item in items:
+                fuente = item.font()
+                fuente.setBold(True)
+                item.setFont(fuente)
+            self.modelo.appendRow(items)
+
+class DialogoGrilla(QDialog):
+    """
+    Pide la grilla de secciones a generar: grados, letras y turnos (todas sus combinaciones),
+    la capacidad máxima y, opcionalmente, las cédulas de los docentes guía en el orden de la grilla.
+    """
+    TURNOS = {"M": "Mañana (M)", "T": "Tarde (T)"}
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Generar Secciones")
+        self.checks_grados = self._fila_checks([str(grado) for grado in range(1, 7)])
+        self.checks_letras = self._fila_checks(LETRAS_SECCION)
+        self.checks_turnos = self._fila_checks([self.TURNOS[turno] for turno in TURNOS_SECCION])
+        self.input_capacidad = QLineEdit("30")
+        self.input_capacidad.setPlaceholderText("Ej: 30, 35, 40")
+        self.input_docentes = QLineEdit()
+        self.input_docentes.setPlaceholderText("Cédulas separadas por comas, o vacío para dejarlas sin docente guía (si la base de datos lo permite)")
+
+        formulario = QFormLayout()
+        formulario.addRow("Grados:", self.checks_grados[0])
+        formulario.addRow("Letras:", self.checks_letras[0])
+        formulario.addRow("Turnos:", self.checks_turnos[0])
+        formulario.addRow("Capacidad Máxima:", self.input_capacidad)
+        formulario.addRow("Docentes Guía:", self.input_docentes)
+        botones = QDialogButtonBox(QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel)
+        botones.button(QDialogButtonBox.StandardButton.Ok).setText("Vista Previa")
+        botones.accepted.connect(self.accept)
+        botones.rejected.connect(self.reject)
+        layout = QVBoxLayout()
+        layout.addLayout(formulario)
+        layout.addWidget(botones)
+        self.setLayout(layout)
+
+    @staticmethod
+    def _fila_checks(textos):
+        contenedor = QWidget()
+        fila = QHBoxLayout(contenedor)
+        fila.setContentsMargins(0, 0, 0, 0)
+        checks = []
+        for texto in textos:
+            check = QCheckBox(texto)
+            check.setChecked(True)
+            fila.addWidget(check)
+            checks.append(check)
+        return contenedor, checks
+
+    @staticmethod
+    def _marcados(checks, valores):
+        return [valor for check, valor in zip(checks[1], valores) if check.isChecked()]
+
+    def especificacion(self):
+        """Argumentos de ServicioSecciones.generar_grilla()."""
+        return {
+            "grados": self._marcados(self.checks_grados, range(1, 7)),
+            "letras": self._marcados(self.checks_letras, LETRAS_SECCION),
+            "turnos": self._marcados(self.checks_turnos, TURNOS_SECCION),
+            "capacidad": self.input_capacidad.text().strip() or "0",
+            "docentes": [cedula.strip() for cedula in self.input_docentes.text().split(",") if cedula.strip()],
+        }
 
 class ModuloInstitucion(QWidget):
+    notificacion_recibida = pyqtSignal(str, str) # (canal, payload) desde el hilo de EscuchaNotificaciones
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("SIGME2 | Gestión de Secciones y Aulas")
@@ -174,7 +752,7 @@ class ModuloInstitucion(QWidget):
                 color: #e0e0e0;
             }
 
-            QTableWidget {
+            QTableView {
                 background-color: white;
                 border: 1px solid #b3cbdc;
                 border-radius: 8px;
@@ -189,7 +767,7 @@ class ModuloInstitucion(QWidget):
                 border: 1px solid #1c355b;
                 font-weight: bold;
             }
-            QTableWidget::item {
+            QTableView::item {
                 padding: 5px;
             }
             QTabWidget::pane {
@@ -219,29 +797,138 @@ class ModuloInstitucion(QWidget):
         """)
         self.threadpool = QThreadPool()
         print(f"Multithreading con un máximo de {self.threadpool.maxThreadCount()} hilos")
-        self.progress_dialog = None
+        # Una conexión por hilo de trabajo. Solo se verifica el esquema: instalarlo bloquea tablas
+        # y se hace aparte (python sigme_cli.py esquema --instalar)
+        self.db_pool = PoolConexiones(self.threadpool.maxThreadCount(), inicializar_conexion=verificar_esquema)
+        self.registro_operaciones = RegistroOperaciones() # Tiempos de las operaciones y log de lentitud
+        servicio = ServicioSecciones(self.db_pool)
+        self.replica = None
+        if RUTA_REPLICA:
+            from sigme_replica import ReplicaLocal, ServicioConReplica
+            self.replica = ReplicaLocal(RUTA_REPLICA, self.db_pool)
+            servicio = ServicioConReplica(servicio, self.replica)
+        self.motor = self._crear_motor(servicio)
+        self.servicio = self.motor.servicio
+        self._operaciones_activas = 0 # Operaciones que bloquean la interfaz mientras se ejecutan
+        self._generacion_tabla = 0 # Aumenta con cada carga de la tabla; las anteriores quedan obsoletas
+        self._carga_tabla = None # (worker, token) de la carga de la tabla en curso
+        self._cambios_durante_carga = False # Llegaron avisos de CANAL_SECCIONES durante la carga en curso
         self.seccion_editando_codigo = None # Variable para controlar el modo edición
 
         # Variables de paginación y búsqueda
         self.current_page = 1
-        self.page_size = 10
+        self.page_size = TAMANOS_PAGINA[0]
         self.total_records = 0
         self.total_pages = 0
+        self.page_first_key = None # Clave de ordenamiento de la primera fila de la página actual
+        self.page_last_key = None # Clave de ordenamiento de la última fila de la página actual
+        self.page_cache = CachePaginas()
+        self._precargas_en_curso = set()
+        self.contexto_ano = self.servicio.contexto_ano
+        self.ano_escolar_vista = None # Año escolar de las filas mostradas (None: todos los años)
         self.search_term = ""
         self.search_timer = QTimer(self) # Timer para búsqueda con retraso
         self.search_timer.setSingleShot(True)
         self.search_timer.timeout.connect(self.perform_search)
+        self.docentes_timer = QTimer(self) # Timer para la búsqueda de docentes con retraso
+        self.docentes_timer.setSingleShot(True)
+        self.docentes_timer.timeout.connect(self._buscar_docentes)
+        self._docentes_cache = OrderedDict() # Prefijo -> docentes encontrados (LRU)
+        self._docentes_restaurados = set() # Prefijos de la instantánea aún no consultados al servidor
+        self._busquedas_docentes_en_curso = set()
+        self._mostrando_instantanea = False # La tabla muestra la instantánea de la sesión anterior
+        self._pintada = False
+        self._datos_actualizados = False
+
+        # El año escolar activo se invalida cuando el servidor notifica un cambio y las
+        # secciones modificadas (aquí o en otros equipos) se aplican a la página visible
+        self.notificacion_recibida.connect(self._procesar_notificacion)
+        self.escucha_notificaciones = EscuchaNotificaciones([CANAL_ANO_ESCOLAR, CANAL_SECCIONES],
+                                                            self.notificacion_recibida.emit)
+        self.escucha_notificaciones.iniciar()
+
+        # La réplica local se pone al día al iniciar y luego periódicamente
+        self._sincronizando_replica = False
+        self._recarga_replica_pendiente = None # Dirección de la recarga tras la sincronización en curso
+        if self.replica:
+            self.replica_timer = QTimer(self)
+            self.replica_timer.timeout.connect(self._sincronizar_replica)
+            self.replica_timer.start(INTERVALO_SINCRONIZACION_REPLICA)
+            QTimer.singleShot(0, self._sincronizar_replica)
 
         self.init_ui()
+        self._restaurar_instantanea()
         self.cargar_secciones(show_progress_dialog=False)
-        self.cargar_docentes(show_progress_dialog=False)
         self._update_buttons_state() # Actualizar estado inicial de los botones
 
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if not self._pintada:
+            self._pintada = True
+            marcar_arranque("primer_pintado")
+
+    def _restaurar_instantanea(self):
+        """Muestra la página y las búsquedas de docentes guardadas al cerrar la sesión anterior."""
+        instantanea = leer_instantanea()
+        if instantanea is None:
+            return
+        try:
+            if instantanea["page_size"] in TAMANOS_PAGINA:
+                self.page_size = instantanea["page_size"]
+                self.input_page_size.blockSignals(True)
+                self.input_page_size.setCurrentIndex(TAMANOS_PAGINA.index(self.page_size))
+                self.input_page_size.blockSignals(False)
+            self.search_term = instantanea["search_term"]
+            self.input_search.blockSignals(True)
+            self.input_search.setText(self.search_term)
+            self.input_search.blockSignals(False)
+            self.current_page = instantanea["current_page"]
+            self.ano_escolar_vista = instantanea["ano_escolar"]
+            for prefijo, docentes in instantanea["docentes"]:
+                self._docentes_cache[prefijo] = [tuple(docente) for docente in docentes]
+                self._docentes_restaurados.add(prefijo)
+            self._mostrando_instantanea = True
+            self._mostrar_pagina({
+                "secciones": [tuple(fila) for fila in instantanea["secciones"]],
+                "primera_clave": tuple(instantanea["primera_clave"]) if instantanea["primera_clave"] else None,
+                "ultima_clave": tuple(instantanea["ultima_clave"]) if instantanea["ultima_clave"] else None,
+            }, instantanea["total_records"], precargar=False)
+        except (KeyError, TypeError, ValueError) as e:
+            logger.warning(f"Se ignoró la instantánea de inicio {RUTA_INSTANTANEA}: {e}")
+            return
+        marcar_arranque("datos_en_pantalla")
+
+    def _guardar_instantanea(self):
+        if self._mostrando_instantanea and not self._datos_actualizados:
+            return # Nunca se conectó: conservar la instantánea tal como estaba
+        try:
+            guardar_instantanea({
+                "search_term": self.search_term,
+                "page_size": self.page_size,
+                "current_page": self.current_page,
+                "total_records": self.total_records,
+                "ano_escolar": self.ano_escolar_vista,
+                "secciones": self.tabla_model.filas(),
+                "primera_clave": self.page_first_key,
+                "ultima_clave": self.page_last_key,
+                "docentes": list(self._docentes_cache.items())[-PREFIJOS_DOCENTES_INSTANTANEA:],
+            })
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning(f"No se pudo guardar la instantánea de inicio {RUTA_INSTANTANEA}: {e}")
+
     def init_ui(self):
         self.tabs = QTabWidget()
         self.tab_secciones = QWidget()
         self.setup_secciones_ui()
         self.tabs.addTab(self.tab_secciones, "Gestión de Secciones")
+        self.panel_resumen = PanelResumen()
+        self.panel_resumen.btn_actualizar.clicked.connect(self._cargar_resumen)
+        self.tabs.addTab(self.panel_resumen, "Resumen")
+        self.tabs.currentChanged.connect(lambda indice: self._cargar_resumen()
+                                         if self.tabs.widget(indice) is self.panel_resumen else None)
+        if os.environ.get("SIGME_DIAGNOSTICO"):
+            self.panel_diagnostico = PanelDiagnostico(self.registro_operaciones, self.db_pool)
+            self.tabs.addTab(self.panel_diagnostico, "Diagnóstico")
         
         main_layout = QVBoxLayout()
         main_layout.addWidget(self.tabs)
@@ -276,13 +963,22 @@ class ModuloInstitucion(QWidget):
         self.input_grado.textChanged.connect(lambda: self._clear_error_style(self.input_grado))
 
         self.input_letra = QComboBox()
-        self.input_letra.addItems(["A", "B", "C", "D", "E"])
+        self.input_letra.addItems(LETRAS_SECCION)
 
         self.input_turno = QComboBox()
         self.input_turno.addItems(["Mañana (M)", "Tarde (T)"])
 
+        # Los docentes se consultan en el servidor a medida que se escribe, no se cargan todos al inicio
         self.input_docente_combo = QComboBox()
-        self.input_docente_combo.setPlaceholderText("Seleccione un docente")
+        self.input_docente_combo.setEditable(True)
+        self.input_docente_combo.setInsertPolicy(QComboBox.InsertPolicy.NoInsert)
+        self.input_docente_combo.lineEdit().setPlaceholderText("Escriba la cédula o el nombre del docente")
+        self.docentes_model = QStandardItemModel(self)
+        self.docentes_completer = QCompleter(self.docentes_model, self)
+        self.docentes_completer.setCompletionMode(QCompleter.CompletionMode.UnfilteredPopupCompletion)
+        self.input_docente_combo.setCompleter(self.docentes_completer)
+        self.docentes_completer.activated.connect(self._seleccionar_docente_sugerido)
+        self.input_docente_combo.lineEdit().textEdited.connect(lambda: self.docentes_timer.start(300))
         self.input_docente_combo.currentIndexChanged.connect(lambda: self._clear_error_style(self.input_docente_combo))
 
         self.input_capacidad_maxima = QLineEdit()
@@ -351,17 +1047,20 @@ class ModuloInstitucion(QWidget):
         main_layout.addLayout(search_layout)
 
         # Tabla de secciones
-        self.tabla_secciones = QTableWidget()
-        self.tabla_secciones.setColumnCount(7)
-        self.tabla_secciones.setHorizontalHeaderLabels([
-            "Código", "Grado", "Letra", "Turno", "Aula", "Docente", "Capacidad Máxima"
-        ])
+        self.tabla_model = SeccionesTableModel()
+        self.tabla_secciones = QTableView()
+        self.tabla_secciones.setModel(self.tabla_model)
         self.tabla_secciones.verticalHeader().setVisible(False)
+        # Filas de alto fijo: el desplazamiento no depende del contenido de cada celda
+        self.tabla_secciones.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
         self.tabla_secciones.horizontalHeader().setStretchLastSection(True)
-        self.tabla_secciones.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
-        self.tabla_secciones.setSelectionMode(QTableWidget.SelectionMode.ExtendedSelection)
-        self.tabla_secciones.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
-        self.tabla_secciones.itemSelectionChanged.connect(self._update_buttons_state)
+        self.tabla_secciones.horizontalHeader().setSortIndicator(-1, Qt.SortOrder.AscendingOrder)
+        self.tabla_secciones.setSortingEnabled(True) # Ordena las filas cargadas sin volver a consultar
+        self.tabla_secciones.setWordWrap(False)
+        self.tabla_secciones.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.tabla_secciones.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
+        self.tabla_secciones.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.tabla_secciones.selectionModel().selectionChanged.connect(self._update_buttons_state)
         self.tabla_secciones.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
 
         main_layout.addWidget(self.tabla_secciones)
@@ -393,6 +1092,15 @@ class ModuloInstitucion(QWidget):
         pagination_layout.addWidget(self.lbl_page_info)
         pagination_layout.addWidget(self.btn_next_page)
         pagination_layout.addWidget(self.btn_last_page)
+
+        pagination_layout.addSpacing(20)
+        pagination_layout.addWidget(QLabel("Filas por página:"))
+        self.input_page_size = QComboBox()
+        for tamano in TAMANOS_PAGINA:
+            self.input_page_size.addItem(str(tamano), userData=tamano)
+        self.input_page_size.setCurrentIndex(TAMANOS_PAGINA.index(self.page_size))
+        self.input_page_size.currentIndexChanged.connect(self.cambiar_tamano_pagina)
+        pagination_layout.addWidget(self.input_page_size)
         main_layout.addLayout(pagination_layout)
 
         # Botones de edición/eliminación de la tabla
@@ -412,6 +1120,24 @@ class ModuloInstitucion(QWidget):
         self.btn_eliminar.setSizePolicy(QSizePolicy.Policy.Fixed, QSizePolicy.Policy.Fixed)
         self.btn_eliminar.setMinimumWidth(150)
 
+        self.btn_importar = QPushButton("Importar CSV")
+        self.btn_importar.clicked.connect(self.importar_csv)
+        self.btn_importar.setSizePolicy(QSizePolicy.Policy.Fixed, QSizePolicy.Policy.Fixed)
+        self.btn_importar.setMinimumWidth(150)
+
+        self.btn_generar = QPushButton("Generar Secciones")
+        self.btn_generar.clicked.connect(self.generar_grilla)
+        self.btn_generar.setSizePolicy(QSizePolicy.Policy.Fixed, QSizePolicy.Policy.Fixed)
+        self.btn_generar.setMinimumWidth(150)
+
+        self.btn_exportar = QPushButton("Exportar")
+        self.btn_exportar.clicked.connect(self.exportar)
+        self.btn_exportar.setSizePolicy(QSizePolicy.Policy.Fixed, QSizePolicy.Policy.Fixed)
+        self.btn_exportar.setMinimumWidth(150)
+
+        btn_table_layout.addWidget(self.btn_generar)
+        btn_table_layout.addWidget(self.btn_importar)
+        btn_table_layout.addWidget(self.btn_exportar)
         btn_table_layout.addWidget(self.btn_editar)
         btn_table_layout.addWidget(self.btn_eliminar)
         main_layout.addLayout(btn_table_layout)
@@ -438,37 +1164,80 @@ class ModuloInstitucion(QWidget):
                 border-radius: 5px;
             """)
 
-    def _run_db_operation(self, func, success_slot, error_slot, show_progress_dialog=True, *args, **kwargs):
-        self._set_ui_enabled(False)
-        
-        if show_progress_dialog:
-            self.progress_dialog = QProgressDialog("Realizando operación...", "Cancelar", 0, 100, self)
-            self.progress_dialog.setWindowModality(Qt.WindowModality.WindowModal)
-            self.progress_dialog.setWindowTitle("Procesando...")
-            self.progress_dialog.setCancelButton(None)
-            self.progress_dialog.setValue(0)
-            self.progress_dialog.show()
-        else:
-            self.progress_dialog = None
-
-        worker = DBWorker(func, *args, **kwargs)
-        worker.signals.result.connect(success_slot)
-        worker.signals.error.connect(error_slot)
-        if show_progress_dialog:
-            worker.signals.progress.connect(self._update_progress_dialog)
-        worker.signals.finished.connect(lambda: self._operation_finished())
-        self.threadpool.start(worker)
+    def _crear_motor(self, servicio):
+        if MOTOR_BD == "asincrono" and self.replica:
+            logger.info("Con la réplica local se usa el motor de hilos: las lecturas no esperan al servidor.")
+        elif MOTOR_BD == "asincrono":
+            from sigme_async import psycopg
+            if psycopg is not None:
+                return MotorQtAsincrono(servicio, CONEXIONES_ASINCRONAS)
+            logger.error("SIGME_MOTOR=asincrono requiere el paquete psycopg (versión 3); se usará el motor de hilos.")
+        return MotorHilos(self.threadpool, servicio)
+
+    def _run_db_operation(self, func, success_slot, error_slot, show_progress_dialog=True, *args,
+                          bloquear_ui=True, cancelable=False, **kwargs):
+        """
+        Ejecuta func en el pool de hilos y retorna el worker.
 
-    def _update_progress_dialog(self, value, message):
-        if self.progress_dialog:
-            self.progress_dialog.setValue(value)
-            self.progress_dialog.setLabelText(message)
+        Con bloquear_ui el formulario se deshabilita hasta que terminen todas las operaciones
+        bloqueantes en curso. Cada operación tiene su propio diálogo de progreso; con cancelable,
+        su botón Cancelar cancela el TokenCancelacion que se pasa a func como token.
+        """
+        if bloquear_ui:
+            self._operaciones_activas += 1
+            self._set_ui_enabled(False)
 
-    def _operation_finished(self):
-        if self.progress_dialog:
-            self.progress_dialog.close()
-            self.progress_dialog = None
-        self._set_ui_enabled(True)
+        progress_dialog = None
+        if show_progress_dialog:
+            progress_dialog = QProgressDialog("Realizando operación...", "Cancelar", 0, 100, self)
+            if bloquear_ui:
+                progress_dialog.setWindowModality(Qt.WindowModality.WindowModal)
+            progress_dialog.setWindowTitle("Procesando...")
+            if cancelable:
+                progress_dialog.canceled.connect(kwargs["token"].cancelar)
+            else:
+                progress_dialog.setCancelButton(None)
+            progress_dialog.setValue(0)
+            progress_dialog.show()
+
+        worker = self.motor.crear(func, *args, **kwargs)
+        worker.signals.result.connect(lambda result, t=worker.traza: self._presentar(t, success_slot, result))
+        worker.signals.error.connect(lambda error, t=worker.traza: self._presentar(t, error_slot, error))
+        if progress_dialog:
+            worker.signals.progress.connect(lambda value, message, d=progress_dialog: self._update_progress_dialog(d, value, message))
+        worker.signals.finished.connect(lambda d=progress_dialog: self._operation_finished(d, bloquear_ui))
+        worker.signals.finished.connect(lambda t=worker.traza: self.registro_operaciones.registrar(t))
+        self.motor.iniciar(worker)
+        return worker
+
+    def _run_db_background(self, func, success_slot, *args, finished_slot=None, **kwargs):
+        """Ejecuta una consulta en segundo plano sin bloquear la interfaz ni mostrar progreso."""
+        worker = self.motor.crear(func, *args, **kwargs)
+        worker.signals.result.connect(lambda result, t=worker.traza: self._presentar(t, success_slot, result))
+        if finished_slot:
+            worker.signals.finished.connect(finished_slot)
+        worker.signals.finished.connect(lambda t=worker.traza: self.registro_operaciones.registrar(t))
+        self.motor.iniciar(worker)
+
+    def _presentar(self, traza, slot, valor):
+        """Ejecuta el manejador del resultado (o del error) y mide su tiempo en el hilo de la interfaz."""
+        inicio = time.monotonic()
+        try:
+            slot(valor)
+        finally:
+            traza.presentacion = time.monotonic() - inicio
+
+    def _update_progress_dialog(self, progress_dialog, value, message):
+        progress_dialog.setValue(value)
+        progress_dialog.setLabelText(message)
+
+    def _operation_finished(self, progress_dialog=None, bloquear_ui=True):
+        if progress_dialog:
+            progress_dialog.close()
+        if bloquear_ui:
+            self._operaciones_activas -= 1
+            if self._operaciones_activas == 0:
+                self._set_ui_enabled(True)
         self._update_buttons_state() # Asegurarse de que los botones se actualicen al finalizar
 
     def _set_ui_enabled(self, enabled):
@@ -481,6 +1250,9 @@ class ModuloInstitucion(QWidget):
         self.input_capacidad_maxima.setEnabled(enabled)
         self.input_aula.setEnabled(enabled)
         self.input_search.setEnabled(enabled) # Habilitar/deshabilitar búsqueda
+        self.btn_importar.setEnabled(enabled)
+        self.btn_generar.setEnabled(enabled)
+        self.btn_exportar.setEnabled(enabled)
         # Los botones de editar/eliminar/paginación se controlan por _update_buttons_state
 
     def _update_buttons_state(self):
@@ -516,43 +1288,79 @@ class ModuloInstitucion(QWidget):
         self.btn_prev_page.setEnabled(self.current_page > 1)
         self.btn_next_page.setEnabled(self.current_page < self.total_pages)
         self.btn_last_page.setEnabled(self.current_page < self.total_pages)
-        self.lbl_page_info.setText(f"Página {self.current_page} de {self.total_pages}")
+        self.lbl_page_info.setText(f"Página {self.current_page} de {self.total_pages}"
+                                   f"{' (datos guardados, actualizando...)' if self._mostrando_instantanea else ''}")
 
 
-    def cargar_docentes(self, show_progress_dialog=True):
-        self._run_db_operation(
-            self._perform_cargar_docentes,
-            self._handle_cargar_docentes_result,
-            self._handle_db_error,
-            show_progress_dialog=show_progress_dialog
+    def _buscar_docentes(self):
+        """Muestra los docentes que comienzan con el texto escrito, consultando al servidor si no están en caché."""
+        texto = self.input_docente_combo.currentText().strip()
+        if not texto:
+            self._mostrar_sugerencias_docentes([])
+            return
+        docentes = self._docentes_cache.get(texto)
+        if docentes is not None:
+            self._docentes_cache.move_to_end(texto)
+            self._mostrar_sugerencias_docentes(docentes)
+            if texto not in self._docentes_restaurados:
+                return
+            # Resultado de la sesión anterior: se muestra y se actualiza en segundo plano
+            self._docentes_restaurados.discard(texto)
+        if texto in self._busquedas_docentes_en_curso:
+            return
+        self._busquedas_docentes_en_curso.add(texto)
+        self._run_db_background(
+            self._perform_buscar_docentes,
+            lambda docentes, t=texto: self._handle_buscar_docentes_result(t, docentes),
+            finished_slot=lambda t=texto: self._busquedas_docentes_en_curso.discard(t),
+            texto=texto
         )
 
-    def _perform_cargar_docentes(self, progress_callback):
-        conn = None
-        try:
-            conn = conectar_db()
-            cursor = conn.cursor()
-            progress_callback.emit(10, "Cargando docentes...")
-            cursor.execute("SELECT cedula, nombres, apellidos FROM PERSONAL ORDER BY nombres, apellidos")
-            docentes = cursor.fetchall()
-            progress_callback.emit(100, "Docentes cargados.")
-            return docentes
-        finally:
-            if conn:
-                conn.close()
+    def _perform_buscar_docentes(self, progress_callback, texto):
+        return self.servicio.buscar_docentes(texto, LIMITE_SUGERENCIAS_DOCENTES)
+
+    def _handle_buscar_docentes_result(self, texto, docentes):
+        self._docentes_cache[texto] = docentes
+        while len(self._docentes_cache) > CAPACIDAD_CACHE_DOCENTES:
+            self._docentes_cache.popitem(last=False)
+        # Ignorar respuestas de un texto que el usuario ya cambió
+        if texto == self.input_docente_combo.currentText().strip():
+            self._mostrar_sugerencias_docentes(docentes)
 
-    def _handle_cargar_docentes_result(self, docentes):
-        self.input_docente_combo.clear()
-        self.input_docente_combo.addItem("Seleccione un docente", userData=None)
+    def _mostrar_sugerencias_docentes(self, docentes):
+        self.docentes_model.clear()
         for cedula, nombres, apellidos in docentes:
-            display_text = f"{nombres} {apellidos} ({cedula})"
+            item = QStandardItem(f"{nombres} {apellidos} ({cedula})")
+            item.setData(cedula, Qt.ItemDataRole.UserRole)
+            self.docentes_model.appendRow(item)
+        if docentes and self.input_docente_combo.lineEdit().hasFocus():
+            self.docentes_completer.complete()
+
+    def _seleccionar_docente_sugerido(self, display_text):
+        items = self.docentes_model.findItems(display_text)
+        if items:
+            self._seleccionar_docente(items[0].data(Qt.ItemDataRole.UserRole), display_text)
+
+    def _seleccionar_docente(self, cedula, display_text):
+        """Deja al docente como opción actual del ComboBox, agregándolo si aún no está."""
+        index = self.input_docente_combo.findData(cedula)
+        if index == -1:
             self.input_docente_combo.addItem(display_text, userData=cedula)
+            index = self.input_docente_combo.count() - 1
+        self.input_docente_combo.setCurrentIndex(index)
+
+    def _docente_seleccionado(self):
+        """Retorna la cédula del docente elegido, o None si el texto no corresponde a una opción."""
+        index = self.input_docente_combo.currentIndex()
+        if index == -1 or self.input_docente_combo.currentText().strip() != self.input_docente_combo.itemText(index):
+            return None
+        return self.input_docente_combo.itemData(index)
 
     def asignar_o_actualizar_seccion(self):
         grado = self.input_grado.text().strip()
         letra = self.input_letra.currentText()
         turno = self.input_turno.currentText()[0]
-        docente = self.input_docente_combo.currentData()
+        docente = self._docente_seleccionado()
         aula_manual = self.input_aula.text().strip()
         capacidad_maxima_str = self.input_capacidad_maxima.text().strip()
 
@@ -611,165 +1419,24 @@ class ModuloInstitucion(QWidget):
             )
 
     def _perform_asignar_seccion(self, progress_callback, grado, letra, turno, docente, aula_manual, capacidad_maxima):
-        conn = None
-        try:
-            conn = conectar_db()
-            cursor = conn.cursor()
-
-            progress_callback.emit(10, "Verificando año escolar activo...")
-            cursor.execute("SELECT codigo FROM ANO_ESCOLAR WHERE activo = TRUE LIMIT 1")
-            resultado = cursor.fetchone()
-            if not resultado:
-                raise ValueError("No hay un año escolar activo registrado. Por favor, configure uno.")
-            codigo_ano_escolar = resultado[0]
-
-            progress_callback.emit(30, "Verificando sección existente...")
-            cursor.execute("""
-                SELECT 1 FROM SECCION
-                WHERE codigo_grado = %s AND letra = %s AND turno = %s AND codigo_ano_escolar = %s
-            """, (grado, letra, turno, codigo_ano_escolar))
-            if cursor.fetchone():
-                raise ValueError(f"Ya existe una sección {grado}{letra} en el turno {turno} para el año escolar actual.")
-
-            progress_callback.emit(40, "Verificando asignación de docente...")
-            cursor.execute("""
-                SELECT codigo FROM SECCION
-                WHERE cedula_docente_guia = %s AND codigo_ano_escolar = %s
-            """, (docente, codigo_ano_escolar))
-            docente_asignado = cursor.fetchone()
-            if docente_asignado:
-                raise ValueError(f"Este docente ya está asignado a la sección {docente_asignado[0]} para el año escolar actual.")
-
-            aula = None
-            if aula_manual:
-                progress_callback.emit(50, "Verificando aula manual...")
-                cursor.execute("""
-                    SELECT 1 FROM SECCION
-                    WHERE aula_asignada = %s AND codigo_grado = %s AND turno = %s AND codigo_ano_escolar = %s
-                """, (aula_manual, grado, turno, codigo_ano_escolar))
-                if cursor.fetchone():
-                    raise ValueError(f"El aula {aula_manual} ya está asignada en este grado y turno para el año escolar actual.")
-                aula = aula_manual
-            else:
-                progress_callback.emit(60, "Buscando aula disponible automáticamente...")
-                aula = self._get_available_aula_db(grado, cursor)
-                if aula is None:
-                    raise ValueError("No hay aulas disponibles para este grado. Considere asignar una manualmente.")
-
-            codigo_seccion = f"{grado}{letra}-{turno}"
-
-            progress_callback.emit(80, "Insertando nueva sección...")
-            cursor.execute("""
-                INSERT INTO SECCION (
-                    codigo, letra, codigo_grado, turno,
-                    cedula_docente_guia, aula_asignada,
-                    capacidad_maxima, total_estudiantes,
-                    estudiantes_varones, estudiantes_hembras,
-                    codigo_ano_escolar
-                ) VALUES (%s, %s, %s, %s, %s, %s, %s, 0, 0, 0, %s)
-            """, (
-                codigo_seccion, letra, grado, turno,
-                docente, aula,
-                capacidad_maxima,
-                codigo_ano_escolar
-            ))
-
-            conn.commit()
-            progress_callback.emit(100, "Sección asignada correctamente.")
-            return {"codigo_seccion": codigo_seccion, "aula": aula}
-
-        except psycopg2.Error as e:
-            if conn:
-                conn.rollback()
-            logger.error(f"Error de PostgreSQL al asignar sección: {e}", exc_info=True)
-            raise Exception(f"Error en la base de datos al asignar la sección: {e.pgerror or e}")
-        except Exception as e:
-            if conn:
-                conn.rollback()
-            logger.error(f"Error inesperado al asignar sección: {e}", exc_info=True)
-            raise Exception(f"Ocurrió un error inesperado: {e}")
-        finally:
-            if conn:
-                conn.close()
+        return self.servicio.asignar_seccion(grado, letra, turno, docente, aula_manual, capacidad_maxima,
+                                             progreso=progress_callback.emit)
 
     def _handle_asignar_seccion_result(self, result):
         QMessageBox.information(self, "Éxito",
                                 f"Sección asignada correctamente:\nCódigo: {result['codigo_seccion']}\nAula: {result['aula']}")
         self.limpiar_formulario()
-        self.cargar_secciones()
+        self._aplicar_escritura(result["cambios"])
 
     def _perform_actualizar_seccion(self, progress_callback, codigo_seccion, grado, letra, turno, docente, aula_manual, capacidad_maxima):
-        conn = None
-        try:
-            conn = conectar_db()
-            cursor = conn.cursor()
-
-            progress_callback.emit(10, "Verificando año escolar activo...")
-            cursor.execute("SELECT codigo FROM ANO_ESCOLAR WHERE activo = TRUE LIMIT 1")
-            resultado = cursor.fetchone()
-            if not resultado:
-                raise ValueError("No hay un año escolar activo registrado. Por favor, configure uno.")
-            codigo_ano_escolar = resultado[0]
-
-            # Verificar si el docente ya está asignado a otra sección (excluyendo la sección actual)
-            progress_callback.emit(20, "Verificando asignación de docente...")
-            cursor.execute("""
-                SELECT codigo FROM SECCION
-                WHERE cedula_docente_guia = %s AND codigo_ano_escolar = %s AND codigo != %s
-            """, (docente, codigo_ano_escolar, codigo_seccion))
-            docente_asignado = cursor.fetchone()
-            if docente_asignado:
-                raise ValueError(f"Este docente ya está asignado a la sección {docente_asignado[0]} para el año escolar actual.")
-
-            aula_to_update = aula_manual if aula_manual else None
-
-            progress_callback.emit(30, "Verificando aula manual (si aplica)...")
-            if aula_to_update:
-                cursor.execute("""
-                    SELECT 1 FROM SECCION
-                    WHERE aula_asignada = %s AND codigo_grado = %s AND turno = %s AND codigo_ano_escolar = %s AND codigo != %s
-                """, (aula_to_update, grado, turno, codigo_ano_escolar, codigo_seccion))
-                if cursor.fetchone():
-                    raise ValueError(f"El aula {aula_to_update} ya está asignada en este grado y turno para el año escolar actual (otra sección).")
-
-            progress_callback.emit(80, "Actualizando sección...")
-            cursor.execute("""
-                UPDATE SECCION SET
-                    cedula_docente_guia = %s,
-                    aula_asignada = %s,
-                    capacidad_maxima = %s
-                WHERE codigo = %s AND codigo_ano_escolar = %s
-            """, (
-                docente, aula_to_update, capacidad_maxima,
-                codigo_seccion, codigo_ano_escolar
-            ))
-
-            if cursor.rowcount == 0:
-                raise ValueError(f"No se encontró la sección {codigo_seccion} para actualizar o no hubo cambios.")
-
-            conn.commit()
-            progress_callback.emit(100, "Sección actualizada correctamente.")
-            return {"codigo_seccion": codigo_seccion}
-
-        except psycopg2.Error as e:
-            if conn:
-                conn.rollback()
-            logger.error(f"Error de PostgreSQL al actualizar sección: {e}", exc_info=True)
-            raise Exception(f"Error en la base de datos al actualizar la sección: {e.pgerror or e}")
-        except Exception as e:
-            if conn:
-                conn.rollback()
-            logger.error(f"Error inesperado al actualizar sección: {e}", exc_info=True)
-            raise Exception(f"Ocurrió un error inesperado: {e}")
-        finally:
-            if conn:
-                conn.close()
+        return self.servicio.actualizar_seccion(codigo_seccion, grado, letra, turno, docente, aula_manual,
+                                                capacidad_maxima, progreso=progress_callback.emit)
 
     def _handle_actualizar_seccion_result(self, result):
         QMessageBox.information(self, "Éxito",
                                 f"Sección {result['codigo_seccion']} actualizada correctamente.")
         self.cancelar_edicion() # Volver al modo asignación y limpiar
-        self.cargar_secciones()
+        self._aplicar_escritura(result["cambios"])
 
     def editar_seccion(self):
         selected_rows = self.tabla_secciones.selectionModel().selectedRows()
@@ -781,38 +1448,20 @@ class ModuloInstitucion(QWidget):
             return
 
         row = selected_rows[0].row()
-        codigo_seccion = self.tabla_secciones.item(row, 0).text() # Columna 0 es el código
+        codigo_seccion = self.tabla_model.codigo(row)
 
         self._run_db_operation(
             self._perform_cargar_seccion_para_edicion,
-            self._handle_cargar_seccion_para_edicion_result,
+            lambda seccion_data, c=codigo_seccion: self._handle_cargar_seccion_para_edicion_result(c, seccion_data),
             self._handle_db_error,
             codigo_seccion=codigo_seccion
         )
 
     def _perform_cargar_seccion_para_edicion(self, progress_callback, codigo_seccion):
-        conn = None
-        try:
-            conn = conectar_db()
-            cursor = conn.cursor()
-            progress_callback.emit(10, "Cargando datos de la sección...")
-            cursor.execute("""
-                SELECT codigo_grado, letra, turno, cedula_docente_guia, aula_asignada, capacidad_maxima
-                FROM SECCION
-                WHERE codigo = %s
-            """, (codigo_seccion,))
-            seccion_data = cursor.fetchone()
-            if not seccion_data:
-                raise ValueError(f"No se encontró la sección con código {codigo_seccion}.")
-            progress_callback.emit(100, "Datos de la sección cargados.")
-            return {"codigo_seccion": codigo_seccion, "data": seccion_data}
-        finally:
-            if conn:
-                conn.close()
+        return self.servicio.cargar_seccion(codigo_seccion, progreso=progress_callback.emit)
 
-    def _handle_cargar_seccion_para_edicion_result(self, result):
-        codigo_seccion = result["codigo_seccion"]
-        grado, letra, turno, docente_cedula, aula, capacidad_maxima = result["data"]
+    def _handle_cargar_seccion_para_edicion_result(self, codigo_seccion, seccion_data):
+        grado, letra, turno, docente_cedula, aula, capacidad_maxima, nombres, apellidos = seccion_data
 
         self.input_grado.setText(str(grado))
         self.input_letra.setCurrentText(letra)
@@ -821,13 +1470,14 @@ class ModuloInstitucion(QWidget):
         self.input_aula.setText(aula if aula else "")
 
         # Seleccionar el docente en el ComboBox
-        index = self.input_docente_combo.findData(docente_cedula)
-        if index != -1:
-            self.input_docente_combo.setCurrentIndex(index)
+        if nombres is not None:
+            self._seleccionar_docente(docente_cedula, f"{nombres} {apellidos} ({docente_cedula})")
         else:
-            # Si el docente no está en la lista (ej. fue eliminado), seleccionar la opción por defecto
-            self.input_docente_combo.setCurrentIndex(0)
-            QMessageBox.warning(self, "Docente no encontrado", f"El docente con cédula {docente_cedula} no se encontró en la lista. Por favor, seleccione uno nuevo.")
+            # Sin docente guía (sección generada sin él) o docente ya no registrado (ej. fue eliminado):
+            # dejar el selector vacío; solo el segundo caso se advierte
+            self.input_docente_combo.setCurrentIndex(-1)
+            if docente_cedula is not None:
+                QMessageBox.warning(self, "Docente no encontrado", f"El docente con cédula {docente_cedula} no se encontró en la lista. Por favor, seleccione uno nuevo.")
 
         self.seccion_editando_codigo = codigo_seccion
         self._update_buttons_state() # Actualizar UI al modo edición
@@ -845,7 +1495,7 @@ class ModuloInstitucion(QWidget):
 
         codigos_a_eliminar = []
         for row_index in selected_rows:
-            codigos_a_eliminar.append(self.tabla_secciones.item(row_index.row(), 0).text())
+            codigos_a_eliminar.append(self.tabla_model.codigo(row_index.row()))
 
         if len(codigos_a_eliminar) == 1:
             msg_text = f"¿Está seguro de que desea eliminar la sección '{codigos_a_eliminar[0]}'? Esta acción no se puede deshacer."
@@ -865,75 +1515,144 @@ class ModuloInstitucion(QWidget):
             )
 
     def _perform_eliminar_seccion(self, progress_callback, codigos_seccion):
-        conn = None
-        try:
-            conn = conectar_db()
-            cursor = conn.cursor()
-            
-            deleted_count = 0
-            failed_deletions = []
-
-            for i, codigo in enumerate(codigos_seccion):
-                progress_callback.emit(int((i / len(codigos_seccion)) * 100), f"Eliminando sección {codigo}...")
-                try:
-                    cursor.execute("DELETE FROM SECCION WHERE codigo = %s", (codigo,))
-                    if cursor.rowcount > 0:
-                        deleted_count += 1
-                    else:
-                        failed_deletions.append(f"Sección {codigo} no encontrada.")
-                except psycopg2.Error as e:
-                    # Capturar errores individuales de eliminación (ej. FK)
-                    if "violates foreign key constraint" in str(e):
-                        failed_deletions.append(f"Sección {codigo}: No se puede eliminar porque tiene datos relacionados. ({e.pgcode})")
-                    else:
-                        failed_deletions.append(f"Sección {codigo}: Error de base de datos. ({e.pgcode})")
-                    logger.error(f"Error al eliminar sección {codigo}: {e}", exc_info=True)
-                    # No hacer rollback aquí, para intentar eliminar las demás
-            
-            conn.commit() # Commit al final de todas las operaciones
-            progress_callback.emit(100, "Operación de eliminación completada.")
-
-            if failed_deletions:
-                error_msg = "Algunas secciones no pudieron ser eliminadas:\n" + "\n".join(failed_deletions)
-                raise Exception(error_msg)
-            
-            return {"deleted_count": deleted_count}
-
-        except Exception as e:
-            if conn:
-                conn.rollback() # Rollback si hay un error general o si se lanza una excepción personalizada
-            logger.error(f"Error inesperado al eliminar secciones: {e}", exc_info=True)
-            raise Exception(f"Ocurrió un error inesperado durante la eliminación: {e}")
-        finally:
-            if conn:
-                conn.close()
+        return self.servicio.eliminar_secciones(codigos_seccion, progreso=progress_callback.emit)
 
     def _handle_eliminar_seccion_result(self, result):
         deleted_count = result.get("deleted_count", 0)
-        QMessageBox.information(self, "Éxito",
-                                f"{deleted_count} sección(es) eliminada(s) correctamente.")
-        self.cargar_secciones() # Recargar la tabla
-
-    def _get_available_aula_db(self, grado, cursor):
-        """
-        Obtiene un aula disponible para el grado especificado usando el cursor proporcionado.
-        """
-        rango_base = int(grado) * 100
-        rango_min = rango_base
-        rango_max = rango_base + 99
-
-        cursor.execute("""
-            SELECT aula_asignada FROM SECCION
-            WHERE aula_asignada BETWEEN %s AND %s
-            ORDER BY aula_asignada DESC LIMIT 1
-        """, (str(rango_min), str(rango_max)))
-
-        ultima_aula = cursor.fetchone()
-        if ultima_aula is None:
-            return str(rango_min)
+        omitidas = [f"Sección {codigo}: No se puede eliminar porque tiene datos relacionados."
+                    for codigo in result["con_dependencias"]]
+        omitidas += [f"Sección {codigo} no encontrada." for codigo in result["no_encontradas"]]
+        if omitidas:
+            QMessageBox.warning(self, "Eliminación Parcial",
+                                f"{deleted_count} sección(es) eliminada(s) correctamente.\n\n"
+                                "Algunas secciones no pudieron ser eliminadas:\n" + "\n".join(omitidas))
         else:
-            nueva_aula = int(ultima_aula[0]) + 1
-            return str(nueva_aula) if nueva_aula <= rango_max else None
+            QMessageBox.information(self, "Éxito",
+                                    f"{deleted_count} sección(es) eliminada(s) correctamente.")
+        self._aplicar_escritura(result["cambios"])
+
+    def importar_csv(self):
+        ruta, _ = QFileDialog.getOpenFileName(self, "Importar Secciones", "", "Archivos CSV (*.csv);;Todos los archivos (*)")
+        if not ruta:
+            return
+        self._run_db_operation(
+            self._perform_importar_csv,
+            self._handle_importar_csv_result,
+            self._handle_db_error,
+            ruta=ruta
+        )
+
+    def _perform_importar_csv(self, progress_callback, ruta):
+        return self.servicio.importar_csv(ruta, progreso=progress_callback.emit)
+
+    def _handle_importar_csv_result(self, result):
+        errores = result["errores"]
+        if errores:
+            detalle = "\n".join(f"Línea {numero_linea}: {mensaje}" for numero_linea, mensaje in errores[:15])
+            if len(errores) > 15:
+                detalle += f"\n... y {len(errores) - 15} errores más."
+            QMessageBox.warning(self, "Importación Rechazada",
+                                f"No se importó ninguna sección porque {len(errores)} fila(s) tienen errores:\n\n{detalle}")
+            return
+        QMessageBox.information(self, "Importación Completada",
+                                f"Se importaron {len(result['secciones'])} secciones correctamente.")
+        if not self._cambios_en_vivo():
+            self.page_cache.invalidar(result["ano_escolar"], claves=[
+                (s["grado"], s["letra"], s["turno"], s["codigo"]) for s in result["secciones"]])
+            self.cargar_secciones()
+
+    def generar_grilla(self):
+        dialogo = DialogoGrilla(self)
+        if dialogo.exec() != QDialog.DialogCode.Accepted:
+            return
+        self._planificar_grilla(dialogo.especificacion())
+
+    def _planificar_grilla(self, especificacion, plan_previsto=None, confirmar=False):
+        self._run_db_operation(
+            self._perform_generar_grilla,
+            lambda result, e=especificacion: self._handle_generar_grilla_result(e, result),
+            self._handle_db_error,
+            especificacion=especificacion, confirmar=confirmar, plan_previsto=plan_previsto
+        )
+
+    def _perform_generar_grilla(self, progress_callback, especificacion, confirmar, plan_previsto):
+        return self.servicio.generar_grilla(**especificacion, confirmar=confirmar, plan_previsto=plan_previsto,
+                                            progreso=progress_callback.emit)
+
+    @staticmethod
+    def _lineas_limitadas(lineas, limite=15):
+        texto = "\n".join(lineas[:limite])
+        if len(lineas) > limite:
+            texto += f"\n... y {len(lineas) - limite} más."
+        return texto
+
+    def _handle_generar_grilla_result(self, especificacion, result):
+        secciones, conflictos = result["secciones"], result["conflictos"]
+        if result["insertadas"]:
+            QMessageBox.information(self, "Secciones Generadas",
+                                    f"Se crearon {len(secciones)} secciones correctamente.")
+            if not self._cambios_en_vivo():
+                self.page_cache.invalidar(result["ano_escolar"], claves=[
+                    (s["grado"], s["letra"], s["turno"], s["codigo"]) for s in secciones])
+                self.cargar_secciones()
+            return
+
+        texto = ""
+        if result["plan_cambiado"]:
+            texto = "Las secciones del año escolar cambiaron desde la vista previa. Revise el nuevo plan.\n\n"
+        if conflictos:
+            texto += (f"{len(conflictos)} combinación(es) con conflictos, que se omitirán:\n"
+                      + self._lineas_limitadas([f"{codigo}: {mensaje}" for codigo, mensaje in conflictos]) + "\n\n")
+        if not secciones:
+            QMessageBox.warning(self, "Generar Secciones", texto + "No hay secciones por crear.")
+            return
+        texto += (f"Se crearán {len(secciones)} secciones en el año escolar {result['ano_escolar']}:\n"
+                  + self._lineas_limitadas([f"{s['codigo']}: aula {s['aula']}, "
+                                            + (f"docente {s['docente']}" if s["docente"] else "sin docente guía")
+                                            for s in secciones])
+                  + "\n\n¿Desea crear las secciones?")
+        respuesta = QMessageBox.question(self, "Vista Previa", texto,
+                                         QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
+        if respuesta == QMessageBox.StandardButton.Yes:
+            self._planificar_grilla(especificacion, plan_previsto=secciones, confirmar=True)
+
+    def exportar(self):
+        filtros = ["Archivos CSV (*.csv)"]
+        if EXCEL_DISPONIBLE:
+            filtros.append("Libros de Excel (*.xlsx)")
+        ruta, filtro = QFileDialog.getSaveFileName(self, "Exportar Secciones", "secciones.csv", ";;".join(filtros))
+        if not ruta:
+            return
+        formato = os.path.splitext(ruta)[1].lower().lstrip(".")
+        if formato not in ESCRITORES_EXPORTACION:
+            formato = "xlsx" if "xlsx" in filtro else "csv"
+            ruta += f".{formato}"
+
+        opciones = ["Vista actual (búsqueda y año escolar mostrados)"]
+        if self.ano_escolar_vista is not None:
+            opciones.append(f"Año escolar {self.ano_escolar_vista} completo")
+        opciones.append("Todos los años escolares")
+        alcance, ok = QInputDialog.getItem(self, "Exportar Secciones", "¿Qué secciones desea exportar?", opciones, 0, False)
+        if not ok:
+            return
+        indice = opciones.index(alcance)
+        search_term = self.search_term if indice == 0 else ""
+        ano_escolar = self.ano_escolar_vista if indice < len(opciones) - 1 else None
+
+        self._run_db_operation(
+            self._perform_exportar_secciones,
+            self._handle_exportar_secciones_result,
+            self._handle_db_error,
+            cancelable=True,
+            ruta=ruta, formato=formato, search_term=search_term, ano_escolar=ano_escolar, token=TokenCancelacion()
+        )
+
+    def _perform_exportar_secciones(self, progress_callback, ruta, formato, search_term, ano_escolar, token):
+        return self.servicio.exportar(ruta, formato, search_term, ano_escolar, progreso=progress_callback.emit, token=token)
+
+    def _handle_exportar_secciones_result(self, result):
+        QMessageBox.information(self, "Exportación Completada",
+                                f"Se exportaron {result['exportadas']} secciones a:\n{result['ruta']}")
 
     def delayed_search(self):
         """Inicia un temporizador para ejecutar la búsqueda después de un breve retraso."""
@@ -945,108 +1664,192 @@ class ModuloInstitucion(QWidget):
         if new_search_term != self.search_term:
             self.search_term = new_search_term
             self.current_page = 1 # Resetear a la primera página en una nueva búsqueda
-            self.cargar_secciones()
+            self.cargar_secciones(direccion="primera")
+
+    def cambiar_tamano_pagina(self):
+        self.page_size = self.input_page_size.currentData()
+        self.current_page = 1
+        self.cargar_secciones(direccion="primera")
 
     def go_to_first_page(self):
         if self.current_page > 1:
             self.current_page = 1
-            self.cargar_secciones()
+            self.cargar_secciones(direccion="primera")
 
     def go_to_prev_page(self):
         if self.current_page > 1:
             self.current_page -= 1
-            self.cargar_secciones()
+            self.cargar_secciones(direccion="anterior")
 
     def go_to_next_page(self):
         if self.current_page < self.total_pages:
             self.current_page += 1
-            self.cargar_secciones()
+            self.cargar_secciones(direccion="siguiente")
 
     def go_to_last_page(self):
         if self.current_page < self.total_pages:
             self.current_page = self.total_pages
-            self.cargar_secciones()
+            self.cargar_secciones(direccion="ultima")
+
+    def cargar_secciones(self, show_progress_dialog=True, direccion="actual"):
+        """
+        Carga una página de secciones usando paginación por clave (keyset).
 
-    def cargar_secciones(self, show_progress_dialog=True):
-        offset = (self.current_page - 1) * self.page_size
-        limit = self.page_size
+        direccion indica la página a cargar respecto a la actual: "primera",
+        "anterior", "siguiente", "ultima" o "actual" (recargar la misma página).
+        Si la página y el total están en la caché se muestran sin consultar la base de datos.
+        """
+        self._cancelar_carga_tabla()
+        self._generacion_tabla += 1
         search_term = self.search_term
+        clave = None
+        if direccion == "anterior":
+            clave = self.page_first_key
+        elif direccion == "siguiente":
+            clave = self.page_last_key
+        elif direccion == "actual":
+            clave = self.page_first_key
+        if clave is None and direccion != "ultima":
+            direccion = "primera"
+            self.current_page = 1
 
-        self._run_db_operation(
+        total_cacheado = self.page_cache.total(search_term, self.ano_escolar_vista)
+        if total_cacheado is not None:
+            pagina = self.current_page
+            if direccion == "ultima":
+                pagina = max(1, (total_cacheado + self.page_size - 1) // self.page_size)
+            resultado = self.page_cache.obtener(search_term, pagina, self.page_size, self.ano_escolar_vista)
+            if resultado is not None:
+                self.current_page = pagina
+                self._mostrar_pagina(resultado, total_cacheado)
+                return
+
+        # La carga no bloquea el formulario: se puede seguir escribiendo en la búsqueda o
+        # cambiando de página, y cada carga nueva reemplaza a la anterior.
+        generacion = self._generacion_tabla
+        token = TokenCancelacion()
+        self._cambios_durante_carga = False # Esta carga ya incluye los cambios avisados
+        worker = self._run_db_operation(
             self._perform_cargar_secciones,
-            self._handle_cargar_secciones_result,
-            self._handle_db_error,
+            lambda result, g=generacion: self._handle_cargar_secciones_result(result, g),
+            lambda error, g=generacion: self._handle_db_error(error) if g == self._generacion_tabla else None,
             show_progress_dialog=show_progress_dialog,
-            offset=offset, limit=limit, search_term=search_term
+            bloquear_ui=False,
+            search_term=search_term, direccion=direccion, clave=clave,
+            limit=self.page_size, total_records=total_cacheado, token=token
+        )
+        self._carga_tabla = (worker, token)
+        # Si la carga falla no llega al manejador del resultado: olvidarla al terminar
+        worker.signals.finished.connect(lambda w=worker: self._carga_tabla_terminada(w))
+
+    def _carga_tabla_terminada(self, worker):
+        # El QThreadPool elimina el worker al terminar: no se puede retirar después
+        if self._carga_tabla is not None and self._carga_tabla[0] is worker:
+            self._carga_tabla = None
+
+    def _cancelar_carga_tabla(self):
+        """Descarta la carga de la tabla en curso: la quita de la cola o cancela su consulta en el servidor."""
+        if self._carga_tabla is None:
+            return
+        worker, token = self._carga_tabla
+        self._carga_tabla = None
+        token.cancelar()
+        worker.traza.estado = "cancelada"
+        if self.motor.retirar(worker):
+            # El worker nunca se ejecutará: cerrar su diálogo de progreso como si hubiera terminado
+            worker.signals.finished.emit()
+
+    def _precargar_paginas_vecinas(self):
+        """Consulta en segundo plano las páginas anterior y siguiente si no están en la caché."""
+        vecinas = (
+            (self.current_page + 1, "siguiente", self.page_last_key),
+            (self.current_page - 1, "anterior", self.page_first_key),
         )
+        for pagina, direccion, clave in vecinas:
+            if pagina < 1 or pagina > self.total_pages or clave is None:
+                continue
+            clave_cache = (self.search_term, pagina, self.page_size, self.ano_escolar_vista)
+            if clave_cache in self._precargas_en_curso or self.page_cache.obtener(*clave_cache) is not None:
+                continue
+            self._precargas_en_curso.add(clave_cache)
+            version = self.page_cache.version
+            self._run_db_background(
+                self._perform_cargar_secciones,
+                lambda result, c=clave_cache, v=version: self._handle_precarga_result(result, c, v),
+                finished_slot=lambda c=clave_cache: self._precargas_en_curso.discard(c),
+                search_term=self.search_term, direccion=direccion, clave=clave,
+                limit=self.page_size, total_records=self.total_records
+            )
 
-    def _perform_cargar_secciones(self, progress_callback, offset, limit, search_term):
-        conn = None
-        try:
-            conn = conectar_db()
-            cursor = conn.cursor()
-            
-            # Construir la cláusula WHERE para la búsqueda
-            where_clause = ""
-            params = []
-            if search_term:
-                search_pattern = f"%{search_term}%"
-                where_clause = """
-                    WHERE s.codigo ILIKE %s OR s.codigo_grado::text ILIKE %s OR s.letra ILIKE %s OR s.aula_asignada ILIKE %s OR p.nombres ILIKE %s OR p.apellidos ILIKE %s
-                """
-                params = [search_pattern] * 6 # Repetir el patrón para cada columna
-
-            # Consulta para obtener el total de registros (para paginación)
-            cursor.execute(f"""
-                SELECT COUNT(*)
-                FROM SECCION s
-                JOIN PERSONAL p ON s.cedula_docente_guia = p.cedula
-                {where_clause}
-            """, params)
-            total_records = cursor.fetchone()[0]
-
-            progress_callback.emit(20, "Cargando secciones...")
-            # Consulta para obtener los registros de la página actual
-            cursor.execute(f"""
-                SELECT s.codigo, s.codigo_grado, s.letra, s.turno, s.aula_asignada, 
-                       p.nombres || ' ' || p.apellidos || ' (' || s.cedula_docente_guia || ')' as docente_info,
-                       s.capacidad_maxima
-                FROM SECCION s
-                JOIN PERSONAL p ON s.cedula_docente_guia = p.cedula
-                {where_clause}
-                ORDER BY s.codigo_grado, s.letra
-                LIMIT %s OFFSET %s
-            """, params + [limit, offset])
-            secciones = cursor.fetchall()
-            
-            progress_callback.emit(100, "Secciones cargadas.")
-            return {"secciones": secciones, "total_records": total_records}
-        except psycopg2.Error as e:
-            logger.error(f"Error de PostgreSQL al cargar secciones: {e}", exc_info=True)
-            raise Exception(f"Error en la base de datos al cargar las secciones: {e.pgerror or e}")
-        except Exception as e:
-            logger.error(f"Error inesperado al cargar secciones: {e}", exc_info=True)
-            raise Exception(f"Ocurrió un error inesperado al cargar las secciones: {e}")
-        finally:
-            if conn:
-                conn.close()
+    def _handle_precarga_result(self, result, clave_cache, version):
+        # Descartar precargas iniciadas antes de la última invalidación de la caché
+        if version != self.page_cache.version or not result["secciones"]:
+            return
+        search_term, pagina, page_size, _ = clave_cache
+        if result["direccion"] == "primera":
+            pagina = 1
+        self.page_cache.guardar(search_term, pagina, page_size, result["ano_escolar"], result)
+
+    def _cargar_resumen(self):
+        """Consulta en segundo plano los totales de la pestaña Resumen."""
+        self._run_db_background(self._perform_resumen_secciones, self.panel_resumen.mostrar)
+
+    def _perform_resumen_secciones(self, progress_callback):
+        return self.servicio.resumen_secciones()
+
+    def _perform_cargar_secciones(self, progress_callback, search_term, direccion, clave, limit, total_records, token=None):
+        return self.servicio.cargar_pagina(search_term, direccion, clave, limit, total_records,
+                                           progreso=progress_callback.emit, token=token)
+
+    def _handle_cargar_secciones_result(self, result, generacion):
+        if generacion != self._generacion_tabla:
+            return # Una carga más reciente reemplazó a esta
+        self._carga_tabla = None
+        total_records = result["total_records"]
+        self.ano_escolar_vista = result["ano_escolar"]
+        self.page_cache.guardar_total(result["search_term"], self.ano_escolar_vista, total_records)
+        total_pages = max(1, (total_records + self.page_size - 1) // self.page_size)
+
+        if not result["secciones"] and self.current_page > 1:
+            # La página quedó vacía (p. ej. se eliminaron sus filas): ir a la última página disponible
+            self.page_cache.invalidar(self.ano_escolar_vista)
+            self.cargar_secciones(show_progress_dialog=False, direccion="ultima")
+            return
 
-    def _handle_cargar_secciones_result(self, result):
+        if result["direccion"] == "primera":
+            self.current_page = 1
+        elif result["direccion"] == "ultima":
+            self.current_page = total_pages
+        self.page_cache.guardar(result["search_term"], self.current_page, self.page_size,
+                                self.ano_escolar_vista, result)
+        instantanea_reemplazada, self._mostrando_instantanea = self._mostrando_instantanea, False
+        self._mostrar_pagina(result, total_records)
+        if self._cambios_durante_carga:
+            self.page_cache.invalidar(self.ano_escolar_vista)
+            self._recargar_pagina_actual()
+        if not self._datos_actualizados:
+            self._datos_actualizados = True
+            if not instantanea_reemplazada:
+                marcar_arranque("datos_en_pantalla")
+            marcar_arranque("datos_actualizados")
+            if MEDIR_ARRANQUE:
+                QTimer.singleShot(0, self.close)
+
+    def _mostrar_pagina(self, result, total_records, precargar=True):
         secciones = result["secciones"]
-        self.total_records = result["total_records"]
+        self.total_records = total_records
         self.total_pages = (self.total_records + self.page_size - 1) // self.page_size
         if self.total_pages == 0: # Si no hay registros, al menos 1 página
             self.total_pages = 1
             self.current_page = 1 # Asegurarse de que la página actual sea 1
+        self.page_first_key = result["primera_clave"]
+        self.page_last_key = result["ultima_clave"]
 
-        self.tabla_secciones.setRowCount(len(secciones))
-        for row_idx, row_data in enumerate(secciones):
-            for col_idx, col_data in enumerate(row_data):
-                item = QTableWidgetItem(str(col_data))
-                item.setFlags(item.flags() ^ Qt.ItemFlag.ItemIsEditable)
-                self.tabla_secciones.setItem(row_idx, col_idx, item)
+        self.tabla_model.establecer_filas(secciones)
         
         self._update_buttons_state() # Actualizar estado de botones de paginación y otros
+        if precargar:
+            self._precargar_paginas_vecinas()
 
     def _handle_db_error(self, error_tuple):
         exctype, value, traceback_str = error_tuple
@@ -1056,15 +1859,167 @@ class ModuloInstitucion(QWidget):
         self.input_grado.clear()
         self.input_letra.setCurrentIndex(0)
         self.input_turno.setCurrentIndex(0)
-        self.input_docente_combo.setCurrentIndex(0)
+        self.input_docente_combo.setCurrentIndex(-1)
+        self.input_docente_combo.clearEditText()
         self.input_capacidad_maxima.clear()
         self.input_aula.clear()
         self._clear_error_style(self.input_grado)
         self._clear_error_style(self.input_docente_combo)
         self._clear_error_style(self.input_capacidad_maxima)
 
+    def _sincronizar_replica(self, direccion=None):
+        """
+        Trae a la réplica local los cambios del servidor. Después recarga la tabla en la
+        dirección indicada o, sin dirección, solo si llegaron cambios.
+        """
+        if self._sincronizando_replica:
+            # Se repite al terminar la sincronización en curso, que pudo empezar antes del cambio
+            if direccion and self._recarga_replica_pendiente != "primera":
+                self._recarga_replica_pendiente = direccion
+            return
+        self._sincronizando_replica = True
+        def terminar():
+            self._sincronizando_replica = False
+            if self._recarga_replica_pendiente:
+                pendiente, self._recarga_replica_pendiente = self._recarga_replica_pendiente, None
+                self._sincronizar_replica(pendiente)
+        self._run_db_background(self._perform_sincronizar_replica,
+                                lambda result: self._handle_sincronizar_replica(result, direccion),
+                                finished_slot=terminar)
+
+    def _perform_sincronizar_replica(self, progress_callback):
+        return self.servicio.sincronizar()
+
+    def _handle_sincronizar_replica(self, result, direccion):
+        if result["completa"]:
+            direccion = "primera" # Las claves de la página actual pueden venir del servidor
+        elif direccion is None and result["filas"]:
+            direccion = "actual"
+        if direccion is None:
+            return
+        self.page_cache.invalidar()
+        self._docentes_cache.clear()
+        if direccion == "primera":
+            self.current_page = 1
+        self.cargar_secciones(show_progress_dialog=False, direccion=direccion)
+
+    def _cambios_en_vivo(self):
+        """True si el servidor avisa cada cambio de SECCION por CANAL_SECCIONES."""
+        return "notificaciones_secciones" in ESQUEMA_DISPONIBLE
+
+    def _aplicar_escritura(self, cambios):
+        """
+        Aplica a la tabla las filas que retornó una escritura propia. Si el servidor avisa los
+        cambios por CANAL_SECCIONES ya llegan (o llegarán) por ese canal y no se aplican dos veces.
+        """
+        if self._cambios_en_vivo():
+            return
+        for cambio in cambios:
+            self._aplicar_cambio_seccion(cambio)
+
+    def _recargar_pagina_actual(self):
+        """Vuelve a consultar la página visible; con la réplica local, después de sincronizarla."""
+        if self.replica:
+            self._sincronizar_replica("actual")
+        else:
+            self.cargar_secciones(show_progress_dialog=False, direccion="actual")
+
+    def _aplicar_cambio_seccion(self, cambio):
+        """
+        Aplica a la página visible un cambio con el formato de los avisos de CANAL_SECCIONES
+        (recibido por el canal o retornado por una escritura): reemplaza, inserta o quita solo
+        esa fila y ajusta el total, sin volver a consultar. Con una búsqueda activa el filtro se
+        evalúa en el servidor, así que la página se recarga.
+        """
+        op = cambio["op"]
+        if op == "*": # Muchas filas o TRUNCATE
+            self.page_cache.invalidar()
+            self._recargar_pagina_actual()
+            return
+        if op == "D":
+            fila = None
+            clave = tuple(cambio["clave"])
+        else:
+            fila = tuple(cambio["fila"])
+            clave = (fila[1], fila[2], fila[3], fila[0])
+        codigo = clave[-1]
+        if op == "U":
+            self.page_cache.invalidar(cambio["ano"], codigos=[codigo], desplaza_filas=False)
+        else:
+            # La clave basta: el código de una fila insertada no está en ninguna página en caché
+            self.page_cache.invalidar(cambio["ano"], claves=[clave])
+        if self.ano_escolar_vista is not None and cambio["ano"] != self.ano_escolar_vista:
+            return
+        if self._carga_tabla is not None:
+            # La carga en curso pudo leer antes del cambio: se repite cuando termine
+            self._cambios_durante_carga = True
+            return
+        if self.search_term:
+            self._recargar_pagina_actual()
+            return
+
+        filas = self.tabla_model.filas()
+        visible = any(f[0] == codigo for f in filas)
+        if op == "D":
+            self.total_records = max(0, self.total_records - 1)
+            if visible:
+                self.tabla_model.eliminar_fila(codigo)
+        elif visible:
+            self.tabla_model.reemplazar_fila(fila)
+        elif op == "U":
+            return # Fila de otra página
+        else:
+            self.total_records += 1
+            posicion = bisect.bisect([(f[1], f[2], f[3], f[0]) for f in filas], clave)
+            # Antes de la primera fila pertenece a la página anterior; después de la última, a la
+            # siguiente, salvo que esta sea la última página y no esté completa
+            if (posicion > 0 or self.current_page == 1) and (posicion < len(filas) or len(filas) < self.page_size):
+                self.tabla_model.insertar_fila(posicion, fila)
+                if len(filas) + 1 > self.page_size:
+                    self.tabla_model.eliminar_fila(self.tabla_model.filas()[-1][0])
+
+        filas = self.tabla_model.filas()
+        if not filas and self.total_records:
+            self._recargar_pagina_actual() # Se quitaron todas las filas de la página
+            return
+        self.page_first_key = (filas[0][1], filas[0][2], filas[0][3], filas[0][0]) if filas else None
+        self.page_last_key = (filas[-1][1], filas[-1][2], filas[-1][3], filas[-1][0]) if filas else None
+        self.total_pages = max(1, (self.total_records + self.page_size - 1) // self.page_size)
+        self.page_cache.guardar_total("", self.ano_escolar_vista, self.total_records)
+        self.page_cache.guardar("", self.current_page, self.page_size, self.ano_escolar_vista, {
+            "secciones": filas, "total_records": self.total_records, "search_term": "",
+            "ano_escolar": self.ano_escolar_vista, "direccion": "actual",
+            "primera_clave": self.page_first_key, "ultima_clave": self.page_last_key,
+        })
+        self._update_buttons_state()
+
+    def _procesar_notificacion(self, canal, payload):
+        if canal == CANAL_SECCIONES:
+            self._aplicar_cambio_seccion(json.loads(payload))
+        elif canal in (CANAL_ANO_ESCOLAR, CANAL_RECONEXION):
+            # Cambió el año escolar (o pudo cambiar sin que llegara el aviso): volver a consultarlo
+            self.contexto_ano.invalidar()
+            if self.replica:
+                self._sincronizar_replica("primera")
+                return
+            self.page_cache.invalidar()
+            self.current_page = 1
+            self.cargar_secciones(show_progress_dialog=False, direccion="primera")
+
+    def closeEvent(self, event):
+        self._guardar_instantanea()
+        self._cancelar_carga_tabla()
+        self.escucha_notificaciones.detener()
+        self.motor.cerrar()
+        if self.replica:
+            self.replica_timer.stop()
+            self.replica.cerrar()
+        self.db_pool.cerrar() # Las conexiones aún en uso se cierran al devolverse
+        super().closeEvent(event)
+
 
 if __name__ == "__main__":
+    marcar_arranque("modulos_cargados")
     app = QApplication(sys.argv)
     ventana = ModuloInstitucion()
     ventana.show()
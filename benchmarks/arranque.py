@@ -0,0 +1,88 @@
+"""
+Mide el arranque en frío de la aplicación (Secciones_Alan.py).
+
+Cada repetición inicia un proceso nuevo y registra cuándo informa cada hito por la salida
+estándar (SIGME_MEDIR_ARRANQUE=1): módulos cargados, primer pintado de la ventana, datos en
+pantalla y datos actualizados desde el servidor. Se mide sin instantánea (primer inicio) y
+con la instantánea que la aplicación guarda al cerrarse. Usa la base de datos configurada en
+sigme_datos.DB_PARAMS y, por defecto, la plataforma "offscreen" de Qt.
+
+    python benchmarks/arranque.py --repeticiones 10 --salida arranque.json
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from sigme_datos import percentil
+
+APLICACION = os.path.join(RAIZ, "Secciones_Alan.py")
+HITOS = ("modulos_cargados", "primer_pintado", "datos_en_pantalla", "datos_actualizados")
+
+def arrancar(directorio, instantanea, tiempo_maximo):
+    """Inicia la aplicación una vez y retorna {hito: segundos desde el inicio del proceso}."""
+    entorno = dict(os.environ, SIGME_MEDIR_ARRANQUE="1", SIGME_INSTANTANEA=instantanea)
+    inicio = time.perf_counter()
+    proceso = subprocess.Popen([sys.executable, APLICACION], cwd=directorio, env=entorno, text=True,
+                               stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    hitos = {}
+    try:
+        for linea in proceso.stdout:
+            if linea.startswith("SIGME_ARRANQUE "):
+                hitos[linea.split()[1]] = time.perf_counter() - inicio
+        proceso.wait(timeout=tiempo_maximo)
+    except subprocess.TimeoutExpired:
+        proceso.kill()
+        raise
+    faltantes = [hito for hito in HITOS if hito not in hitos]
+    if faltantes:
+        raise RuntimeError(f"La aplicación terminó sin informar: {', '.join(faltantes)}")
+    return hitos
+
+def medir_modo(directorio, con_instantanea, repeticiones, tiempo_maximo):
+    instantanea = os.path.join(directorio, "cache", "inicio.json")
+    if con_instantanea:
+        arrancar(directorio, instantanea, tiempo_maximo) # Crea la instantánea al cerrarse
+    mediciones = []
+    for _ in range(repeticiones):
+        if not con_instantanea and os.path.exists(instantanea):
+            os.remove(instantanea)
+        mediciones.append(arrancar(directorio, instantanea, tiempo_maximo))
+    return {
+        hito: {f"p{p}_ms": round(percentil(sorted(m[hito] for m in mediciones), p) * 1000, 1) for p in (50, 90)}
+        for hito in HITOS
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Mide el tiempo de arranque de la aplicación.")
+    parser.add_argument("--repeticiones", type=int, default=10)
+    parser.add_argument("--tiempo-maximo", type=float, default=60.0, help="Segundos de espera por arranque")
+    parser.add_argument("--ventana", action="store_true", help="Usar la pantalla real en lugar de Qt offscreen")
+    parser.add_argument("--salida", help="Archivo JSON donde guardar los resultados")
+    args = parser.parse_args()
+
+    if not args.ventana:
+        os.environ["QT_QPA_PLATFORM"] = "offscreen"
+    # Los logs y la instantánea de las mediciones quedan en un directorio temporal
+    with tempfile.TemporaryDirectory(prefix="sigme_arranque_") as directorio:
+        resultados = {
+            "sin_instantanea": medir_modo(directorio, False, args.repeticiones, args.tiempo_maximo),
+            "con_instantanea": medir_modo(directorio, True, args.repeticiones, args.tiempo_maximo),
+        }
+
+    print(f"{'Hito':<20} {'sin instantánea p50/p90':>24} {'con instantánea p50/p90':>24}")
+    for hito in HITOS:
+        sin, con = resultados["sin_instantanea"][hito], resultados["con_instantanea"][hito]
+        print(f"{hito:<20} {sin['p50_ms']:11.1f} /{sin['p90_ms']:8.1f} ms {con['p50_ms']:11.1f} /{con['p90_ms']:8.1f} ms")
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as archivo:
+            json.dump(resultados, archivo, indent=2, ensure_ascii=False)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Compara dos resultados de benchmarks/suite.py y señala las regresiones.
+
+Una operación retrocede si su p50 o p90 empeora más que el umbral (y más que el margen
+absoluto, para ignorar el ruido de operaciones de menos de un milisegundo) o si envía más
+consultas al servidor. El código de salida es 1 si hay alguna regresión.
+
+    python benchmarks/comparar.py resultados/anterior.json resultados/nuevo.json --umbral 20
+"""
+import argparse
+import json
+import sys
+
+def cargar(ruta):
+    with open(ruta, encoding="utf-8") as archivo:
+        return json.load(archivo)
+
+def variacion(anterior, nuevo):
+    return (nuevo - anterior) * 100 / anterior if anterior else 0.0
+
+def comparar(anterior, nuevo, umbral, margen_ms):
+    """Imprime la comparación por escala y operación; retorna la lista de regresiones."""
+    regresiones = []
+    for escala, datos_nuevos in nuevo["escalas"].items():
+        datos_anteriores = anterior["escalas"].get(escala)
+        if datos_anteriores is None:
+            print(f"Escala {escala}: sin datos en el resultado anterior")
+            continue
+        print(f"Escala {escala} ({datos_anteriores['secciones']} -> {datos_nuevos['secciones']} secciones)")
+        if datos_anteriores["esquema"] != datos_nuevos["esquema"]:
+            print(f"  Aviso: el esquema disponible cambió: {datos_anteriores['esquema']} -> {datos_nuevos['esquema']}")
+        for operacion, medida in datos_nuevos["operaciones"].items():
+            previa = datos_anteriores["operaciones"].get(operacion)
+            if previa is None:
+                print(f"  {operacion:<26} nueva")
+                continue
+            motivos = []
+            for campo in ("p50_ms", "p90_ms"):
+                cambio = variacion(previa[campo], medida[campo])
+                if cambio > umbral and medida[campo] - previa[campo] > margen_ms:
+                    motivos.append(f"{campo} +{cambio:.0f}%")
+            if medida["consultas"] > previa["consultas"]:
+                motivos.append(f"consultas {previa['consultas']} -> {medida['consultas']}")
+            print(f"  {operacion:<26} p50 {previa['p50_ms']:9.3f} -> {medida['p50_ms']:9.3f} ms "
+                  f"({variacion(previa['p50_ms'], medida['p50_ms']):+6.1f}%)  "
+                  f"consultas {previa['consultas']:3d} -> {medida['consultas']:3d}"
+                  f"{'  REGRESIÓN: ' + ', '.join(motivos) if motivos else ''}")
+            if motivos:
+                regresiones.append((escala, operacion, motivos))
+    return regresiones
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara dos resultados de la suite de rendimiento.")
+    parser.add_argument("anterior")
+    parser.add_argument("nuevo")
+    parser.add_argument("--umbral", type=float, default=20.0, help="Porcentaje de empeoramiento tolerado")
+    parser.add_argument("--margen-ms", type=float, default=0.5, help="Diferencia absoluta mínima para considerarla")
+    args = parser.parse_args()
+
+    anterior = cargar(args.anterior)
+    nuevo = cargar(args.nuevo)
+    print(f"{anterior.get('commit') or '?'} ({anterior['fecha']}) -> {nuevo.get('commit') or '?'} ({nuevo['fecha']})")
+    regresiones = comparar(anterior, nuevo, args.umbral, args.margen_ms)
+    if regresiones:
+        print(f"{len(regresiones)} regresión(es) detectada(s).")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
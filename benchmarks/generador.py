@@ -0,0 +1,185 @@
+"""
+Generador determinista de datos sintéticos para los benchmarks de SIGME2.
+
+Crea una base de datos desechable (sigme_bench_<escala>) con las tablas ANO_ESCOLAR, PERSONAL,
+SECCION y ESTUDIANTE y la llena con `escala` secciones. La misma semilla produce siempre los
+mismos datos. Si la base ya existe con la misma escala, semilla y versión del generador se
+reutiliza, porque generar un millón de filas toma varios minutos.
+
+    python benchmarks/generador.py --escala 100000
+"""
+import argparse
+import io
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import psycopg2
+
+from sigme_datos import DB_PARAMS
+
+VERSION_GENERADOR = 1
+ESCALAS = (1000, 100000, 1000000)
+ANO_ACTIVO = "2025-2026"
+LETRAS = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+NOMBRES = ["José", "María", "Ana", "Luis", "Carmen", "Jesús", "Rosa", "Andrés", "Sofía", "Ramón",
+           "Valentina", "Ángel", "Lucía", "Martín", "Inés", "Héctor", "Daniela", "Óscar", "Elena", "Raúl"]
+APELLIDOS = ["Pérez", "Gómez", "Núñez", "Rodríguez", "Hernández", "García", "Martínez", "López",
+             "Díaz", "Ramírez", "Suárez", "Muñoz", "Rojas", "Jiménez", "Castillo", "Peña", "Álvarez",
+             "Mendoza", "Ibáñez", "Quintero"]
+TAMANO_COPY = 50000
+
+# Tablas base mínimas con las columnas que usa la aplicación. En producción las crea el
+# sistema escolar; aquí solo se necesitan para medir.
+DDL_BASE = """
+    CREATE TABLE ANO_ESCOLAR (
+        codigo varchar(20) PRIMARY KEY,
+        activo boolean NOT NULL DEFAULT false
+    );
+    CREATE TABLE PERSONAL (
+        cedula varchar(20) PRIMARY KEY,
+        nombres varchar(100) NOT NULL,
+        apellidos varchar(100) NOT NULL
+    );
+    CREATE TABLE SECCION (
+        codigo varchar(40) PRIMARY KEY,
+        letra varchar(1) NOT NULL,
+        codigo_grado integer NOT NULL,
+        turno varchar(1) NOT NULL,
+        cedula_docente_guia varchar(20) NOT NULL REFERENCES PERSONAL (cedula),
+        aula_asignada varchar(20),
+        capacidad_maxima integer NOT NULL,
+        total_estudiantes integer NOT NULL DEFAULT 0,
+        estudiantes_varones integer NOT NULL DEFAULT 0,
+        estudiantes_hembras integer NOT NULL DEFAULT 0,
+        codigo_ano_escolar varchar(20) NOT NULL REFERENCES ANO_ESCOLAR (codigo)
+    );
+    CREATE TABLE ESTUDIANTE (
+        cedula varchar(20) PRIMARY KEY,
+        codigo_seccion varchar(40) REFERENCES SECCION (codigo)
+    );
+    CREATE TABLE bench_metadatos (escala integer, semilla integer, version integer);
+"""
+
+def nombre_base_datos(escala):
+    return f"sigme_bench_{escala}"
+
+def conectar(dbname):
+    return psycopg2.connect(**dict(DB_PARAMS, dbname=dbname))
+
+def _copiar(cursor, tabla, columnas, filas):
+    """Carga filas (tuplas) con COPY en bloques de TAMANO_COPY."""
+    bloque = io.StringIO()
+    cantidad = 0
+    for fila in filas:
+        bloque.write("\t".join("\\N" if valor is None else str(valor) for valor in fila) + "\n")
+        cantidad += 1
+        if cantidad % TAMANO_COPY == 0:
+            bloque.seek(0)
+            cursor.copy_expert(f"COPY {tabla} ({columnas}) FROM STDIN", bloque)
+            bloque = io.StringIO()
+    bloque.seek(0)
+    cursor.copy_expert(f"COPY {tabla} ({columnas}) FROM STDIN", bloque)
+
+def generar_datos(conn, escala, semilla):
+    """
+    Llena la base con `escala` secciones repartidas en años escolares de hasta 312 secciones
+    (6 grados x 26 letras x 2 turnos). El año activo usa los códigos normales y deja libres
+    la mitad de las combinaciones con letras A-E para poder medir asignaciones.
+    """
+    aleatorio = random.Random(semilla)
+    combinaciones = [(grado, letra, turno) for grado in range(1, 7) for letra in LETRAS for turno in "MT"]
+    libres_activo = {c for c in combinaciones if c[1] in "ABCDE" and aleatorio.random() < 0.5}
+    combinaciones_activo = [c for c in combinaciones if c not in libres_activo]
+
+    num_anos = max(1, -(-(escala - len(combinaciones_activo)) // len(combinaciones)) + 1)
+    anos = [f"H{n:05d}" for n in range(num_anos - 1)] + [ANO_ACTIVO]
+    num_docentes = max(2 * len(combinaciones), escala // 10)
+
+    cursor = conn.cursor()
+    cursor.execute(DDL_BASE)
+    _copiar(cursor, "ANO_ESCOLAR", "codigo, activo", ((ano, ano == ANO_ACTIVO) for ano in anos))
+    _copiar(cursor, "PERSONAL", "cedula, nombres, apellidos",
+            ((f"V{10000000 + i}", aleatorio.choice(NOMBRES), f"{aleatorio.choice(APELLIDOS)} {aleatorio.choice(APELLIDOS)}")
+             for i in range(num_docentes)))
+
+    def secciones():
+        generadas = 0
+        for ano in reversed(anos): # El año activo primero, para que siempre tenga sus secciones
+            lista = combinaciones_activo if ano == ANO_ACTIVO else combinaciones
+            docentes = aleatorio.sample(range(num_docentes), len(lista))
+            aulas = {}
+            for (grado, letra, turno), docente in zip(lista, docentes):
+                if generadas == escala:
+                    return
+                aula = aulas.get((grado, turno), grado * 100)
+                aulas[(grado, turno)] = aula + 1
+                codigo = f"{grado}{letra}-{turno}" if ano == ANO_ACTIVO else f"{grado}{letra}-{turno}-{ano}"
+                yield (codigo, letra, grado, turno, f"V{10000000 + docente}", aula if aula < grado * 100 + 100 else None,
+                       aleatorio.randint(25, 40), 0, 0, 0, ano)
+                generadas += 1
+
+    _copiar(cursor, "SECCION", "codigo, letra, codigo_grado, turno, cedula_docente_guia, aula_asignada, "
+                               "capacidad_maxima, total_estudiantes, estudiantes_varones, estudiantes_hembras, "
+                               "codigo_ano_escolar", secciones())
+    # Algunas secciones del año activo con estudiantes, para medir eliminaciones con dependencias
+    cursor.execute("""
+        INSERT INTO ESTUDIANTE (cedula, codigo_seccion)
+        SELECT 'E' || row_number() OVER (), codigo FROM SECCION
+        WHERE codigo_ano_escolar = %s AND letra IN ('F', 'G')
+    """, (ANO_ACTIVO,))
+    cursor.execute("INSERT INTO bench_metadatos VALUES (%s, %s, %s)", (escala, semilla, VERSION_GENERADOR))
+    conn.commit()
+    cursor.execute("ANALYZE")
+    conn.commit()
+
+def preparar_base_datos(escala, semilla=2025, regenerar=False):
+    """Crea (o reutiliza) la base de datos de la escala indicada y retorna su nombre."""
+    nombre = nombre_base_datos(escala)
+    admin = conectar("postgres")
+    admin.autocommit = True
+    cursor = admin.cursor()
+    cursor.execute("SELECT 1 FROM pg_database WHERE datname = %s", (nombre,))
+    existe = cursor.fetchone() is not None
+    if existe and not regenerar:
+        conn = conectar(nombre)
+        try:
+            cursor_bench = conn.cursor()
+            cursor_bench.execute("SELECT escala, semilla, version FROM bench_metadatos")
+            if cursor_bench.fetchone() == (escala, semilla, VERSION_GENERADOR):
+                return nombre
+        except psycopg2.Error:
+            pass
+        finally:
+            conn.close()
+    if existe:
+        cursor.execute(f'DROP DATABASE "{nombre}"')
+    cursor.execute(f'CREATE DATABASE "{nombre}"')
+    admin.close()
+
+    print(f"Generando {escala} secciones en {nombre}...", file=sys.stderr)
+    conn = conectar(nombre)
+    try:
+        generar_datos(conn, escala, semilla)
+    finally:
+        conn.close()
+    return nombre
+
+def eliminar_base_datos(escala):
+    admin = conectar("postgres")
+    admin.autocommit = True
+    admin.cursor().execute(f'DROP DATABASE IF EXISTS "{nombre_base_datos(escala)}"')
+    admin.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Genera la base de datos sintética de una escala.")
+    parser.add_argument("--escala", type=int, choices=ESCALAS, required=True)
+    parser.add_argument("--semilla", type=int, default=2025)
+    parser.add_argument("--regenerar", action="store_true")
+    args = parser.parse_args()
+    print(preparar_base_datos(args.escala, args.semilla, args.regenerar))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Mide el rendimiento de la importación masiva de secciones (COPY) frente a la asignación
+fila por fila con sigme_asignar_seccion().
+
+Escribe en la base de datos indicada: usar una copia, nunca la base de datos de producción.
+Crea docentes temporales (cédulas BENCH-*), llena los grados/letras/turnos libres del año
+escolar activo y al terminar elimina todo lo que insertó.
+
+    python benchmarks/importacion_csv.py --dbname Sigme2_copia --rondas 20
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import psycopg2
+
+from sigme_datos import (DB_PARAMS, LETRAS_SECCION, TURNOS_SECCION, asegurar_esquema,
+                         ejecutar_rutina, importar_secciones)
+
+PREFIJO_DOCENTE = "BENCH-"
+
+def preparar(conn, ano_escolar):
+    """Crea los docentes temporales y retorna las filas a importar (una por combinación libre)."""
+    cursor = conn.cursor()
+    cursor.execute("SELECT codigo_grado, letra, turno FROM SECCION WHERE codigo_ano_escolar = %s", (ano_escolar,))
+    ocupadas = {(int(grado), letra, turno) for grado, letra, turno in cursor}
+    libres = [(grado, letra, turno) for grado in range(1, 7) for letra in LETRAS_SECCION
+              for turno in TURNOS_SECCION if (grado, letra, turno) not in ocupadas]
+    filas = []
+    for i, (grado, letra, turno) in enumerate(libres):
+        cedula = f"{PREFIJO_DOCENTE}{i}"
+        cursor.execute("INSERT INTO PERSONAL (cedula, nombres, apellidos) VALUES (%s, %s, %s)",
+                       (cedula, "Docente", f"Prueba {i}"))
+        filas.append((i + 2, {"grado": str(grado), "letra": letra, "turno": turno,
+                              "docente": cedula, "aula": "", "capacidad": "30"}))
+    conn.commit()
+    return filas
+
+def limpiar_secciones(conn):
+    cursor = conn.cursor()
+    cursor.execute("DELETE FROM SECCION WHERE cedula_docente_guia LIKE %s", (PREFIJO_DOCENTE + "%",))
+    conn.commit()
+
+def medir_copy(conn, ano_escolar, filas):
+    inicio = time.perf_counter()
+    resultado = importar_secciones(conn, ano_escolar, filas)
+    duracion = time.perf_counter() - inicio
+    if resultado["codigo_error"] or resultado["errores"]:
+        raise RuntimeError(f"La importación fue rechazada: {resultado['codigo_error'] or resultado['errores'][:3]}")
+    return duracion
+
+def medir_fila_por_fila(conn, ano_escolar, filas):
+    inicio = time.perf_counter()
+    for _, fila in filas:
+        codigo_error, _, _, _ = ejecutar_rutina(conn, """
+            SELECT codigo_error, codigo_seccion, aula, detalle
+            FROM sigme_asignar_seccion(%s, %s, %s, %s, %s, %s, %s)
+        """, (ano_escolar, int(fila["grado"]), fila["letra"], fila["turno"], fila["docente"], None, int(fila["capacidad"])))
+        if codigo_error:
+            raise RuntimeError(f"La rutina rechazó la sección: {codigo_error}")
+    return time.perf_counter() - inicio
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--dbname", required=True, help="Base de datos de pruebas (se modifica)")
+    parser.add_argument("--rondas", type=int, default=20)
+    args = parser.parse_args()
+
+    conn = psycopg2.connect(**dict(DB_PARAMS, dbname=args.dbname))
+    asegurar_esquema(conn)
+    cursor = conn.cursor()
+    cursor.execute("SELECT codigo FROM ANO_ESCOLAR WHERE activo = TRUE LIMIT 1")
+    fila = cursor.fetchone()
+    conn.commit()
+    if fila is None:
+        sys.exit("La base de datos no tiene un año escolar activo.")
+    ano_escolar = fila[0]
+
+    try:
+        filas = preparar(conn, ano_escolar)
+        if not filas:
+            sys.exit("No quedan grados/letras/turnos libres en el año escolar activo.")
+        tiempos = {"copy": 0.0, "fila_por_fila": 0.0}
+        for _ in range(args.rondas):
+            tiempos["copy"] += medir_copy(conn, ano_escolar, filas)
+            limpiar_secciones(conn)
+            tiempos["fila_por_fila"] += medir_fila_por_fila(conn, ano_escolar, filas)
+            limpiar_secciones(conn)
+
+        total = len(filas) * args.rondas
+        print(f"{len(filas)} secciones por lote, {args.rondas} rondas ({total} secciones por método)")
+        for metodo, duracion in tiempos.items():
+            print(f"  {metodo:<14} {duracion:8.3f} s  {total / duracion:10.0f} secciones/s")
+        print(f"  COPY es {tiempos['fila_por_fila'] / tiempos['copy']:.1f} veces más rápido")
+    finally:
+        conn.rollback()
+        limpiar_secciones(conn)
+        conn.cursor().execute("DELETE FROM PERSONAL WHERE cedula LIKE %s", (PREFIJO_DOCENTE + "%",))
+        conn.commit()
+        conn.close()
+
+if __name__ == "__main__":
+    main()
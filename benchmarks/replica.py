@@ -0,0 +1,81 @@
+"""
+Compara las lecturas de la tabla de secciones en el servidor y en la réplica local SQLite.
+
+Usa la base de datos sintética de benchmarks/generador.py. Mide la carga completa de la
+réplica, una sincronización sin cambios, una tras modificar una sección y las mismas lecturas
+que hace la interfaz (páginas, búsquedas, docentes y resumen) con ServicioSecciones y con
+ServicioConReplica.
+
+    python benchmarks/replica.py --escala 100000 --repeticiones 200
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sigme_datos import DB_PARAMS, PoolConexiones, ServicioSecciones, asegurar_esquema
+from sigme_replica import ReplicaLocal, ServicioConReplica
+from generador import ESCALAS, preparar_base_datos
+from suite import ConexionContada, ejecutar_sql, medir
+
+def medir_lecturas(servicio, repeticiones):
+    primera = servicio.cargar_pagina("", "primera", None, 50, None)
+    return {
+        "pagina_primera": medir("pagina_primera", lambda: servicio.cargar_pagina("", "primera", None, 50, None), repeticiones),
+        "pagina_siguiente": medir("pagina_siguiente", lambda: servicio.cargar_pagina(
+            "", "siguiente", primera["ultima_clave"], 50, primera["total_records"]), repeticiones),
+        "pagina_ultima": medir("pagina_ultima", lambda: servicio.cargar_pagina(
+            "", "ultima", None, 50, primera["total_records"]), repeticiones),
+        "buscar": medir("buscar", lambda: servicio.cargar_pagina("3B", "primera", None, 50, None), repeticiones),
+        "buscar_nombre": medir("buscar_nombre", lambda: servicio.cargar_pagina("mar", "primera", None, 50, None), repeticiones),
+        "buscar_docentes": medir("buscar_docentes", lambda: servicio.buscar_docentes("Mar"), repeticiones),
+        "resumen": medir("resumen", servicio.resumen_secciones, repeticiones),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara lecturas en el servidor y en la réplica local.")
+    parser.add_argument("--escala", type=int, choices=ESCALAS, default=100000)
+    parser.add_argument("--repeticiones", type=int, default=200)
+    parser.add_argument("--semilla", type=int, default=2025)
+    args = parser.parse_args()
+
+    DB_PARAMS.update(dbname=preparar_base_datos(args.escala, args.semilla), connection_factory=ConexionContada)
+    pool = PoolConexiones(1, intervalo_verificacion=float("inf"), inicializar_conexion=asegurar_esquema)
+    servicio = ServicioSecciones(pool)
+    with tempfile.TemporaryDirectory(prefix="sigme_replica_") as directorio:
+        replica = ReplicaLocal(os.path.join(directorio, "replica.sqlite3"), pool)
+        try:
+            print("Servidor:", file=sys.stderr)
+            servidor = medir_lecturas(servicio, args.repeticiones)
+
+            for nombre in ("carga completa", "sin cambios"):
+                inicio = time.perf_counter()
+                resultado = replica.sincronizar()
+                print(f"Sincronización ({nombre}): {(time.perf_counter() - inicio) * 1000:.1f} ms, "
+                      f"{resultado['filas']} filas", file=sys.stderr)
+            (codigo,), = ejecutar_sql(pool, "SELECT MIN(codigo) FROM SECCION")
+            ejecutar_sql(pool, "UPDATE SECCION SET capacidad_maxima = capacidad_maxima WHERE codigo = %s RETURNING codigo",
+                         (codigo,))
+            inicio = time.perf_counter()
+            resultado = replica.sincronizar()
+            print(f"Sincronización (una sección): {(time.perf_counter() - inicio) * 1000:.1f} ms, "
+                  f"{resultado['filas']} filas", file=sys.stderr)
+
+            print("Réplica local:", file=sys.stderr)
+            local = medir_lecturas(ServicioConReplica(servicio, replica), args.repeticiones)
+        finally:
+            replica.cerrar()
+            pool.cerrar()
+
+    print(f"\n{'Operación':<18} {'p50 servidor':>13} {'p50 réplica':>12} {'diferencia':>11}")
+    for nombre, medida in local.items():
+        antes = servidor[nombre]["p50_ms"]
+        despues = medida["p50_ms"]
+        print(f"{nombre:<18} {antes:10.3f} ms {despues:9.3f} ms {(despues - antes) * 100 / antes:+10.1f}%")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Compara las consultas frecuentes ejecutadas sin preparar y como sentencias preparadas.
+
+Usa la base de datos sintética de benchmarks/generador.py. Cada modo usa un pool nuevo, así
+que la primera ejecución (calentamiento) de cada consulta prepara la sentencia. Al final
+muestra el tiempo de planificación que informa el servidor con y sin preparar (EXPLAIN) y el
+ahorro estimado.
+
+    python benchmarks/sentencias_preparadas.py --escala 100000 --repeticiones 200
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import sigme_datos
+from sigme_datos import DB_PARAMS, PoolConexiones, SentenciasPreparadas, ServicioSecciones, asegurar_esquema
+from generador import ESCALAS, preparar_base_datos
+from suite import ConexionContada, ejecutar_sql, medir
+
+def medir_modo(preparadas, repeticiones):
+    sigme_datos.USAR_SENTENCIAS_PREPARADAS = preparadas
+    pool = PoolConexiones(1, intervalo_verificacion=float("inf"), inicializar_conexion=asegurar_esquema)
+    servicio = ServicioSecciones(pool)
+    try:
+        primera = servicio.cargar_pagina("", "primera", None, 50, None)
+        (codigo,), = ejecutar_sql(pool, "SELECT MIN(codigo) FROM SECCION WHERE codigo_ano_escolar = %s",
+                                  (servicio.ano_escolar_activo(),))
+        libres = ejecutar_sql(pool, """
+            SELECT g, l, t FROM generate_series(1, 6) g, unnest(%s) l, unnest(%s) t
+            WHERE NOT EXISTS (SELECT 1 FROM SECCION s WHERE s.codigo_ano_escolar = %s
+                              AND s.codigo_grado = g AND s.letra = l AND s.turno = t)
+            ORDER BY g, l, t LIMIT 1
+        """, (sigme_datos.LETRAS_SECCION, sigme_datos.TURNOS_SECCION, servicio.ano_escolar_activo()))
+        (docente,), = ejecutar_sql(pool, """
+            SELECT cedula FROM PERSONAL p WHERE NOT EXISTS (
+                SELECT 1 FROM SECCION s WHERE s.codigo_ano_escolar = %s AND s.cedula_docente_guia = p.cedula)
+            ORDER BY cedula LIMIT 1
+        """, (servicio.ano_escolar_activo(),))
+        print(f"{'Preparadas' if preparadas else 'Sin preparar'}:", file=sys.stderr)
+        resultados = {
+            "pagina_primera": medir("pagina_primera", lambda: servicio.cargar_pagina("", "primera", None, 50, None), repeticiones),
+            "pagina_siguiente": medir("pagina_siguiente", lambda: servicio.cargar_pagina(
+                "", "siguiente", primera["ultima_clave"], 50, primera["total_records"]), repeticiones),
+            "buscar": medir("buscar", lambda: servicio.cargar_pagina("3B", "primera", None, 50, None), repeticiones),
+            "buscar_docentes": medir("buscar_docentes", lambda: servicio.buscar_docentes("Mar"), repeticiones),
+            "cargar_seccion": medir("cargar_seccion", lambda: servicio.cargar_seccion(codigo), repeticiones),
+        }
+        if libres:
+            grado, letra, turno = libres[0]
+            asignadas = []
+            resultados["asignar_seccion"] = medir(
+                "asignar_seccion",
+                lambda: asignadas.append(servicio.asignar_seccion(grado, letra, turno, docente, None, 30)["codigo_seccion"]),
+                repeticiones, limpiar=lambda: servicio.eliminar_secciones([asignadas.pop()]))
+        return resultados
+    finally:
+        pool.cerrar()
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara consultas preparadas y sin preparar.")
+    parser.add_argument("--escala", type=int, choices=ESCALAS, default=100000)
+    parser.add_argument("--repeticiones", type=int, default=200)
+    parser.add_argument("--semilla", type=int, default=2025)
+    args = parser.parse_args()
+
+    DB_PARAMS.update(dbname=preparar_base_datos(args.escala, args.semilla), connection_factory=ConexionContada)
+    sin_preparar = medir_modo(False, args.repeticiones)
+    preparadas = medir_modo(True, args.repeticiones)
+
+    print(f"\n{'Operación':<18} {'p50 sin preparar':>17} {'p50 preparada':>14} {'diferencia':>11}")
+    for nombre, medida in preparadas.items():
+        antes = sin_preparar[nombre]["p50_ms"]
+        despues = medida["p50_ms"]
+        print(f"{nombre:<18} {antes:14.3f} ms {despues:11.3f} ms {(despues - antes) * 100 / antes:+10.1f}%")
+
+    print(f"\n{'Planificación (servidor)':<60} {'sin preparar':>12} {'preparada':>10} {'ejecuciones':>11} {'ahorro':>10}")
+    for estadistica in sorted(SentenciasPreparadas.estadisticas(), key=lambda e: -(e.ahorro or 0)):
+        def ms(segundos):
+            return "-" if segundos is None else f"{segundos * 1000:.3f}"
+        print(f"{' '.join(estadistica.sql.split())[:60]:<60} {ms(estadistica.planificacion_adhoc):>12} "
+              f"{ms(estadistica.planificacion_preparada):>10} {estadistica.ejecuciones:>11} {ms(estadistica.ahorro):>10}")
+
+if __name__ == "__main__":
+    main()
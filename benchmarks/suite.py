@@ -0,0 +1,260 @@
+"""
+Suite de rendimiento de las operaciones de secciones sobre datos sintéticos.
+
+Para cada escala (1k, 100k y 1M secciones) prepara una base de datos desechable con
+benchmarks/generador.py y mide con ServicioSecciones las operaciones que usa la aplicación:
+paginación, búsqueda, búsqueda de docentes, asignación, aula disponible, eliminación y
+exportación. Por operación registra percentiles de latencia y la cantidad de consultas e
+idas y vueltas al servidor. El resultado se guarda en JSON para compararlo entre versiones
+con benchmarks/comparar.py.
+
+    python benchmarks/suite.py --escalas 1000 100000
+    python benchmarks/comparar.py resultados/anterior.json resultados/nuevo.json
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import psycopg2
+import psycopg2.extensions
+
+import sigme_datos
+from sigme_datos import DB_PARAMS, CursorInstrumentado, PoolConexiones, ServicioSecciones, asegurar_esquema, percentil
+from generador import ANO_ACTIVO, ESCALAS, eliminar_base_datos, preparar_base_datos
+
+VERSION_RESULTADOS = 1
+PERCENTILES = (50, 90, 99)
+
+class Contador:
+    """Consultas e idas y vueltas al servidor acumuladas desde el último reinicio."""
+    consultas = 0
+    ida_vuelta = 0
+
+    @classmethod
+    def reiniciar(cls):
+        cls.consultas = 0
+        cls.ida_vuelta = 0
+
+class CursorContado(CursorInstrumentado):
+    """Cursor que cuenta cada sentencia enviada y cada lote leído de un cursor del servidor."""
+    def execute(self, query, vars=None):
+        Contador.consultas += 1
+        Contador.ida_vuelta += 1
+        return super().execute(query, vars)
+
+    def copy_expert(self, sql, file, size=8192):
+        Contador.consultas += 1
+        Contador.ida_vuelta += 1
+        return super().copy_expert(sql, file, size)
+
+    def fetchmany(self, size=None):
+        if self.name: # Cada FETCH de un cursor con nombre es una ida y vuelta
+            Contador.ida_vuelta += 1
+        return super().fetchmany(size or self.arraysize)
+
+class ConexionContada(psycopg2.extensions.connection):
+    """Conexión que cuenta COMMIT y ROLLBACK solo cuando psycopg2 realmente los envía."""
+    def cursor(self, *args, **kwargs):
+        kwargs.setdefault("cursor_factory", CursorContado)
+        return super().cursor(*args, **kwargs)
+
+    def commit(self):
+        self._contar_fin_transaccion()
+        return super().commit()
+
+    def rollback(self):
+        self._contar_fin_transaccion()
+        return super().rollback()
+
+    def _contar_fin_transaccion(self):
+        if not self.autocommit and self.status != psycopg2.extensions.STATUS_READY:
+            Contador.consultas += 1
+            Contador.ida_vuelta += 1
+
+def resumir(duraciones, consultas, ida_vuelta):
+    ordenadas = sorted(duraciones)
+    resumen = {"repeticiones": len(ordenadas)}
+    for p in PERCENTILES:
+        resumen[f"p{p}_ms"] = round(percentil(ordenadas, p) * 1000, 3)
+    resumen["max_ms"] = round(ordenadas[-1] * 1000, 3)
+    resumen["media_ms"] = round(statistics.fmean(ordenadas) * 1000, 3)
+    resumen["consultas"] = max(consultas)
+    resumen["ida_vuelta"] = max(ida_vuelta)
+    return resumen
+
+def medir(nombre, operacion, repeticiones, preparar=None, limpiar=None):
+    """
+    Ejecuta operacion() `repeticiones` veces y retorna su resumen. preparar() y limpiar() se
+    ejecutan fuera de la medición; preparar puede retornar argumentos para la operación.
+    """
+    operacion(*(preparar() if preparar else ())) # Calentamiento: cachés del servidor y del año activo
+    if limpiar:
+        limpiar()
+    duraciones, consultas, ida_vuelta = [], [], []
+    for _ in range(repeticiones):
+        argumentos = preparar() if preparar else ()
+        Contador.reiniciar()
+        inicio = time.perf_counter()
+        operacion(*argumentos)
+        duraciones.append(time.perf_counter() - inicio)
+        consultas.append(Contador.consultas)
+        ida_vuelta.append(Contador.ida_vuelta)
+        if limpiar:
+            limpiar()
+    resumen = resumir(duraciones, consultas, ida_vuelta)
+    print(f"  {nombre:<26} p50 {resumen['p50_ms']:9.3f} ms  p99 {resumen['p99_ms']:9.3f} ms  "
+          f"{resumen['consultas']:3d} consultas  {resumen['ida_vuelta']:3d} idas y vueltas", file=sys.stderr)
+    return resumen
+
+class EscritorNulo:
+    """Descarta las filas exportadas: solo se mide la lectura."""
+    def escribir(self, filas):
+        pass
+
+def ejecutar_sql(pool, sql, params=()):
+    conn = pool.obtener()
+    try:
+        cursor = conn.cursor()
+        cursor.execute(sql, params)
+        filas = cursor.fetchall() if cursor.description else None
+        conn.commit()
+        return filas
+    finally:
+        pool.devolver(conn)
+
+def medir_escala(escala, semilla, repeticiones, regenerar):
+    dbname = preparar_base_datos(escala, semilla, regenerar)
+    # asegurar_esquema instala una sola vez por proceso y cada escala usa otra base de datos
+    sigme_datos._esquema_verificado = sigme_datos._esquema_instalado = False
+    sigme_datos.ESQUEMA_DISPONIBLE.clear()
+    DB_PARAMS.update(dbname=dbname, connection_factory=ConexionContada)
+    # Sin verificaciones de conexiones inactivas, para que los conteos no dependan del reloj
+    pool = PoolConexiones(1, intervalo_verificacion=float("inf"), inicializar_conexion=asegurar_esquema)
+    servicio = ServicioSecciones(pool)
+    try:
+        if servicio.ano_escolar_activo() != ANO_ACTIVO:
+            raise RuntimeError(f"La base de datos {dbname} no tiene el año escolar activo {ANO_ACTIVO}.")
+        (version_servidor,), = ejecutar_sql(pool, "SHOW server_version")
+        (total_secciones,), = ejecutar_sql(pool, "SELECT COUNT(*) FROM SECCION")
+        (total_docentes,), = ejecutar_sql(pool, "SELECT COUNT(*) FROM PERSONAL")
+        libres = ejecutar_sql(pool, """
+            SELECT g, l, t FROM generate_series(1, 6) g, unnest(%s) l, unnest(%s) t
+            WHERE NOT EXISTS (SELECT 1 FROM SECCION s WHERE s.codigo_ano_escolar = %s
+                              AND s.codigo_grado = g AND s.letra = l AND s.turno = t)
+            ORDER BY g, l, t
+        """, (sigme_datos.LETRAS_SECCION, sigme_datos.TURNOS_SECCION, ANO_ACTIVO))
+        docentes_libres = [fila[0] for fila in ejecutar_sql(pool, """
+            SELECT cedula FROM PERSONAL p
+            WHERE NOT EXISTS (SELECT 1 FROM SECCION s WHERE s.codigo_ano_escolar = %s AND s.cedula_docente_guia = p.cedula)
+            ORDER BY cedula LIMIT 50
+        """, (ANO_ACTIVO,))]
+        (docente_nombre, docente_apellido), = ejecutar_sql(pool, "SELECT nombres, apellidos FROM PERSONAL ORDER BY cedula LIMIT 1")
+        print(f"Escala {escala}: {total_secciones} secciones, {total_docentes} docentes "
+              f"(esquema: {', '.join(sorted(sigme_datos.ESQUEMA_DISPONIBLE)) or 'básico'})", file=sys.stderr)
+
+        operaciones = {}
+        primera = servicio.cargar_pagina("", "primera", None, 50, None)
+        total = primera["total_records"]
+        operaciones["pagina_primera"] = medir("pagina_primera", lambda: servicio.cargar_pagina("", "primera", None, 50, None), repeticiones)
+        operaciones["pagina_siguiente"] = medir("pagina_siguiente", lambda: servicio.cargar_pagina(
+            "", "siguiente", primera["ultima_clave"], 50, total), repeticiones)
+        operaciones["pagina_ultima"] = medir("pagina_ultima", lambda: servicio.cargar_pagina("", "ultima", None, 50, total), repeticiones)
+        for nombre, termino in (("buscar_codigo", "3B"), ("buscar_apellido", docente_apellido.split()[0]),
+                                ("buscar_docente_completo", f"{docente_nombre} {docente_apellido}"),
+                                ("buscar_sin_resultados", "zzzz")):
+            operaciones[nombre] = medir(nombre, lambda t=termino: servicio.cargar_pagina(t, "primera", None, 50, None), repeticiones)
+        operaciones["buscar_docentes"] = medir("buscar_docentes", lambda: servicio.buscar_docentes(docente_apellido[:3]), repeticiones)
+
+        if libres and docentes_libres:
+            grado, letra, turno = libres[0]
+            asignada = []
+            operaciones["asignar_seccion"] = medir(
+                "asignar_seccion",
+                lambda: asignada.append(servicio.asignar_seccion(grado, letra, turno, docentes_libres[0], None, 30)["codigo_seccion"]),
+                repeticiones,
+                limpiar=lambda: servicio.eliminar_secciones([asignada.pop()]))
+        if "rutinas" in sigme_datos.ESQUEMA_DISPONIBLE:
+            operaciones["aula_disponible"] = medir("aula_disponible", lambda: ejecutar_sql(
+                pool, "SELECT sigme_aula_disponible(%s, %s, %s)", (3, "M", ANO_ACTIVO)), repeticiones)
+
+        def crear_lote():
+            """Asigna hasta 10 secciones libres más una con estudiantes (no se puede eliminar)."""
+            codigos = [servicio.asignar_seccion(g, l, t, d, None, 30)["codigo_seccion"]
+                       for (g, l, t), d in zip(libres[:10], docentes_libres)]
+            (con_estudiantes,), = ejecutar_sql(pool, "SELECT MIN(codigo_seccion) FROM ESTUDIANTE")
+            return (codigos + [con_estudiantes],)
+        operaciones["eliminar_lote"] = medir("eliminar_lote", servicio.eliminar_secciones, repeticiones, preparar=crear_lote)
+
+        operaciones["exportar_ano_activo"] = medir("exportar_ano_activo", lambda: servicio.escribir_secciones(
+            EscritorNulo(), "", ANO_ACTIVO), repeticiones)
+        operaciones["exportar_todos"] = medir("exportar_todos", lambda: servicio.escribir_secciones(
+            EscritorNulo(), "", None), max(1, min(repeticiones, 1000000 // escala)))
+
+        return {
+            "base_datos": dbname,
+            "postgres": version_servidor,
+            "secciones": total_secciones,
+            "docentes": total_docentes,
+            "esquema": sorted(sigme_datos.ESQUEMA_DISPONIBLE),
+            "operaciones": operaciones,
+        }
+    finally:
+        pool.cerrar()
+        DB_PARAMS.pop("connection_factory", None)
+
+def commit_actual():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=RAIZ, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def main():
+    parser = argparse.ArgumentParser(description="Mide las operaciones de secciones sobre datos sintéticos.")
+    parser.add_argument("--escalas", type=int, nargs="+", choices=ESCALAS, default=[1000, 100000])
+    parser.add_argument("--repeticiones", type=int, default=30)
+    parser.add_argument("--semilla", type=int, default=2025)
+    parser.add_argument("--regenerar", action="store_true", help="Regenera los datos aunque la base ya exista")
+    parser.add_argument("--eliminar", action="store_true", help="Elimina las bases de datos al terminar")
+    parser.add_argument("--salida", help="Archivo JSON de resultados (por defecto benchmarks/resultados/<fecha>_<commit>.json)")
+    args = parser.parse_args()
+
+    commit = commit_actual()
+    fecha = datetime.datetime.now()
+    resultados = {
+        "version": VERSION_RESULTADOS,
+        "fecha": fecha.isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "psycopg2": psycopg2.__version__.split()[0],
+        "plataforma": platform.platform(),
+        "semilla": args.semilla,
+        "escalas": {},
+    }
+    try:
+        for escala in args.escalas:
+            resultados["escalas"][str(escala)] = medir_escala(escala, args.semilla, args.repeticiones, args.regenerar)
+    finally:
+        if args.eliminar:
+            for escala in args.escalas:
+                eliminar_base_datos(escala)
+
+    salida = args.salida or os.path.join(os.path.dirname(os.path.abspath(__file__)), "resultados",
+                                         f"{fecha:%Y%m%d-%H%M%S}_{commit or 'sin-commit'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(salida)), exist_ok=True)
+    with open(salida, "w", encoding="utf-8") as archivo:
+        json.dump(resultados, archivo, indent=2, ensure_ascii=False)
+    print(salida)
+
+if __name__ == "__main__":
+    main()
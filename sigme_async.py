@@ -0,0 +1,243 @@
+"""
+Motor asíncrono opcional de SIGME2 sobre asyncio y psycopg 3, sin dependencias de Qt.
+
+Un bucle de asyncio corre en un hilo propio y atiende muchas operaciones a la vez sobre unas
+pocas conexiones asíncronas: las consultas pequeñas (búsqueda de docentes, páginas de la
+tabla y sus precargas, carga de una sección) no ocupan un hilo cada una mientras esperan al
+servidor. Las operaciones que aún no tienen versión asíncrona se ejecutan con el
+ServicioSecciones síncrono en un hilo auxiliar, así que ServicioSeccionesAsincrono ofrece la
+misma interfaz (con corrutinas) y la interfaz gráfica puede usar cualquiera de los dos motores.
+"""
+import asyncio
+import contextlib
+import logging
+import threading
+import time
+
+try:
+    import psycopg # Opcional: solo se usa con el motor asíncrono
+except ImportError:
+    psycopg = None
+
+from sigme_datos import (DB_PARAMS, SQL_CARGAR_SECCION, ContextoAnoEscolar, OperacionCancelada,
+                         pasos_buscar_docentes, pasos_pagina_secciones, pasos_resumen_secciones, resumir_sql,
+                         traza_actual)
+
+logger = logging.getLogger(__name__)
+
+def _una_consulta(sql, params):
+    return (yield sql, params)
+
+async def ejecutar_pasos_async(conn, pasos):
+    """
+    Versión asíncrona de sigme_datos.ejecutar_pasos(): ejecuta cada paso del generador en la
+    conexión y registra cada sentencia en la traza activa.
+    """
+    async with conn.cursor() as cursor:
+        try:
+            sql, params = next(pasos)
+            while True:
+                inicio = time.perf_counter()
+                await cursor.execute(sql, params)
+                filas = await cursor.fetchall()
+                traza = traza_actual()
+                if traza is not None:
+                    traza.sentencias.append((resumir_sql(sql), time.perf_counter() - inicio, cursor.rowcount))
+                sql, params = pasos.send(filas)
+        except StopIteration as fin:
+            return fin.value
+
+class PoolAsincrono:
+    """
+    Pool de conexiones psycopg 3 asíncronas usado por las tareas del bucle del MotorAsincrono.
+
+    Las conexiones trabajan en modo autocommit: las operaciones asíncronas solo leen, así que
+    cada consulta es una ida y vuelta sin COMMIT aparte.
+    """
+    def __init__(self, max_conexiones=3):
+        self.max_conexiones = max(1, max_conexiones)
+        self._libres = []
+        self._abiertas = 0
+        self._condicion = None # Se crea dentro del bucle, en el primer uso
+
+    @contextlib.asynccontextmanager
+    async def conexion(self):
+        inicio = time.monotonic()
+        try:
+            conn = await self._obtener()
+        finally:
+            traza = traza_actual()
+            if traza is not None:
+                traza.conexion += time.monotonic() - inicio
+        try:
+            yield conn
+        finally:
+            await self._devolver(conn)
+
+    async def _obtener(self):
+        if self._condicion is None:
+            self._condicion = asyncio.Condition()
+        async with self._condicion:
+            while not self._libres and self._abiertas >= self.max_conexiones:
+                await self._condicion.wait()
+            if self._libres:
+                conn = self._libres.pop()
+                if not conn.closed and not conn.broken:
+                    return conn
+                await conn.close()
+            else:
+                self._abiertas += 1
+        try:
+            return await psycopg.AsyncConnection.connect(
+                **{clave: valor for clave, valor in DB_PARAMS.items() if clave in ("dbname", "user", "password", "host", "port")},
+                client_encoding="UTF8", autocommit=True)
+        except Exception:
+            async with self._condicion:
+                self._abiertas -= 1
+                self._condicion.notify()
+            raise
+
+    async def _devolver(self, conn):
+        # Una consulta interrumpida (tarea cancelada) puede dejar la conexión inutilizable
+        reutilizable = (not conn.closed and not conn.broken
+                        and conn.info.transaction_status == psycopg.pq.TransactionStatus.IDLE)
+        if not reutilizable:
+            await conn.close()
+        async with self._condicion:
+            if reutilizable:
+                self._libres.append(conn)
+            else:
+                self._abiertas -= 1
+            self._condicion.notify()
+
+    async def cerrar(self):
+        libres, self._libres = self._libres, []
+        self._abiertas -= len(libres)
+        for conn in libres:
+            await conn.close()
+
+class ServicioSeccionesAsincrono:
+    """
+    ServicioSecciones con métodos asíncronos.
+
+    buscar_docentes, cargar_pagina, cargar_seccion, resumen_secciones y ano_escolar_activo
+    consultan con psycopg 3 en el bucle; el resto de los métodos del servicio síncrono se
+    ejecutan en un hilo auxiliar con asyncio.to_thread(). Comparte el ContextoAnoEscolar con el servicio síncrono.
+    """
+    def __init__(self, servicio, max_conexiones=3):
+        if psycopg is None:
+            raise ValueError("El motor asíncrono requiere el paquete psycopg (versión 3).")
+        self.servicio = servicio
+        self.contexto_ano = servicio.contexto_ano
+        self.pool = PoolAsincrono(max_conexiones)
+        self._preparado = None
+
+    def __getattr__(self, nombre):
+        metodo = getattr(self.servicio, nombre)
+        if not callable(metodo):
+            return metodo
+        async def en_hilo(*args, **kwargs):
+            await self._preparar()
+            return await asyncio.to_thread(metodo, *args, **kwargs)
+        return en_hilo
+
+    async def _preparar(self):
+        """
+        La primera vez verifica el esquema con el servicio síncrono (verificar_esquema), porque las
+        consultas dependen de ESQUEMA_DISPONIBLE, y de paso carga el año escolar activo.
+        """
+        if self._preparado is None or (self._preparado.done() and (self._preparado.cancelled()
+                                                                    or self._preparado.exception() is not None)):
+            self._preparado = asyncio.ensure_future(asyncio.to_thread(self.servicio.ano_escolar_activo))
+        await asyncio.shield(self._preparado)
+
+    async def ano_escolar_activo(self):
+        await self._preparar()
+        cargado, codigo, generacion = self.contexto_ano.en_cache()
+        if cargado:
+            return codigo
+        async with self.pool.conexion() as conn:
+            filas = await ejecutar_pasos_async(conn, _una_consulta(ContextoAnoEscolar.SQL, ()))
+        return self.contexto_ano.guardar(generacion, filas[0][0] if filas else None)
+
+    async def buscar_docentes(self, texto, limite=20):
+        await self._preparar()
+        async with self.pool.conexion() as conn:
+            return await ejecutar_pasos_async(conn, pasos_buscar_docentes(texto, limite))
+
+    async def cargar_pagina(self, search_term, direccion, clave, limit, total_records, progreso=None, token=None):
+        progreso = progreso or (lambda valor, mensaje: None)
+        try:
+            if token and token.cancelado:
+                raise OperacionCancelada()
+            progreso(20, "Cargando secciones...")
+            ano_escolar = await self.ano_escolar_activo()
+            async with self.pool.conexion() as conn:
+                resultado = await ejecutar_pasos_async(conn, pasos_pagina_secciones(
+                    search_term, ano_escolar, direccion, clave, limit, total_records))
+            progreso(100, "Secciones cargadas.")
+            return resultado
+        except psycopg.Error as e:
+            logger.error(f"Error de PostgreSQL al cargar secciones: {e}", exc_info=True)
+            raise Exception(f"Error en la base de datos al cargar las secciones: {e}")
+
+    async def cargar_seccion(self, codigo_seccion, progreso=None):
+        progreso = progreso or (lambda valor, mensaje: None)
+        await self._preparar()
+        progreso(10, "Cargando datos de la sección...")
+        async with self.pool.conexion() as conn:
+            filas = await ejecutar_pasos_async(conn, _una_consulta(SQL_CARGAR_SECCION, (codigo_seccion,)))
+        if not filas:
+            raise ValueError(f"No se encontró la sección con código {codigo_seccion}.")
+        progreso(100, "Datos de la sección cargados.")
+        return filas[0]
+
+    async def resumen_secciones(self):
+        ano_escolar = await self.ano_escolar_activo()
+        if ano_escolar is None:
+            return ano_escolar, []
+        async with self.pool.conexion() as conn:
+            return ano_escolar, await ejecutar_pasos_async(conn, pasos_resumen_secciones(ano_escolar))
+
+class MotorAsincrono:
+    """
+    Bucle de asyncio en un hilo propio.
+
+    iniciar(tarea) programa tarea.ejecutar() en el bucle y guarda el asyncio.Task en tarea.tarea;
+    la tarea debe marcar tarea.iniciada al comenzar. Los resultados vuelven al hilo de la
+    interfaz por las señales de la tarea, igual que con DBWorker.
+    """
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self._hilo = threading.Thread(target=self.loop.run_forever, name="sigme-asyncio", daemon=True)
+        self._hilo.start()
+
+    def iniciar(self, tarea):
+        def crear():
+            tarea.tarea = self.loop.create_task(tarea.ejecutar())
+        self.loop.call_soon_threadsafe(crear)
+
+    def retirar(self, tarea):
+        """
+        Cancela la tarea. Retorna True si todavía no había comenzado (y por lo tanto no avisará
+        que terminó); si ya estaba en curso, psycopg cancela su consulta en el servidor.
+        """
+        async def cancelar():
+            iniciada = tarea.iniciada
+            if tarea.tarea is not None:
+                tarea.tarea.cancel()
+            return not iniciada
+        return asyncio.run_coroutine_threadsafe(cancelar(), self.loop).result()
+
+    def cerrar(self, *corrutinas):
+        """Ejecuta las corrutinas de cierre indicadas y detiene el bucle."""
+        async def cerrar():
+            for corrutina in corrutinas:
+                try:
+                    await corrutina
+                except Exception as e:
+                    logger.warning(f"Error al cerrar el motor asíncrono: {e}")
+        if self.loop.is_running():
+            asyncio.run_coroutine_threadsafe(cerrar(), self.loop).result(timeout=10)
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self._hilo.join(timeout=10)
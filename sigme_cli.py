@@ -0,0 +1,281 @@
+"""
+Modo por lotes de SIGME2: operaciones de secciones desde la línea de comandos, sin interfaz gráfica.
+
+    python sigme_cli.py listar [--buscar TEXTO] [--ano CODIGO | --todos] [--salida secciones.xlsx]
+    python sigme_cli.py asignar secciones.csv [--hilos 4]
+    python sigme_cli.py actualizar cambios.csv [--hilos 4]
+    python sigme_cli.py eliminar 1A-M 1B-M ... | --archivo codigos.txt
+    python sigme_cli.py importar secciones.csv
+    python sigme_cli.py generar [--grados 1-6] [--letras ABCDE] [--turnos MT] [--capacidad 30]
+                                [--docentes cedulas.txt] [--confirmar]
+    python sigme_cli.py resumen
+    python sigme_cli.py esquema [--instalar]
+
+asignar usa las columnas grado, letra, turno, docente, aula y capacidad, y crea cada sección
+por separado: las filas válidas se guardan aunque otras fallen. importar usa las mismas
+columnas pero valida el lote completo y lo carga con COPY solo si no hay errores.
+generar planifica todas las combinaciones de grado, letra y turno que aún no existen (aula libre
+y, si se indica el archivo, un docente por sección en orden) y las muestra como CSV; con
+--confirmar las crea en una sola transacción, omitiendo las que tienen conflictos.
+esquema muestra la versión instalada de cada objeto de esquema; con --instalar antes instala
+los pendientes (bloquea tablas mientras tanto: conviene hacerlo después de actualizar la
+aplicación y fuera del horario de uso). Los demás comandos solo verifican el esquema.
+actualizar usa las columnas codigo, docente, aula y capacidad; las celdas vacías conservan
+el valor actual. Con "-" como archivo se lee la entrada estándar.
+
+El código de salida es 0 si todo se procesó, 1 si alguna fila falló y 2 ante errores de uso.
+"""
+import argparse
+import csv
+import logging
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from sigme_datos import (COLUMNAS_IMPORTACION, DB_PARAMS, ENCABEZADOS_EXPORTACION, ESCRITORES_EXPORTACION,
+                         LETRAS_SECCION, TURNOS_SECCION, PoolConexiones, ServicioSecciones, verificar_esquema,
+                         leer_csv_secciones, validar_campos_seccion)
+
+class EscritorSalida:
+    """Escribe la lista de secciones como CSV en la salida estándar."""
+    def __init__(self, encabezados):
+        self._escritor = csv.writer(sys.stdout)
+        self._escritor.writerow(encabezados)
+
+    def escribir(self, filas):
+        self._escritor.writerows(filas)
+
+    def cerrar(self, guardar=True):
+        sys.stdout.flush()
+
+def abrir_entrada(ruta):
+    if ruta == "-":
+        return sys.stdin
+    return open(ruta, newline="", encoding="utf-8-sig")
+
+def leer_filas_actualizacion(archivo):
+    lector = csv.DictReader(archivo)
+    if lector.fieldnames is None or "codigo" not in [c.strip().lower() for c in lector.fieldnames]:
+        raise ValueError("Al archivo le falta la columna codigo.")
+    filas = []
+    for fila in lector:
+        fila = {(clave or "").strip().lower(): (valor or "").strip() for clave, valor in fila.items()}
+        if fila.get("codigo"):
+            filas.append((lector.line_num, fila))
+    return filas
+
+def procesar_en_paralelo(operacion, filas, hilos):
+    """Ejecuta operacion(fila) para cada (numero_linea, fila) y reporta el resultado en orden de línea."""
+    fallidas = 0
+    with ThreadPoolExecutor(max_workers=hilos) as ejecutor:
+        for (numero_linea, _), (ok, mensaje) in zip(filas, ejecutor.map(lambda f: operacion(f[1]), filas)):
+            if ok:
+                print(f"línea {numero_linea}: {mensaje}")
+            else:
+                fallidas += 1
+                print(f"línea {numero_linea}: ERROR: {mensaje}", file=sys.stderr)
+    print(f"{len(filas) - fallidas} de {len(filas)} filas procesadas correctamente.", file=sys.stderr)
+    return 1 if fallidas else 0
+
+def comando_listar(servicio, args):
+    if args.todos:
+        ano_escolar = None
+    else:
+        ano_escolar = args.ano or servicio.ano_escolar_activo()
+    if args.salida:
+        formato = os.path.splitext(args.salida)[1].lower().lstrip(".")
+        if formato not in ESCRITORES_EXPORTACION:
+            raise ValueError(f"Formato de salida no soportado: {formato or args.salida}. Use .csv o .xlsx.")
+        resultado = servicio.exportar(args.salida, formato, args.buscar, ano_escolar)
+        print(f"Se exportaron {resultado['exportadas']} secciones a {resultado['ruta']}.", file=sys.stderr)
+    else:
+        servicio.escribir_secciones(EscritorSalida(ENCABEZADOS_EXPORTACION), args.buscar, ano_escolar)
+    return 0
+
+def comando_asignar(servicio, args):
+    with abrir_entrada(args.archivo) as archivo:
+        filas = leer_csv_secciones(archivo)
+
+    def asignar(fila):
+        seccion, error = validar_campos_seccion(fila)
+        if error:
+            return False, error
+        try:
+            resultado = servicio.asignar_seccion(seccion["grado"], seccion["letra"], seccion["turno"],
+                                                 seccion["docente"], seccion["aula"], seccion["capacidad"])
+        except Exception as e:
+            return False, str(e)
+        return True, f"sección {resultado['codigo_seccion']} asignada en el aula {resultado['aula']}"
+
+    return procesar_en_paralelo(asignar, filas, args.hilos)
+
+def comando_actualizar(servicio, args):
+    with abrir_entrada(args.archivo) as archivo:
+        filas = leer_filas_actualizacion(archivo)
+    # Valores actuales de todas las secciones en una sola consulta, para completar las celdas vacías
+    actuales = servicio.consultar_secciones({fila["codigo"] for _, fila in filas})
+
+    def actualizar(fila):
+        codigo = fila["codigo"]
+        if codigo not in actuales:
+            return False, f"No se encontró la sección {codigo} en el año escolar activo."
+        grado, letra, turno, docente, aula, capacidad = actuales[codigo]
+        try:
+            capacidad = int(fila.get("capacidad") or capacidad)
+        except ValueError:
+            return False, "La capacidad máxima debe ser un número entero."
+        if capacidad <= 0:
+            return False, "La capacidad máxima debe ser un número entero positivo."
+        try:
+            servicio.actualizar_seccion(codigo, grado, letra, turno, fila.get("docente") or docente,
+                                        fila.get("aula") or aula, capacidad)
+        except Exception as e:
+            return False, str(e)
+        return True, f"sección {codigo} actualizada"
+
+    return procesar_en_paralelo(actualizar, filas, args.hilos)
+
+def comando_eliminar(servicio, args):
+    codigos = list(args.codigos)
+    if args.archivo:
+        with abrir_entrada(args.archivo) as archivo:
+            codigos.extend(linea.strip() for linea in archivo if linea.strip())
+    if not codigos:
+        raise ValueError("Indique los códigos de las secciones a eliminar.")
+    resultado = servicio.eliminar_secciones(list(dict.fromkeys(codigos)))
+    for codigo in resultado["codigos"]:
+        print(f"{codigo}: eliminada")
+    for codigo in resultado["con_dependencias"]:
+        print(f"{codigo}: ERROR: tiene registros asociados (ej. estudiantes)", file=sys.stderr)
+    for codigo in resultado["no_encontradas"]:
+        print(f"{codigo}: ERROR: no encontrada", file=sys.stderr)
+    print(f"{resultado['deleted_count']} sección(es) eliminada(s).", file=sys.stderr)
+    return 1 if resultado["con_dependencias"] or resultado["no_encontradas"] else 0
+
+def comando_importar(servicio, args):
+    with abrir_entrada(args.archivo) as archivo:
+        filas = leer_csv_secciones(archivo)
+    resultado = servicio.importar_filas(filas)
+    for numero_linea, mensaje in resultado["errores"]:
+        print(f"línea {numero_linea}: ERROR: {mensaje}", file=sys.stderr)
+    if resultado["errores"]:
+        print(f"No se importó ninguna sección: {len(resultado['errores'])} fila(s) con errores.", file=sys.stderr)
+        return 1
+    print(f"Se importaron {len(resultado['secciones'])} secciones.", file=sys.stderr)
+    return 0
+
+def leer_grados(texto):
+    """Convierte "1-6" o "1,3,5" (o una combinación) en la lista de grados."""
+    grados = []
+    for parte in texto.split(","):
+        inicio, _, fin = parte.strip().partition("-")
+        try:
+            grados.extend(range(int(inicio), int(fin or inicio) + 1))
+        except ValueError:
+            raise ValueError(f"Grados inválidos: {texto}. Use p. ej. 1-6 o 1,3,5.")
+    return grados
+
+def comando_generar(servicio, args):
+    docentes = []
+    if args.docentes:
+        with abrir_entrada(args.docentes) as archivo:
+            docentes = [linea.strip() for linea in archivo if linea.strip()]
+    resultado = servicio.generar_grilla(leer_grados(args.grados), list(args.letras), list(args.turnos),
+                                        args.capacidad, docentes, confirmar=args.confirmar)
+    escritor = EscritorSalida(("codigo",) + COLUMNAS_IMPORTACION)
+    escritor.escribir((s["codigo"], s["grado"], s["letra"], s["turno"], s["docente"] or "", s["aula"], s["capacidad"])
+                      for s in resultado["secciones"])
+    escritor.cerrar()
+    for codigo, mensaje in resultado["conflictos"]:
+        print(f"{codigo}: ERROR: {mensaje}", file=sys.stderr)
+    if resultado["insertadas"]:
+        print(f"Se crearon {len(resultado['secciones'])} secciones.", file=sys.stderr)
+    else:
+        print(f"Vista previa: {len(resultado['secciones'])} secciones por crear y {len(resultado['conflictos'])} "
+              f"conflicto(s). Use --confirmar para crearlas.", file=sys.stderr)
+    return 1 if resultado["conflictos"] else 0
+
+def comando_resumen(servicio, args):
+    ano_escolar, filas = servicio.resumen_secciones()
+    if ano_escolar is None:
+        raise ValueError("No hay un año escolar activo registrado.")
+    escritor = EscritorSalida(["grado", "turno", "secciones", "capacidad", "estudiantes", "aulas_usadas"])
+    escritor.escribir(filas)
+    escritor.cerrar()
+    return 0
+
+def comando_esquema(servicio, args):
+    filas = servicio.estado_esquema(instalar=args.instalar)
+    escritor = EscritorSalida(["clave", "descripcion", "version", "version_instalada", "disponible"])
+    escritor.escribir((clave, descripcion, version, instalada, "si" if disponible else "no")
+                      for clave, descripcion, version, instalada, _, disponible in filas)
+    escritor.cerrar()
+    return 0 if all(fila[-1] for fila in filas) else 1
+
+def crear_parser():
+    parser = argparse.ArgumentParser(description="Operaciones por lotes de secciones de SIGME2.")
+    parser.add_argument("--dbname", help=f"Base de datos (por defecto {DB_PARAMS['dbname']})")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Mostrar el registro de errores detallado")
+    comandos = parser.add_subparsers(dest="comando", required=True)
+
+    listar = comandos.add_parser("listar", help="Listar secciones como CSV o exportarlas a un archivo")
+    listar.add_argument("--buscar", default="", help="Mismo filtro que la búsqueda de la tabla")
+    alcance = listar.add_mutually_exclusive_group()
+    alcance.add_argument("--ano", help="Año escolar (por defecto el activo)")
+    alcance.add_argument("--todos", action="store_true", help="Todos los años escolares")
+    listar.add_argument("--salida", help="Archivo .csv o .xlsx (por defecto la salida estándar)")
+    listar.set_defaults(funcion=comando_listar)
+
+    for nombre, funcion, ayuda in (("asignar", comando_asignar, "Asignar secciones fila por fila desde un CSV"),
+                                   ("actualizar", comando_actualizar, "Actualizar secciones desde un CSV")):
+        sub = comandos.add_parser(nombre, help=ayuda)
+        sub.add_argument("archivo", help="Archivo CSV o - para la entrada estándar")
+        sub.add_argument("--hilos", type=int, default=1, help="Operaciones simultáneas (una conexión por hilo)")
+        sub.set_defaults(funcion=funcion)
+
+    eliminar = comandos.add_parser("eliminar", help="Eliminar secciones por código")
+    eliminar.add_argument("codigos", nargs="*")
+    eliminar.add_argument("--archivo", help="Archivo con un código por línea o - para la entrada estándar")
+    eliminar.set_defaults(funcion=comando_eliminar)
+
+    resumen = comandos.add_parser("resumen", help="Totales por grado y turno del año escolar activo como CSV")
+    resumen.set_defaults(funcion=comando_resumen)
+
+    esquema = comandos.add_parser("esquema", help="Mostrar las versiones de los objetos de esquema")
+    esquema.add_argument("--instalar", action="store_true", help="Instalar antes los objetos pendientes")
+    esquema.set_defaults(funcion=comando_esquema)
+
+    importar = comandos.add_parser("importar", help="Importar un CSV completo con COPY (todo o nada)")
+    importar.add_argument("archivo", help="Archivo CSV o - para la entrada estándar")
+    importar.set_defaults(funcion=comando_importar)
+
+    generar = comandos.add_parser("generar", help="Generar la grilla de secciones grados × letras × turnos")
+    generar.add_argument("--grados", default="1-6", help="Grados, p. ej. 1-6 o 1,3,5 (por defecto 1-6)")
+    generar.add_argument("--letras", default="".join(LETRAS_SECCION), help="Letras, p. ej. ABC (por defecto todas)")
+    generar.add_argument("--turnos", default="".join(TURNOS_SECCION), help="Turnos, p. ej. M (por defecto MT)")
+    generar.add_argument("--capacidad", type=int, default=30, help="Capacidad máxima de cada sección")
+    generar.add_argument("--docentes", help="Archivo con una cédula por línea, asignadas en el orden de la grilla "
+                                            "(sin él las secciones quedan sin docente guía, si la base de datos lo permite)")
+    generar.add_argument("--confirmar", action="store_true", help="Crear las secciones (sin esto solo se muestra el plan)")
+    generar.set_defaults(funcion=comando_generar)
+    return parser
+
+def main(argv=None):
+    args = crear_parser().parse_args(argv)
+    logging.basicConfig(level=logging.ERROR if args.verbose else logging.CRITICAL,
+                        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    if args.dbname:
+        DB_PARAMS["dbname"] = args.dbname
+    hilos = max(1, getattr(args, "hilos", 1))
+    args.hilos = hilos
+    pool = PoolConexiones(hilos, inicializar_conexion=verificar_esquema)
+    try:
+        return args.funcion(ServicioSecciones(pool), args)
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+    finally:
+        pool.cerrar()
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,2667 @@
+"""
+Acceso a datos de SIGME2 sin dependencias de Qt.
+
+Contiene el pool de conexiones, los objetos de esquema que la aplicación instala en el
+servidor, las consultas de secciones y docentes, la importación y exportación masiva y
+ServicioSecciones, que agrupa las operaciones que usan la interfaz gráfica y el modo por lotes.
+"""
+import contextvars
+import copy
+import csv
+import importlib
+import importlib.util
+import io
+import itertools
+import logging
+import os
+import re
+import select
+import threading
+import time
+import unicodedata
+import weakref
+from collections import defaultdict, deque
+
+import psycopg2
+import psycopg2.errors
+import psycopg2.extras
+
+# openpyxl es opcional y solo se usa para exportar a Excel. Tarda en importarse, así que se
+# carga al crear el primer EscritorXLSX y no al iniciar la aplicación.
+EXCEL_DISPONIBLE = importlib.util.find_spec("openpyxl") is not None
+
+logger = logging.getLogger(__name__)
+
+DB_PARAMS = {
+    'dbname': 'Sigme2',
+    'user': 'postgres',
+    'password': '12345678',
+    'host': 'localhost',
+    'port': '5432'
+}
+
+# Clave de ordenamiento única de la tabla de secciones, usada para la paginación por clave (keyset)
+COLUMNAS_ORDEN_SECCIONES = ("s.codigo_grado", "s.letra", "s.turno", "s.codigo")
+# Columnas mostradas en la tabla de secciones, en el orden de ENCABEZADOS_SECCIONES
+ENCABEZADOS_SECCIONES = ["Código", "Grado", "Letra", "Turno", "Aula", "Docente", "Capacidad Máxima"]
+COLUMNAS_TABLA_SECCIONES = """
+    s.codigo, s.codigo_grado, s.letra, s.turno, s.aula_asignada,
+    p.nombres || ' ' || p.apellidos || ' (' || s.cedula_docente_guia || ')' as docente_info,
+    s.capacidad_maxima
+"""
+# Docente guía de cada fila de una página. El LIMIT impide que el planificador convierta la
+# subconsulta en un hash join que recorre PERSONAL completa para mostrar unas pocas filas:
+# así el docente se busca por su clave primaria solo para las filas de la página.
+JOIN_DOCENTE_PAGINA = """
+    LEFT JOIN LATERAL (
+        SELECT d.nombres, d.apellidos FROM PERSONAL d WHERE d.cedula = s.cedula_docente_guia LIMIT 1
+    ) p ON true
+"""
+
+class OperacionCancelada(Exception):
+    """
+    La operación fue reemplazada por una más reciente y su resultado ya no se necesita.
+    """
+
+class TokenCancelacion:
+    """
+    Permite cancelar desde otro hilo la consulta que una operación ejecuta en su conexión.
+
+    La operación vincula su conexión mientras la usa; cancelar() interrumpe la sentencia en
+    curso en el servidor. Desvincular antes de devolver la conexión al pool evita cancelar
+    por error la consulta de otra operación que reciba la misma conexión.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._conn = None
+        self.cancelado = False
+
+    def vincular(self, conn):
+        with self._lock:
+            if self.cancelado:
+                raise OperacionCancelada()
+            self._conn = conn
+
+    def desvincular(self):
+        with self._lock:
+            self._conn = None
+
+    def cancelar(self):
+        with self._lock:
+            self.cancelado = True
+            if self._conn is not None:
+                try:
+                    self._conn.cancel()
+                except psycopg2.Error as e:
+                    logger.warning(f"No se pudo cancelar la consulta en curso: {e}")
+
+# --- Instrumentación de operaciones ---
+# Umbrales en segundos a partir de los cuales una operación se registra en el log de lentitud
+UMBRALES_LENTITUD = {
+    "total": 1.0, # Desde que la operación se encola hasta que termina de mostrarse
+    "espera_cola": 0.5,
+    "conexion": 0.5,
+    "sentencia": 0.25,
+    "presentacion": 0.1,
+}
+logger_lentitud = logging.getLogger("sigme.lentitud")
+logger_lentitud.setLevel(logging.WARNING) # Visible aunque el log general solo registre errores
+# Variable de contexto: cada hilo y cada tarea de asyncio ve su propia traza activa
+_traza_activa = contextvars.ContextVar("sigme_traza_activa", default=None)
+
+def traza_actual():
+    """Retorna la TrazaOperacion activa en el hilo o la tarea actual, o None."""
+    return _traza_activa.get()
+
+def resumir_sql(sql, largo=120):
+    texto = " ".join((sql.decode(errors="replace") if isinstance(sql, bytes) else str(sql)).split())
+    return texto if len(texto) <= largo else texto[:largo - 3] + "..."
+
+class TrazaOperacion:
+    """
+    Tiempos de una operación de base de datos, en segundos.
+
+    Mientras la traza está activa (with traza:), PoolConexiones suma a `conexion`
+    el tiempo para obtener una conexión y CursorInstrumentado (o el motor asíncrono) agrega
+    cada sentencia a `sentencias` como (sql resumido, duración, filas). Quien ejecuta la operación completa
+    espera_cola, ejecucion, presentacion y estado ("ok", "error" o "cancelada").
+    """
+    def __init__(self, nombre):
+        self.nombre = nombre
+        self.creada = time.time()
+        self.espera_cola = None
+        self.conexion = 0.0
+        self.ejecucion = None
+        self.presentacion = None
+        self.sentencias = []
+        self.estado = "pendiente"
+
+    def __enter__(self):
+        self._token_contexto = _traza_activa.set(self)
+        return self
+
+    def __exit__(self, *exc_info):
+        _traza_activa.reset(self._token_contexto)
+
+    @property
+    def total(self):
+        return sum(valor or 0.0 for valor in (self.espera_cola, self.ejecucion, self.presentacion))
+
+    @property
+    def filas(self):
+        return sum(max(filas, 0) for _, _, filas in self.sentencias)
+
+    def excesos(self, umbrales):
+        """Retorna la lista de mediciones que superan los umbrales, como texto."""
+        excesos = []
+        for campo in ("total", "espera_cola", "conexion", "presentacion"):
+            valor = getattr(self, campo)
+            if valor is not None and campo in umbrales and valor > umbrales[campo]:
+                excesos.append(f"{campo}={valor * 1000:.0f} ms")
+        for sql, duracion, filas in self.sentencias:
+            if duracion > umbrales.get("sentencia", float("inf")):
+                excesos.append(f"sentencia={duracion * 1000:.0f} ms ({filas} filas): {sql}")
+        return excesos
+
+class CursorInstrumentado(psycopg2.extensions.cursor):
+    """
+    Cursor que registra en la traza activa la duración y las filas de cada sentencia.
+
+    Sin una traza activa no registra nada, así que se usa como cursor por defecto de todas
+    las conexiones del pool.
+    """
+    sql_registrado = None # Texto a registrar en lugar de la consulta (p. ej. la de un EXECUTE)
+
+    def _registrar(self, sql, inicio):
+        traza = traza_actual()
+        if traza is not None:
+            traza.sentencias.append((resumir_sql(self.sql_registrado or sql), time.perf_counter() - inicio, self.rowcount))
+        self.sql_registrado = None
+
+    def execute(self, query, vars=None):
+        inicio = time.perf_counter()
+        try:
+            return super().execute(query, vars)
+        finally:
+            self._registrar(query, inicio)
+
+    def executemany(self, query, vars_list):
+        inicio = time.perf_counter()
+        try:
+            return super().executemany(query, vars_list)
+        finally:
+            self._registrar(query, inicio)
+
+    def copy_expert(self, sql, file, size=8192):
+        inicio = time.perf_counter()
+        try:
+            return super().copy_expert(sql, file, size)
+        finally:
+            self._registrar(sql, inicio)
+
+    def fetchmany(self, size=None):
+        if not self.name:
+            return super().fetchmany(size or self.arraysize)
+        # En un cursor del servidor cada lote es una consulta FETCH
+        inicio = time.perf_counter()
+        filas = super().fetchmany(size or self.arraysize)
+        traza = traza_actual()
+        if traza is not None:
+            traza.sentencias.append((f"FETCH {len(filas)} FROM {self.name}", time.perf_counter() - inicio, len(filas)))
+        return filas
+
+def percentil(valores, p):
+    """Percentil por rango más cercano sobre una lista ordenada."""
+    indice = max(0, -(-len(valores) * p // 100) - 1)
+    return valores[indice]
+
+class RegistroOperaciones:
+    """
+    Guarda las últimas trazas terminadas y registra en el log las que superan los umbrales.
+    """
+    def __init__(self, capacidad=500, umbrales=None):
+        self.umbrales = dict(UMBRALES_LENTITUD if umbrales is None else umbrales)
+        self._lock = threading.Lock()
+        self._trazas = deque(maxlen=capacidad)
+
+    def registrar(self, traza):
+        with self._lock:
+            self._trazas.append(traza)
+        excesos = traza.excesos(self.umbrales)
+        if excesos:
+            logger_lentitud.warning(f"Operación lenta {traza.nombre} ({traza.estado}, {len(traza.sentencias)} sentencias, "
+                                    f"{traza.filas} filas): {'; '.join(excesos)}")
+
+    def recientes(self):
+        """Retorna las trazas registradas, de la más reciente a la más antigua."""
+        with self._lock:
+            return list(reversed(self._trazas))
+
+    def percentiles(self, campo="total", percentiles=(50, 90, 99)):
+        """
+        Retorna {operación: {"cantidad": n, "p50": s, ...}} del campo indicado en segundos.
+        Solo considera las operaciones terminadas sin errores ni cancelaciones.
+        """
+        por_operacion = defaultdict(list)
+        for traza in self.recientes():
+            valor = getattr(traza, campo)
+            if traza.estado == "ok" and valor is not None:
+                por_operacion[traza.nombre].append(valor)
+        resumen = {}
+        for nombre, valores in sorted(por_operacion.items()):
+            valores.sort()
+            resumen[nombre] = {"cantidad": len(valores), **{f"p{p}": percentil(valores, p) for p in percentiles}}
+        return resumen
+
+# --- Sentencias preparadas ---
+USAR_SENTENCIAS_PREPARADAS = True # Desactivarlo ejecuta todas las consultas sin preparar
+EJECUCION_MEDICION_PREPARADA = 10 # Ejecución en la que se mide la planificación de la sentencia preparada
+_PATRON_PARAMETRO = re.compile(r"%\((\w+)\)s|%s|%%")
+_PATRON_PLANIFICACION = re.compile(r"Planning Time: ([\d.]+) ms")
+
+def convertir_parametros(sql):
+    """
+    Convierte los marcadores de psycopg2 (%s o %(nombre)s) en $1, $2... para PREPARE.
+    Retorna (sql convertido, claves de los parámetros en orden: índices o nombres).
+    """
+    claves = []
+    def reemplazar(coincidencia):
+        if coincidencia.group(0) == "%%":
+            return "%"
+        clave = coincidencia.group(1) if coincidencia.group(1) else len(claves)
+        if clave not in claves:
+            claves.append(clave)
+        return f"${claves.index(clave) + 1}"
+    return _PATRON_PARAMETRO.sub(reemplazar, sql), claves
+
+class EstadisticaSentencia:
+    """
+    Uso de una sentencia preparada en todas las conexiones del proceso. Los contadores se
+    actualizan bajo el lock de SentenciasPreparadas, desde los hilos de todas las conexiones.
+    """
+    def __init__(self, sql):
+        self.sql = sql
+        self.preparaciones = 0
+        self.ejecuciones = 0
+        self.planificacion_adhoc = None # Segundos de planificación sin preparar (EXPLAIN)
+        self.planificacion_preparada = None # Segundos con la sentencia preparada y su plan en caché
+
+    @property
+    def ahorro(self):
+        """Tiempo de planificación estimado que se evitó en el servidor, en segundos."""
+        if self.planificacion_adhoc is None or self.planificacion_preparada is None:
+            return None
+        return max(0.0, self.planificacion_adhoc - self.planificacion_preparada) * self.ejecuciones
+
+class SentenciasPreparadas:
+    """
+    Sentencias preparadas de una conexión: cada texto SQL se prepara con PREPARE la primera vez
+    que se usa en la conexión y después se ejecuta por nombre con EXECUTE.
+
+    Las sentencias preparadas duran lo que la conexión, así que solo tienen sentido con
+    conexiones de larga duración como las de PoolConexiones. Los textos que el servidor no
+    puede preparar se recuerdan y se ejecutan sin preparar.
+    """
+    MAXIMO = 64 # Sentencias por conexión; las búsquedas generan variantes del mismo texto
+    _lock = threading.Lock()
+    _por_conexion = weakref.WeakKeyDictionary()
+    _estadisticas = {}
+
+    def __init__(self):
+        self._sentencias = {} # sql -> (nombre, claves de los parámetros) o None si no se puede preparar
+
+    @classmethod
+    def de(cls, conn):
+        with cls._lock:
+            sentencias = cls._por_conexion.get(conn)
+            if sentencias is None:
+                sentencias = cls._por_conexion[conn] = cls()
+            return sentencias
+
+    @classmethod
+    def estadisticas(cls):
+        """Retorna una copia de las EstadisticaSentencia de todas las sentencias preparadas del proceso."""
+        with cls._lock:
+            return [copy.copy(estadistica) for estadistica in cls._estadisticas.values()]
+
+    @classmethod
+    def _contar(cls, sql, contador):
+        """Suma uno al contador de la estadística de sql; retorna (estadística, nuevo valor)."""
+        with cls._lock:
+            estadistica = cls._estadisticas.get(sql)
+            if estadistica is None:
+                estadistica = cls._estadisticas[sql] = EstadisticaSentencia(sql)
+            valor = getattr(estadistica, contador) + 1
+            setattr(estadistica, contador, valor)
+            return estadistica, valor
+
+    def ejecutar(self, cursor, sql, params=None):
+        preparada = self._sentencias.get(sql, False)
+        if preparada is False:
+            preparada = self._preparar(cursor, sql, params)
+        if preparada is None:
+            cursor.execute(sql, params)
+            return
+        nombre, claves = preparada
+        valores = [params[clave] for clave in claves]
+        ejecucion = f"EXECUTE {nombre} ({', '.join(['%s'] * len(valores))})" if valores else f"EXECUTE {nombre}"
+        estadistica, ejecuciones = self._contar(sql, "ejecuciones")
+        if ejecuciones == EJECUCION_MEDICION_PREPARADA:
+            # Pasadas las primeras ejecuciones el servidor ya decidió si conserva un plan genérico;
+            # mide solo el hilo cuya ejecución alcanzó ese número
+            estadistica.planificacion_preparada = self._medir_planificacion(cursor, f"EXPLAIN (SUMMARY ON) {ejecucion}", valores)
+        if isinstance(cursor, CursorInstrumentado):
+            cursor.sql_registrado = f"EXECUTE {nombre}: {sql}"
+        cursor.execute(ejecucion, valores)
+
+    def _preparar(self, cursor, sql, params):
+        if len(self._sentencias) >= self.MAXIMO:
+            return None
+        sql_convertido, claves = convertir_parametros(sql)
+        nombre = f"sigme_p{len(self._sentencias) + 1}"
+        # Un error dentro de una transacción la abortaría: PREPARE se protege con un punto de guardado
+        protegido = not cursor.connection.autocommit
+        try:
+            if protegido:
+                cursor.execute(f"SAVEPOINT sigme_preparar; PREPARE {nombre} AS {sql_convertido}; RELEASE SAVEPOINT sigme_preparar")
+            else:
+                cursor.execute(f"PREPARE {nombre} AS {sql_convertido}")
+        except psycopg2.Error as e:
+            if protegido:
+                cursor.execute("ROLLBACK TO SAVEPOINT sigme_preparar; RELEASE SAVEPOINT sigme_preparar")
+            logger.warning(f"No se pudo preparar la sentencia, se ejecutará sin preparar: {e}")
+            self._sentencias[sql] = None
+            return None
+        self._sentencias[sql] = (nombre, claves)
+        estadistica, preparaciones = self._contar(sql, "preparaciones")
+        if preparaciones == 1:
+            estadistica.planificacion_adhoc = self._medir_planificacion(cursor, f"EXPLAIN (SUMMARY ON) {sql}", params)
+        return nombre, claves
+
+    def _medir_planificacion(self, cursor, sql, params):
+        """Retorna el tiempo de planificación informado por EXPLAIN, en segundos (None si falla)."""
+        protegido = not cursor.connection.autocommit
+        try:
+            if protegido:
+                cursor.execute("SAVEPOINT sigme_medir")
+            cursor.execute(sql, params)
+            plan = "\n".join(fila[0] for fila in cursor.fetchall())
+            if protegido:
+                cursor.execute("RELEASE SAVEPOINT sigme_medir")
+        except psycopg2.Error as e:
+            if protegido:
+                cursor.execute("ROLLBACK TO SAVEPOINT sigme_medir; RELEASE SAVEPOINT sigme_medir")
+            logger.warning(f"No se pudo medir la planificación de una sentencia preparada: {e}")
+            return None
+        coincidencia = _PATRON_PLANIFICACION.search(plan)
+        return float(coincidencia.group(1)) / 1000 if coincidencia else None
+
+def ejecutar_preparada(cursor, sql, params=None):
+    """
+    Ejecuta sql en el cursor como sentencia preparada de su conexión (ver SentenciasPreparadas).
+    Los resultados se leen del cursor igual que después de cursor.execute().
+    """
+    if not USAR_SENTENCIAS_PREPARADAS:
+        cursor.execute(sql, params)
+        return
+    SentenciasPreparadas.de(cursor.connection).ejecutar(cursor, sql, params)
+
+def conectar_db():
+    """
+    Establece una conexión a la base de datos PostgreSQL.
+    """
+    try:
+        conn = psycopg2.connect(**DB_PARAMS)
+        conn.set_client_encoding('UTF8')
+        conn.cursor_factory = CursorInstrumentado
+        return conn
+    except psycopg2.Error as e:
+        logger.critical(f"Error al conectar a la base de datos: {e}", exc_info=True)
+        raise Exception(f"No se pudo conectar a la base de datos. Por favor, verifique la configuración y el estado del servidor.")
+
+class PoolConexiones:
+    """
+    Pool de conexiones PostgreSQL de larga duración compartido por los DBWorker.
+
+    Las conexiones se reutilizan entre operaciones en lugar de abrir una nueva
+    por cada acción. Las conexiones que llevan tiempo inactivas se verifican
+    antes de entregarse y se reemplazan si el servidor se reinició.
+    """
+    def __init__(self, max_conexiones, intervalo_verificacion=30, tiempo_espera=30, inicializar_conexion=None):
+        self.max_conexiones = max(1, max_conexiones)
+        self.inicializar_conexion = inicializar_conexion # Función llamada con cada conexión nueva
+        self.intervalo_verificacion = intervalo_verificacion # Segundos de inactividad antes de verificar
+        self.tiempo_espera = tiempo_espera # Segundos máximos esperando una conexión libre
+        self._condicion = threading.Condition()
+        self._libres = [] # Pila de (conexión, instante en que fue devuelta)
+        self._en_uso = set()
+        self._abiertas = 0 # Conexiones abiertas o en proceso de apertura
+        self._cerrado = False
+        self._estadisticas = {
+            "creadas": 0,
+            "reutilizadas": 0,
+            "descartadas": 0,
+            "reconexiones": 0,
+            "esperas": 0,
+        }
+
+    def obtener(self):
+        """
+        Entrega una conexión del pool, creando una nueva si hay cupo disponible.
+        El tiempo empleado se suma a la traza activa del hilo.
+        """
+        inicio = time.monotonic()
+        try:
+            return self._obtener()
+        finally:
+            traza = traza_actual()
+            if traza is not None:
+                traza.conexion += time.monotonic() - inicio
+
+    def _obtener(self):
+        conn, devuelta_en = self._reservar()
+        try:
+            if conn is None:
+                conn = self._crear_conexion()
+                with self._condicion:
+                    self._estadisticas["creadas"] += 1
+            elif not self._esta_disponible(conn, devuelta_en):
+                self._cerrar_conexion(conn)
+                with self._condicion:
+                    self._estadisticas["descartadas"] += 1
+                    self._forzar_verificacion()
+                conn = self._crear_conexion()
+                with self._condicion:
+                    self._estadisticas["reconexiones"] += 1
+            else:
+                with self._condicion:
+                    self._estadisticas["reutilizadas"] += 1
+        except Exception:
+            self._liberar_cupo()
+            raise
+
+        with self._condicion:
+            self._en_uso.add(conn)
+        return conn
+
+    def devolver(self, conn):
+        """
+        Devuelve una conexión al pool, descartándola si quedó inutilizable.
+        """
+        reutilizable = not conn.closed
+        if reutilizable:
+            try:
+                estado = conn.get_transaction_status()
+                if estado == psycopg2.extensions.TRANSACTION_STATUS_UNKNOWN:
+                    reutilizable = False
+                elif estado != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+            except psycopg2.Error as e:
+                logger.warning(f"Conexión descartada al devolverla al pool: {e}")
+                reutilizable = False
+
+        with self._condicion:
+            self._en_uso.discard(conn)
+            if reutilizable and not self._cerrado:
+                self._libres.append((conn, time.monotonic()))
+                self._condicion.notify()
+                return
+            self._abiertas -= 1
+            if not reutilizable:
+                self._estadisticas["descartadas"] += 1
+                # Una conexión rota suele indicar un reinicio del servidor: verificar también las inactivas
+                self._forzar_verificacion()
+            self._condicion.notify()
+        self._cerrar_conexion(conn)
+
+    def cerrar(self):
+        """
+        Cierra las conexiones inactivas. Las que estén en uso se cierran al devolverse.
+        """
+        with self._condicion:
+            self._cerrado = True
+            libres = [conn for conn, _ in self._libres]
+            self._libres = []
+            self._abiertas -= len(libres)
+            self._condicion.notify_all()
+        for conn in libres:
+            self._cerrar_conexion(conn)
+
+    def estadisticas(self):
+        """
+        Retorna un resumen del estado y uso del pool.
+        """
+        with self._condicion:
+            resumen = dict(self._estadisticas)
+            resumen.update({
+                "max_conexiones": self.max_conexiones,
+                "abiertas": self._abiertas,
+                "libres": len(self._libres),
+                "en_uso": len(self._en_uso),
+            })
+        return resumen
+
+    def _reservar(self):
+        with self._condicion:
+            limite = time.monotonic() + self.tiempo_espera
+            espero = False
+            while True:
+                if self._cerrado:
+                    raise Exception("El pool de conexiones está cerrado.")
+                if self._libres:
+                    return self._libres.pop()
+                if self._abiertas < self.max_conexiones:
+                    self._abiertas += 1
+                    return None, None
+                if not espero:
+                    espero = True
+                    self._estadisticas["esperas"] += 1
+                restante = limite - time.monotonic()
+                if restante <= 0:
+                    raise Exception("No hay conexiones disponibles con la base de datos. Intente nuevamente en unos momentos.")
+                self._condicion.wait(restante)
+
+    def _crear_conexion(self):
+        conn = conectar_db()
+        if self.inicializar_conexion:
+            try:
+                self.inicializar_conexion(conn)
+            except Exception:
+                self._cerrar_conexion(conn)
+                raise
+        return conn
+
+    def _liberar_cupo(self):
+        with self._condicion:
+            self._abiertas -= 1
+            self._condicion.notify()
+
+    def _esta_disponible(self, conn, devuelta_en):
+        if conn.closed:
+            return False
+        if devuelta_en is not None and time.monotonic() - devuelta_en < self.intervalo_verificacion:
+            return True
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT 1")
+            cursor.close()
+            conn.rollback()
+            return True
+        except psycopg2.Error as e:
+            logger.warning(f"Conexión inactiva no válida, se reconectará: {e}")
+            return False
+
+    def _forzar_verificacion(self):
+        # Debe llamarse con self._condicion adquirida
+        self._libres = [(conn, None) for conn, _ in self._libres]
+
+    def _cerrar_conexion(self, conn):
+        try:
+            conn.close()
+        except psycopg2.Error:
+            pass
+
+# Objetos de esquema que la aplicación necesita en el servidor. Cada entrada tiene una clave,
+# una versión, una descripción, una expresión que indica si ya existen y el DDL idempotente que
+# los crea. Al cambiar el DDL de una entrada se incrementa su versión: asegurar_esquema() lo
+# vuelve a ejecutar en los servidores que tengan registrada una versión anterior (sigme_esquema).
+# La instalación es un paso explícito (sigme_cli.py esquema --instalar); al iniciar, la
+# aplicación solo verifica qué entradas están al día (verificar_esquema).
+OBJETOS_ESQUEMA = [
+    (
+        "busqueda",
+        1,
+        "búsqueda indexada de secciones",
+        """
+            to_regprocedure('sigme_documento_seccion(text,text,text,text,text,text)') IS NOT NULL
+            AND EXISTS (SELECT 1 FROM pg_trigger WHERE tgname = 'trg_personal_busqueda')
+            AND to_regclass('idx_seccion_busqueda_trgm') IS NOT NULL
+        """,
+        """
+            CREATE EXTENSION IF NOT EXISTS unaccent;
+            CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+            CREATE OR REPLACE FUNCTION sigme_normalizar(texto text) RETURNS text
+                LANGUAGE sql IMMUTABLE PARALLEL SAFE
+                AS $$ SELECT lower(public.unaccent('public.unaccent'::regdictionary, coalesce(texto, ''))) $$;
+
+            CREATE OR REPLACE FUNCTION sigme_documento_seccion(
+                codigo text, grado text, letra text, aula text, nombres text, apellidos text
+            ) RETURNS text
+                LANGUAGE sql IMMUTABLE PARALLEL SAFE
+                AS $$ SELECT sigme_normalizar(concat_ws(' ', codigo, grado, letra, aula, nombres, apellidos)) $$;
+
+            ALTER TABLE SECCION ADD COLUMN IF NOT EXISTS busqueda text;
+
+            CREATE OR REPLACE FUNCTION sigme_seccion_busqueda() RETURNS trigger
+                LANGUAGE plpgsql AS $$
+            DECLARE
+                v_nombres text;
+                v_apellidos text;
+            BEGIN
+                SELECT nombres, apellidos INTO v_nombres, v_apellidos
+                FROM PERSONAL WHERE cedula = NEW.cedula_docente_guia;
+                NEW.busqueda := sigme_documento_seccion(
+                    NEW.codigo, NEW.codigo_grado::text, NEW.letra, NEW.aula_asignada, v_nombres, v_apellidos
+                );
+                RETURN NEW;
+            END $$;
+
+            DROP TRIGGER IF EXISTS trg_seccion_busqueda ON SECCION;
+            CREATE TRIGGER trg_seccion_busqueda
+                BEFORE INSERT OR UPDATE OF codigo, codigo_grado, letra, aula_asignada, cedula_docente_guia
+                ON SECCION FOR EACH ROW EXECUTE FUNCTION sigme_seccion_busqueda();
+
+            CREATE OR REPLACE FUNCTION sigme_personal_busqueda() RETURNS trigger
+                LANGUAGE plpgsql AS $$
+            BEGIN
+                UPDATE SECCION s SET busqueda = sigme_documento_seccion(
+                    s.codigo, s.codigo_grado::text, s.letra, s.aula_asignada, NEW.nombres, NEW.apellidos
+                )
+                WHERE s.cedula_docente_guia = NEW.cedula;
+                RETURN NULL;
+            END $$;
+
+            DROP TRIGGER IF EXISTS trg_personal_busqueda ON PERSONAL;
+            CREATE TRIGGER trg_personal_busqueda
+                AFTER UPDATE OF nombres, apellidos ON PERSONAL
+                FOR EACH ROW EXECUTE FUNCTION sigme_personal_busqueda();
+
+            -- Completar el documento de las secciones existentes (dispara trg_seccion_busqueda)
+            UPDATE SECCION SET cedula_docente_guia = cedula_docente_guia WHERE busqueda IS NULL;
+
+            CREATE INDEX IF NOT EXISTS idx_seccion_busqueda_trgm ON SECCION USING gin (busqueda gin_trgm_ops);
+        """,
+    ),
+    (
+        "rutinas",
+        3,
+        "rutinas de asignación y actualización de secciones",
+        """
+            to_regprocedure('sigme_asignar_seccion(text,integer,text,text,text,text,integer)') IS NOT NULL
+            AND to_regprocedure('sigme_actualizar_seccion(text,text,integer,text,text,text,integer)') IS NOT NULL
+            AND to_regprocedure('sigme_aula_disponible(integer,text,text)') IS NOT NULL
+            AND to_regclass('idx_seccion_ano_grado_turno_aula') IS NOT NULL
+        """,
+        """
+            -- Aulas ocupadas por año escolar, grado y turno: respalda la búsqueda de huecos
+            CREATE INDEX IF NOT EXISTS idx_seccion_ano_grado_turno_aula
+                ON SECCION (codigo_ano_escolar, codigo_grado, turno, aula_asignada);
+
+            -- Menor aula libre de la banda del grado (grado*100 .. grado*100+99) en el turno y año
+            -- indicados. Reutiliza las aulas liberadas y no depende de las de otros años o turnos.
+            CREATE OR REPLACE FUNCTION sigme_aula_disponible(p_grado integer, p_turno text, p_ano text)
+                RETURNS text LANGUAGE sql STABLE AS $$
+                SELECT n::text
+                FROM generate_series(p_grado * 100, p_grado * 100 + 99) AS n
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM SECCION s
+                    WHERE s.codigo_ano_escolar = p_ano AND s.codigo_grado = p_grado
+                      AND s.turno = p_turno AND s.aula_asignada = n::text
+                )
+                ORDER BY n
+                LIMIT 1
+            $$;
+
+            -- Los bloqueos consultivos serializan las escrituras que compiten por el mismo
+            -- grado/turno o el mismo docente en un año escolar. Se toman siempre en ese orden.
+            CREATE OR REPLACE FUNCTION sigme_bloquear_seccion(p_ano text, p_grado integer, p_turno text, p_docente text)
+                RETURNS void LANGUAGE sql AS $$
+                SELECT pg_advisory_xact_lock(hashtext('sigme_grado_turno'), hashtext(p_ano || '/' || p_grado || '/' || p_turno));
+                SELECT pg_advisory_xact_lock(hashtext('sigme_docente'), hashtext(p_ano || '/' || p_docente));
+            $$;
+
+            -- Versiones anteriores que consultaban el año escolar activo por su cuenta
+            DROP FUNCTION IF EXISTS sigme_asignar_seccion(integer, text, text, text, text, integer);
+            DROP FUNCTION IF EXISTS sigme_actualizar_seccion(text, integer, text, text, text, integer);
+            -- y que no retornaban la fila escrita (el tipo de retorno no se puede reemplazar)
+            DROP FUNCTION IF EXISTS sigme_asignar_seccion(text, integer, text, text, text, text, integer);
+            DROP FUNCTION IF EXISTS sigme_actualizar_seccion(text, text, integer, text, text, text, integer);
+
+            -- Fila de la sección como la muestra la tabla (COLUMNAS_TABLA_SECCIONES), en JSON
+            CREATE OR REPLACE FUNCTION sigme_fila_seccion(s SECCION) RETURNS json
+                LANGUAGE sql STABLE AS $$
+                SELECT json_build_array(
+                    s.codigo, s.codigo_grado, s.letra, s.turno, s.aula_asignada,
+                    (SELECT p.nombres || ' ' || p.apellidos || ' (' || p.cedula || ')'
+                     FROM PERSONAL p WHERE p.cedula = s.cedula_docente_guia),
+                    s.capacidad_maxima)
+            $$;
+
+            CREATE OR REPLACE FUNCTION sigme_asignar_seccion(
+                p_ano text, p_grado integer, p_letra text, p_turno text, p_docente text, p_aula text, p_capacidad integer
+            ) RETURNS TABLE (codigo_error text, codigo_seccion text, aula text, detalle text, fila json)
+                LANGUAGE plpgsql AS $$
+            DECLARE
+                v_aula text := p_aula;
+                v_otra text;
+                v_seccion SECCION;
+            BEGIN
+                -- El año escolar llega desde la caché del cliente: confirmar que sigue activo
+                IF NOT EXISTS (SELECT 1 FROM ANO_ESCOLAR a WHERE a.codigo = p_ano AND a.activo) THEN
+                    RETURN QUERY SELECT 'ANO_ESCOLAR_INACTIVO', NULL::text, NULL::text, NULL::text, NULL::json;
+                    RETURN;
+                END IF;
+                PERFORM sigme_bloquear_seccion(p_ano, p_grado, p_turno, p_docente);
+
+                IF EXISTS (
+                    SELECT 1 FROM SECCION s
+                    WHERE s.codigo_grado = p_grado AND s.letra = p_letra AND s.turno = p_turno AND s.codigo_ano_escolar = p_ano
+                ) THEN
+                    RETURN QUERY SELECT 'SECCION_EXISTENTE', NULL::text, NULL::text, NULL::text, NULL::json;
+                    RETURN;
+                END IF;
+
+                -- El código no incluye el año escolar: puede estar en uso por una sección de otro año
+                SELECT s.codigo_ano_escolar INTO v_otra FROM SECCION s
+                WHERE s.codigo = p_grado || p_letra || '-' || p_turno;
+                IF v_otra IS NOT NULL THEN
+                    RETURN QUERY SELECT 'CODIGO_EXISTENTE', NULL::text, NULL::text, v_otra, NULL::json;
+                    RETURN;
+                END IF;
+
+                SELECT s.codigo INTO v_otra FROM SECCION s
+                WHERE s.cedula_docente_guia = p_docente AND s.codigo_ano_escolar = p_ano LIMIT 1;
+                IF v_otra IS NOT NULL THEN
+                    RETURN QUERY SELECT 'DOCENTE_ASIGNADO', NULL::text, NULL::text, v_otra, NULL::json;
+                    RETURN;
+                END IF;
+
+                IF v_aula IS NOT NULL THEN
+                    IF EXISTS (
+                        SELECT 1 FROM SECCION s
+                        WHERE s.aula_asignada = v_aula AND s.codigo_grado = p_grado AND s.turno = p_turno AND s.codigo_ano_escolar = p_ano
+                    ) THEN
+                        RETURN QUERY SELECT 'AULA_OCUPADA', NULL::text, NULL::text, v_aula, NULL::json;
+                        RETURN;
+                    END IF;
+                ELSE
+                    -- El bloqueo de grado/turno tomado arriba impide que otra asignación elija la misma aula
+                    v_aula := sigme_aula_disponible(p_grado, p_turno, p_ano);
+                    IF v_aula IS NULL THEN
+                        RETURN QUERY SELECT 'SIN_AULAS', NULL::text, NULL::text, NULL::text, NULL::json;
+                        RETURN;
+                    END IF;
+                END IF;
+
+                INSERT INTO SECCION (
+                    codigo, letra, codigo_grado, turno,
+                    cedula_docente_guia, aula_asignada,
+                    capacidad_maxima, total_estudiantes,
+                    estudiantes_varones, estudiantes_hembras,
+                    codigo_ano_escolar
+                ) VALUES (
+                    p_grado || p_letra || '-' || p_turno, p_letra, p_grado, p_turno,
+                    p_docente, v_aula,
+                    p_capacidad, 0, 0, 0,
+                    p_ano
+                ) RETURNING * INTO v_seccion;
+                RETURN QUERY SELECT NULL::text, v_seccion.codigo::text, v_aula, NULL::text, sigme_fila_seccion(v_seccion);
+            END $$;
+
+            CREATE OR REPLACE FUNCTION sigme_actualizar_seccion(
+                p_ano text, p_codigo text, p_grado integer, p_turno text, p_docente text, p_aula text, p_capacidad integer
+            ) RETURNS TABLE (codigo_error text, codigo_seccion text, aula text, detalle text, fila json)
+                LANGUAGE plpgsql AS $$
+            DECLARE
+                v_otra text;
+                v_seccion SECCION;
+            BEGIN
+                -- El año escolar llega desde la caché del cliente: confirmar que sigue activo
+                IF NOT EXISTS (SELECT 1 FROM ANO_ESCOLAR a WHERE a.codigo = p_ano AND a.activo) THEN
+                    RETURN QUERY SELECT 'ANO_ESCOLAR_INACTIVO', NULL::text, NULL::text, NULL::text, NULL::json;
+                    RETURN;
+                END IF;
+                PERFORM sigme_bloquear_seccion(p_ano, p_grado, p_turno, p_docente);
+
+                SELECT s.codigo INTO v_otra FROM SECCION s
+                WHERE s.cedula_docente_guia = p_docente AND s.codigo_ano_escolar = p_ano AND s.codigo != p_codigo LIMIT 1;
+                IF v_otra IS NOT NULL THEN
+                    RETURN QUERY SELECT 'DOCENTE_ASIGNADO', NULL::text, NULL::text, v_otra, NULL::json;
+                    RETURN;
+                END IF;
+
+                IF p_aula IS NOT NULL AND EXISTS (
+                    SELECT 1 FROM SECCION s
+                    WHERE s.aula_asignada = p_aula AND s.codigo_grado = p_grado AND s.turno = p_turno
+                      AND s.codigo_ano_escolar = p_ano AND s.codigo != p_codigo
+                ) THEN
+                    RETURN QUERY SELECT 'AULA_OCUPADA_OTRA_SECCION', NULL::text, NULL::text, p_aula, NULL::json;
+                    RETURN;
+                END IF;
+
+                UPDATE SECCION SET
+                    cedula_docente_guia = p_docente,
+                    aula_asignada = p_aula,
+                    capacidad_maxima = p_capacidad
+                WHERE codigo = p_codigo AND codigo_ano_escolar = p_ano
+                RETURNING * INTO v_seccion;
+                IF NOT FOUND THEN
+                    RETURN QUERY SELECT 'SECCION_NO_ENCONTRADA', NULL::text, NULL::text, NULL::text, NULL::json;
+                    RETURN;
+                END IF;
+                RETURN QUERY SELECT NULL::text, p_codigo, p_aula, NULL::text, sigme_fila_seccion(v_seccion);
+            END $$;
+        """,
+    ),
+    (
+        "notificaciones",
+        1,
+        "notificación de cambios del año escolar",
+        """
+            EXISTS (SELECT 1 FROM pg_trigger WHERE tgname = 'trg_ano_escolar_notificar')
+        """,
+        """
+            CREATE OR REPLACE FUNCTION sigme_notificar_ano_escolar() RETURNS trigger
+                LANGUAGE plpgsql AS $$
+            BEGIN
+                PERFORM pg_notify('sigme_ano_escolar', '');
+                RETURN NULL;
+            END $$;
+
+            DROP TRIGGER IF EXISTS trg_ano_escolar_notificar ON ANO_ESCOLAR;
+            CREATE TRIGGER trg_ano_escolar_notificar
+                AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON ANO_ESCOLAR
+                FOR EACH STATEMENT EXECUTE FUNCTION sigme_notificar_ano_escolar();
+        """,
+    ),
+    (
+        "docentes",
+        1,
+        "búsqueda de docentes por prefijo",
+        """
+            to_regclass('idx_personal_cedula_patron') IS NOT NULL
+            AND to_regclass('idx_personal_nombre_patron') IS NOT NULL
+            AND to_regclass('idx_personal_apellidos_patron') IS NOT NULL
+        """,
+        """
+            -- Índices de prefijo (LIKE 'texto%') para el selector de docentes. Las expresiones
+            -- deben coincidir con las de buscar_docentes() para que el planificador las use.
+            CREATE INDEX IF NOT EXISTS idx_personal_cedula_patron ON PERSONAL (cedula text_pattern_ops);
+            CREATE INDEX IF NOT EXISTS idx_personal_nombre_patron
+                ON PERSONAL (sigme_normalizar(nombres || ' ' || apellidos) text_pattern_ops);
+            CREATE INDEX IF NOT EXISTS idx_personal_apellidos_patron
+                ON PERSONAL (sigme_normalizar(apellidos) text_pattern_ops);
+        """,
+    ),
+    (
+        "resumen",
+        1,
+        "resumen de secciones por año escolar, grado y turno",
+        """
+            to_regclass('sigme_resumen_secciones') IS NOT NULL
+            AND EXISTS (SELECT 1 FROM pg_trigger WHERE tgname = 'trg_seccion_resumen_truncar')
+        """,
+        """
+            -- Bloquea las escrituras en SECCION mientras se crean los disparadores y se carga el resumen
+            LOCK TABLE SECCION IN SHARE ROW EXCLUSIVE MODE;
+
+            -- Totales por año escolar, grado y turno. aulas_usadas cuenta las secciones con aula,
+            -- que no se repite dentro de un mismo año, grado y turno.
+            CREATE TABLE IF NOT EXISTS sigme_resumen_secciones (
+                codigo_ano_escolar varchar(20) NOT NULL,
+                codigo_grado integer NOT NULL,
+                turno varchar(1) NOT NULL,
+                secciones integer NOT NULL DEFAULT 0,
+                capacidad_total bigint NOT NULL DEFAULT 0,
+                estudiantes_total bigint NOT NULL DEFAULT 0,
+                aulas_usadas integer NOT NULL DEFAULT 0,
+                PRIMARY KEY (codigo_ano_escolar, codigo_grado, turno)
+            );
+
+            -- Suma al resumen las filas nuevas de la sentencia (+1) y resta las anteriores (-1).
+            -- Con tablas de transición una importación o un borrado por lotes actualiza cada grupo
+            -- una sola vez; el orden fijo de los grupos evita interbloqueos. Las sentencias son
+            -- estáticas para que PL/pgSQL conserve sus planes entre ejecuciones. Las actualizaciones
+            -- que no cambian ningún total (p. ej. la del documento de búsqueda) no escriben el resumen.
+            CREATE OR REPLACE FUNCTION sigme_resumen_seccion() RETURNS trigger
+                LANGUAGE plpgsql AS $$
+            BEGIN
+                IF TG_OP = 'INSERT' THEN
+                    INSERT INTO sigme_resumen_secciones AS r
+                        (codigo_ano_escolar, codigo_grado, turno, secciones, capacidad_total, estudiantes_total, aulas_usadas)
+                    SELECT codigo_ano_escolar, codigo_grado, turno, SUM(signo), SUM(signo * capacidad_maxima),
+                           SUM(signo * total_estudiantes), SUM(signo * (aula_asignada IS NOT NULL)::integer)
+                    FROM (SELECT *, 1 AS signo FROM nuevas) d
+                    GROUP BY codigo_ano_escolar, codigo_grado, turno
+                    ORDER BY codigo_ano_escolar, codigo_grado, turno
+                    ON CONFLICT (codigo_ano_escolar, codigo_grado, turno) DO UPDATE SET
+                        secciones = r.secciones + EXCLUDED.secciones,
+                        capacidad_total = r.capacidad_total + EXCLUDED.capacidad_total,
+                        estudiantes_total = r.estudiantes_total + EXCLUDED.estudiantes_total,
+                        aulas_usadas = r.aulas_usadas + EXCLUDED.aulas_usadas;
+                ELSIF TG_OP = 'DELETE' THEN
+                    INSERT INTO sigme_resumen_secciones AS r
+                        (codigo_ano_escolar, codigo_grado, turno, secciones, capacidad_total, estudiantes_total, aulas_usadas)
+                    SELECT codigo_ano_escolar, codigo_grado, turno, SUM(signo), SUM(signo * capacidad_maxima),
+                           SUM(signo * total_estudiantes), SUM(signo * (aula_asignada IS NOT NULL)::integer)
+                    FROM (SELECT *, -1 AS signo FROM antiguas) d
+                    GROUP BY codigo_ano_escolar, codigo_grado, turno
+                    ORDER BY codigo_ano_escolar, codigo_grado, turno
+                    ON CONFLICT (codigo_ano_escolar, codigo_grado, turno) DO UPDATE SET
+                        secciones = r.secciones + EXCLUDED.secciones,
+                        capacidad_total = r.capacidad_total + EXCLUDED.capacidad_total,
+                        estudiantes_total = r.estudiantes_total + EXCLUDED.estudiantes_total,
+                        aulas_usadas = r.aulas_usadas + EXCLUDED.aulas_usadas;
+                ELSE
+                    INSERT INTO sigme_resumen_secciones AS r
+                        (codigo_ano_escolar, codigo_grado, turno, secciones, capacidad_total, estudiantes_total, aulas_usadas)
+                    SELECT codigo_ano_escolar, codigo_grado, turno, SUM(signo), SUM(signo * capacidad_maxima),
+                           SUM(signo * total_estudiantes), SUM(signo * (aula_asignada IS NOT NULL)::integer)
+                    FROM (SELECT *, 1 AS signo FROM nuevas UNION ALL SELECT *, -1 FROM antiguas) d
+                    GROUP BY codigo_ano_escolar, codigo_grado, turno
+                    HAVING SUM(signo) != 0 OR SUM(signo * capacidad_maxima) != 0 OR SUM(signo * total_estudiantes) != 0
+                        OR SUM(signo * (aula_asignada IS NOT NULL)::integer) != 0
+                    ORDER BY codigo_ano_escolar, codigo_grado, turno
+                    ON CONFLICT (codigo_ano_escolar, codigo_grado, turno) DO UPDATE SET
+                        secciones = r.secciones + EXCLUDED.secciones,
+                        capacidad_total = r.capacidad_total + EXCLUDED.capacidad_total,
+                        estudiantes_total = r.estudiantes_total + EXCLUDED.estudiantes_total,
+                        aulas_usadas = r.aulas_usadas + EXCLUDED.aulas_usadas;
+                END IF;
+                RETURN NULL;
+            END $$;
+
+            CREATE OR REPLACE FUNCTION sigme_resumen_truncar() RETURNS trigger
+                LANGUAGE plpgsql AS $$
+            BEGIN
+                DELETE FROM sigme_resumen_secciones;
+                RETURN NULL;
+            END $$;
+
+            DROP TRIGGER IF EXISTS trg_seccion_resumen_insertar ON SECCION;
+            CREATE TRIGGER trg_seccion_resumen_insertar AFTER INSERT ON SECCION
+                REFERENCING NEW TABLE AS nuevas
+                FOR EACH STATEMENT EXECUTE FUNCTION sigme_resumen_seccion();
+            DROP TRIGGER IF EXISTS trg_seccion_resumen_actualizar ON SECCION;
+            CREATE TRIGGER trg_seccion_resumen_actualizar AFTER UPDATE ON SECCION
+                REFERENCING OLD TABLE AS antiguas NEW TABLE AS nuevas
+                FOR EACH STATEMENT EXECUTE FUNCTION sigme_resumen_seccion();
+            DROP TRIGGER IF EXISTS trg_seccion_resumen_eliminar ON SECCION;
+            CREATE TRIGGER trg_seccion_resumen_eliminar AFTER DELETE ON SECCION
+                REFERENCING OLD TABLE AS antiguas
+                FOR EACH STATEMENT EXECUTE FUNCTION sigme_resumen_seccion();
+            DROP TRIGGER IF EXISTS trg_seccion_resumen_truncar ON SECCION;
+            CREATE TRIGGER trg_seccion_resumen_truncar AFTER TRUNCATE ON SECCION
+                FOR EACH STATEMENT EXECUTE FUNCTION sigme_resumen_truncar();
+
+            -- Carga inicial (o reconstrucción) a partir de las secciones existentes
+            DELETE FROM sigme_resumen_secciones;
+            INSERT INTO sigme_resumen_secciones
+                (codigo_ano_escolar, codigo_grado, turno, secciones, capacidad_total, estudiantes_total, aulas_usadas)
+            SELECT codigo_ano_escolar, codigo_grado, turno, COUNT(*), COALESCE(SUM(capacidad_maxima), 0),
+                   COALESCE(SUM(total_estudiantes), 0), COUNT(aula_asignada)
+            FROM SECCION
+            GROUP BY codigo_ano_escolar, codigo_grado, turno;
+        """,
+    ),
+    (
+        "cambios",
+        1,
+        "registro de cambios para las réplicas locales",
+        """
+            to_regclass('sigme_cambios') IS NOT NULL
+            AND EXISTS (SELECT 1 FROM pg_trigger WHERE tgname = 'trg_ano_escolar_cambios_truncar')
+        """,
+        """
+            -- Claves de las filas de SECCION, PERSONAL y ANO_ESCOLAR modificadas por cada
+            -- transacción. Las réplicas (sigme_replica.py) leen desde la última transacción que
+            -- vieron y vuelven a consultar solo esas filas. clave = '*' indica un TRUNCATE.
+            CREATE TABLE IF NOT EXISTS sigme_cambios (
+                id bigserial PRIMARY KEY,
+                transaccion bigint NOT NULL DEFAULT txid_current(),
+                tabla text NOT NULL,
+                clave text NOT NULL,
+                registrado timestamptz NOT NULL DEFAULT now()
+            );
+            CREATE INDEX IF NOT EXISTS idx_sigme_cambios_transaccion ON sigme_cambios (transaccion);
+            CREATE INDEX IF NOT EXISTS idx_sigme_cambios_registrado ON sigme_cambios (registrado);
+
+            -- TG_ARGV[0] es la columna clave de la tabla
+            CREATE OR REPLACE FUNCTION sigme_registrar_cambios() RETURNS trigger
+                LANGUAGE plpgsql AS $$
+            BEGIN
+                IF TG_OP = 'INSERT' THEN
+                    INSERT INTO sigme_cambios (tabla, clave)
+                    SELECT DISTINCT TG_TABLE_NAME, to_jsonb(n) ->> TG_ARGV[0] FROM nuevas n;
+                ELSIF TG_OP = 'DELETE' THEN
+                    INSERT INTO sigme_cambios (tabla, clave)
+                    SELECT DISTINCT TG_TABLE_NAME, to_jsonb(a) ->> TG_ARGV[0] FROM antiguas a;
+                ELSIF TG_OP = 'UPDATE' THEN
+                    INSERT INTO sigme_cambios (tabla, clave)
+                    SELECT TG_TABLE_NAME, to_jsonb(n) ->> TG_ARGV[0] FROM nuevas n
+                    UNION
+                    SELECT TG_TABLE_NAME, to_jsonb(a) ->> TG_ARGV[0] FROM antiguas a;
+                ELSE
+                    INSERT INTO sigme_cambios (tabla, clave) VALUES (TG_TABLE_NAME, '*');
+                END IF;
+                RETURN NULL;
+            END $$;
+
+            DO $$
+            DECLARE
+                v_tabla text;
+                v_clave text;
+            BEGIN
+                FOR v_tabla, v_clave IN VALUES ('seccion', 'codigo'), ('personal', 'cedula'), ('ano_escolar', 'codigo') LOOP
+                    EXECUTE format('DROP TRIGGER IF EXISTS %1$I ON %2$I', 'trg_' || v_tabla || '_cambios_insertar', v_tabla);
+                    EXECUTE format('CREATE TRIGGER %1$I AFTER INSERT ON %2$I REFERENCING NEW TABLE AS nuevas
+                                    FOR EACH STATEMENT EXECUTE FUNCTION sigme_registrar_cambios(%3$L)',
+                                   'trg_' || v_tabla || '_cambios_insertar', v_tabla, v_clave);
+                    EXECUTE format('DROP TRIGGER IF EXISTS %1$I ON %2$I', 'trg_' || v_tabla || '_cambios_actualizar', v_tabla);
+                    EXECUTE format('CREATE TRIGGER %1$I AFTER UPDATE ON %2$I REFERENCING OLD TABLE AS antiguas NEW TABLE AS nuevas
+                                    FOR EACH STATEMENT EXECUTE FUNCTION sigme_registrar_cambios(%3$L)',
+                                   'trg_' || v_tabla || '_cambios_actualizar', v_tabla, v_clave);
+                    EXECUTE format('DROP TRIGGER IF EXISTS %1$I ON %2$I', 'trg_' || v_tabla || '_cambios_eliminar', v_tabla);
+                    EXECUTE format('CREATE TRIGGER %1$I AFTER DELETE ON %2$I REFERENCING OLD TABLE AS antiguas
+                                    FOR EACH STATEMENT EXECUTE FUNCTION sigme_registrar_cambios(%3$L)',
+                                   'trg_' || v_tabla || '_cambios_eliminar', v_tabla, v_clave);
+                    EXECUTE format('DROP TRIGGER IF EXISTS %1$I ON %2$I', 'trg_' || v_tabla || '_cambios_truncar', v_tabla);
+                    EXECUTE format('CREATE TRIGGER %1$I AFTER TRUNCATE ON %2$I
+                                    FOR EACH STATEMENT EXECUTE FUNCTION sigme_registrar_cambios(%3$L)',
+                                   'trg_' || v_tabla || '_cambios_truncar', v_tabla, v_clave);
+                END LOOP;
+            END $$;
+        """,
+    ),
+    (
+        "notificaciones_secciones",
+        1,
+        "notificación de cambios de secciones",
+        """
+            EXISTS (SELECT 1 FROM pg_trigger WHERE tgname = 'trg_seccion_notificar_truncar')
+        """,
+        """
+            -- Un aviso por fila en el canal sigme_secciones (ver CANAL_SECCIONES), en JSON:
+            --   {"op": "I" o "U", "ano": ..., "fila": [columnas de COLUMNAS_TABLA_SECCIONES]}
+            --   {"op": "D", "ano": ..., "clave": [grado, letra, turno, codigo]}
+            -- Las sentencias de más de 200 filas y TRUNCATE envían solo {"op": "*"}: recargar.
+            CREATE OR REPLACE FUNCTION sigme_notificar_secciones() RETURNS trigger
+                LANGUAGE plpgsql AS $$
+            DECLARE
+                v_filas bigint;
+            BEGIN
+                IF TG_OP = 'TRUNCATE' THEN
+                    PERFORM pg_notify('sigme_secciones', '{"op": "*"}');
+                    RETURN NULL;
+                END IF;
+                IF TG_OP = 'DELETE' THEN
+                    SELECT count(*) INTO v_filas FROM antiguas;
+                ELSE
+                    SELECT count(*) INTO v_filas FROM nuevas;
+                END IF;
+                IF v_filas > 200 THEN
+                    PERFORM pg_notify('sigme_secciones', '{"op": "*"}');
+                    RETURN NULL;
+                END IF;
+
+                IF TG_OP = 'INSERT' THEN
+                    PERFORM pg_notify('sigme_secciones', json_build_object(
+                        'op', 'I', 'ano', n.codigo_ano_escolar, 'fila', json_build_array(
+                            n.codigo, n.codigo_grado, n.letra, n.turno, n.aula_asignada,
+                            p.nombres || ' ' || p.apellidos || ' (' || n.cedula_docente_guia || ')', n.capacidad_maxima)
+                    )::text)
+                    FROM nuevas n LEFT JOIN PERSONAL p ON p.cedula = n.cedula_docente_guia;
+                ELSIF TG_OP = 'UPDATE' THEN
+                    -- Una fila cuyo código cambió se avisa como eliminada y otra insertada
+                    PERFORM pg_notify('sigme_secciones', json_build_object(
+                        'op', 'D', 'ano', a.codigo_ano_escolar,
+                        'clave', json_build_array(a.codigo_grado, a.letra, a.turno, a.codigo)
+                    )::text)
+                    FROM antiguas a WHERE NOT EXISTS (SELECT 1 FROM nuevas n WHERE n.codigo = a.codigo);
+                    PERFORM pg_notify('sigme_secciones', json_build_object(
+                        'op', CASE WHEN EXISTS (SELECT 1 FROM antiguas a WHERE a.codigo = n.codigo) THEN 'U' ELSE 'I' END,
+                        'ano', n.codigo_ano_escolar, 'fila', json_build_array(
+                            n.codigo, n.codigo_grado, n.letra, n.turno, n.aula_asignada,
+                            p.nombres || ' ' || p.apellidos || ' (' || n.cedula_docente_guia || ')', n.capacidad_maxima)
+                    )::text)
+                    FROM nuevas n LEFT JOIN PERSONAL p ON p.cedula = n.cedula_docente_guia;
+                ELSE
+                    PERFORM pg_notify('sigme_secciones', json_build_object(
+                        'op', 'D', 'ano', a.codigo_ano_escolar,
+                        'clave', json_build_array(a.codigo_grado, a.letra, a.turno, a.codigo)
+                    )::text)
+                    FROM antiguas a;
+                END IF;
+                RETURN NULL;
+            END $$;
+
+            DROP TRIGGER IF EXISTS trg_seccion_notificar_insertar ON SECCION;
+            CREATE TRIGGER trg_seccion_notificar_insertar
+                AFTER INSERT ON SECCION REFERENCING NEW TABLE AS nuevas
+                FOR EACH STATEMENT EXECUTE FUNCTION sigme_notificar_secciones();
+            DROP TRIGGER IF EXISTS trg_seccion_notificar_actualizar ON SECCION;
+            CREATE TRIGGER trg_seccion_notificar_actualizar
+                AFTER UPDATE ON SECCION REFERENCING OLD TABLE AS antiguas NEW TABLE AS nuevas
+                FOR EACH STATEMENT EXECUTE FUNCTION sigme_notificar_secciones();
+            DROP TRIGGER IF EXISTS trg_seccion_notificar_eliminar ON SECCION;
+            CREATE TRIGGER trg_seccion_notificar_eliminar
+                AFTER DELETE ON SECCION REFERENCING OLD TABLE AS antiguas
+                FOR EACH STATEMENT EXECUTE FUNCTION sigme_notificar_secciones();
+            DROP TRIGGER IF EXISTS trg_seccion_notificar_truncar ON SECCION;
+            CREATE TRIGGER trg_seccion_notificar_truncar
+                AFTER TRUNCATE ON SECCION
+                FOR EACH STATEMENT EXECUTE FUNCTION sigme_notificar_secciones();
+        """,
+    ),
+    (
+        "restricciones",
+        1,
+        "restricciones de integridad de secciones",
+        """
+            to_regclass('uq_seccion_docente_ano') IS NOT NULL
+            AND EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'ck_seccion_capacidad')
+        """,
+        """
+            -- Las mismas reglas que validan el formulario y la importación. Si los datos existentes
+            -- no las cumplen la entrada no se instala y el error indica la fila en conflicto.
+            ALTER TABLE SECCION
+                DROP CONSTRAINT IF EXISTS ck_seccion_grado,
+                DROP CONSTRAINT IF EXISTS ck_seccion_turno,
+                DROP CONSTRAINT IF EXISTS ck_seccion_capacidad;
+            ALTER TABLE SECCION
+                ADD CONSTRAINT ck_seccion_grado CHECK (codigo_grado BETWEEN 1 AND 6),
+                ADD CONSTRAINT ck_seccion_turno CHECK (turno IN ('M', 'T')),
+                ADD CONSTRAINT ck_seccion_capacidad CHECK (capacidad_maxima > 0);
+
+            -- Un docente guía por sección y año escolar. También respalda la búsqueda de la sección
+            -- de un docente (rutinas, disparadores de PERSONAL), así que reemplaza a idx_seccion_docente_ano.
+            CREATE UNIQUE INDEX IF NOT EXISTS uq_seccion_docente_ano ON SECCION (cedula_docente_guia, codigo_ano_escolar);
+            DROP INDEX IF EXISTS idx_seccion_docente_ano;
+        """,
+    ),
+    (
+        "indices",
+        1,
+        "índices de las consultas frecuentes",
+        """
+            to_regclass('idx_seccion_ano_orden') IS NOT NULL
+            AND (to_regclass('idx_estudiante_seccion') IS NOT NULL OR NOT EXISTS (
+                SELECT 1 FROM pg_attribute WHERE attrelid = to_regclass('estudiante') AND attname = 'codigo_seccion'))
+            AND (to_regclass('idx_seccion_docente_ano') IS NOT NULL OR to_regclass('uq_seccion_docente_ano') IS NOT NULL)
+        """,
+        """
+            -- Páginas de la tabla (recorrido por rango en el orden de COLUMNAS_ORDEN_SECCIONES dentro
+            -- del año) y búsqueda de una sección por grado, letra y turno en el año
+            CREATE INDEX IF NOT EXISTS idx_seccion_ano_orden
+                ON SECCION (codigo_ano_escolar, codigo_grado, letra, turno, codigo);
+
+            DO $$
+            BEGIN
+                -- Verificación de la clave foránea al eliminar secciones, si la base tiene estudiantes
+                IF EXISTS (SELECT 1 FROM pg_attribute WHERE attrelid = to_regclass('estudiante') AND attname = 'codigo_seccion') THEN
+                    CREATE INDEX IF NOT EXISTS idx_estudiante_seccion ON ESTUDIANTE (codigo_seccion);
+                END IF;
+                -- Sección de un docente en el año, si no se pudo instalar uq_seccion_docente_ano
+                IF to_regclass('uq_seccion_docente_ano') IS NULL THEN
+                    CREATE INDEX IF NOT EXISTS idx_seccion_docente_ano ON SECCION (cedula_docente_guia, codigo_ano_escolar);
+                END IF;
+            END $$;
+        """,
+    ),
+]
+
+# Versión instalada de cada entrada de OBJETOS_ESQUEMA
+SQL_REGISTRAR_VERSION_ESQUEMA = """
+    CREATE TABLE IF NOT EXISTS sigme_esquema (
+        clave text PRIMARY KEY,
+        version integer NOT NULL,
+        instalada timestamptz NOT NULL DEFAULT now()
+    );
+    INSERT INTO sigme_esquema (clave, version) VALUES (%s, %s)
+    ON CONFLICT (clave) DO UPDATE SET version = EXCLUDED.version, instalada = now();
+"""
+
+# Mensajes para los códigos de error que retornan las rutinas de secciones del servidor
+MENSAJES_ERROR_SECCION = {
+    "SIN_ANO_ACTIVO": "No hay un año escolar activo registrado. Por favor, configure uno.",
+    "ANO_ESCOLAR_INACTIVO": "El año escolar activo cambió mientras se guardaba. Por favor, intente nuevamente.",
+    "SECCION_EXISTENTE": "Ya existe una sección {grado}{letra} en el turno {turno} para el año escolar actual.",
+    "CODIGO_EXISTENTE": "El código {codigo_seccion} ya lo usa una sección del año escolar {detalle}.",
+    "DOCENTE_ASIGNADO": "Este docente ya está asignado a la sección {detalle} para el año escolar actual.",
+    "AULA_OCUPADA": "El aula {aula} ya está asignada en este grado y turno para el año escolar actual.",
+    "AULA_OCUPADA_OTRA_SECCION": "El aula {aula} ya está asignada en este grado y turno para el año escolar actual (otra sección).",
+    "SIN_AULAS": "No hay aulas disponibles para este grado. Considere asignar una manualmente.",
+    "SECCION_NO_ENCONTRADA": "No se encontró la sección {codigo_seccion} para actualizar o no hubo cambios.",
+    "SIN_DOCENTE_GUIA": "La base de datos exige un docente guía por sección y no quedan docentes para esta.",
+}
+
+def mensaje_error_seccion(codigo_error, **datos):
+    """
+    Traduce un código de error de las rutinas de secciones al mensaje que se muestra al usuario.
+    """
+    plantilla = MENSAJES_ERROR_SECCION.get(codigo_error)
+    if plantilla is None:
+        return f"La operación fue rechazada por la base de datos ({codigo_error})."
+    return plantilla.format_map(defaultdict(str, datos))
+
+def ejecutar_rutina(conn, sql, params):
+    """
+    Ejecuta una rutina del servidor en modo autocommit y retorna su primera fila.
+
+    La rutina corre en su propia transacción implícita, por lo que la operación completa
+    (validación y escritura) cuesta un solo viaje de ida y vuelta al servidor. La llamada se
+    ejecuta como sentencia preparada de la conexión.
+    """
+    conn.autocommit = True
+    try:
+        cursor = conn.cursor()
+        ejecutar_preparada(cursor, sql, params)
+        fila = cursor.fetchone()
+        cursor.close()
+        return fila
+    finally:
+        conn.autocommit = False
+
+# Alternativa a las rutinas del servidor mientras la entrada "rutinas" está pendiente de
+# instalar: las mismas validaciones, bloqueos consultivos y resultado, en varias sentencias
+# dentro de una transacción del cliente.
+SQL_FILA_SECCION = f"""
+    SELECT {COLUMNAS_TABLA_SECCIONES}
+    FROM SECCION s
+    LEFT JOIN PERSONAL p ON p.cedula = s.cedula_docente_guia
+    WHERE s.codigo = %s
+"""
+
+def _ejecutar_en_transaccion(conn, operacion, *args):
+    """Ejecuta operacion(cursor, *args) y confirma la transacción solo si no retornó un código de error."""
+    cursor = conn.cursor()
+    try:
+        resultado = operacion(cursor, *args)
+        if resultado[0] is None:
+            conn.commit()
+        else:
+            conn.rollback()
+        return resultado
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+def _validar_seccion_en_cliente(cursor, ano, grado, letra, turno, docente, aula, codigo=None):
+    """
+    Validaciones de asignar (codigo None) y actualizar, en el orden de las rutinas del servidor.
+    Retorna (codigo_error, detalle) o (None, None).
+    """
+    cursor.execute("SELECT 1 FROM ANO_ESCOLAR WHERE codigo = %s AND activo", (ano,))
+    if cursor.fetchone() is None:
+        return "ANO_ESCOLAR_INACTIVO", None
+    cursor.execute("SELECT pg_advisory_xact_lock(hashtext('sigme_grado_turno'), hashtext(%s))", (f"{ano}/{grado}/{turno}",))
+    cursor.execute("SELECT pg_advisory_xact_lock(hashtext('sigme_docente'), hashtext(%s))", (f"{ano}/{docente}",))
+    if codigo is None:
+        cursor.execute("""
+            SELECT 1 FROM SECCION
+            WHERE codigo_grado = %s AND letra = %s AND turno = %s AND codigo_ano_escolar = %s
+        """, (grado, letra, turno, ano))
+        if cursor.fetchone() is not None:
+            return "SECCION_EXISTENTE", None
+        cursor.execute("SELECT codigo_ano_escolar FROM SECCION WHERE codigo = %s", (f"{grado}{letra}-{turno}",))
+        otro_ano = cursor.fetchone()
+        if otro_ano is not None:
+            return "CODIGO_EXISTENTE", otro_ano[0]
+    cursor.execute("""
+        SELECT codigo FROM SECCION
+        WHERE cedula_docente_guia = %s AND codigo_ano_escolar = %s AND codigo IS DISTINCT FROM %s LIMIT 1
+    """, (docente, ano, codigo))
+    otra = cursor.fetchone()
+    if otra is not None:
+        return "DOCENTE_ASIGNADO", otra[0]
+    if aula is not None:
+        cursor.execute("""
+            SELECT 1 FROM SECCION
+            WHERE aula_asignada = %s AND codigo_grado = %s AND turno = %s AND codigo_ano_escolar = %s
+              AND codigo IS DISTINCT FROM %s
+        """, (aula, grado, turno, ano, codigo))
+        if cursor.fetchone() is not None:
+            return "AULA_OCUPADA" if codigo is None else "AULA_OCUPADA_OTRA_SECCION", aula
+    return None, None
+
+def _asignar_seccion_en_cliente(cursor, ano, grado, letra, turno, docente, aula, capacidad):
+    codigo_error, detalle = _validar_seccion_en_cliente(cursor, ano, grado, letra, turno, docente, aula)
+    if codigo_error is not None:
+        return codigo_error, None, None, detalle, None
+    if aula is None:
+        ocupacion = OcupacionAulas()
+        cursor.execute("""
+            SELECT aula_asignada FROM SECCION
+            WHERE codigo_ano_escolar = %s AND codigo_grado = %s AND turno = %s AND aula_asignada IS NOT NULL
+        """, (ano, grado, turno))
+        for aula_ocupada, in cursor:
+            ocupacion.reservar(grado, turno, aula_ocupada)
+        aula = ocupacion.siguiente_libre(grado, turno)
+        if aula is None:
+            return "SIN_AULAS", None, None, None, None
+    codigo = f"{grado}{letra}-{turno}"
+    cursor.execute("""
+        INSERT INTO SECCION (
+            codigo, letra, codigo_grado, turno,
+            cedula_docente_guia, aula_asignada,
+            capacidad_maxima, total_estudiantes,
+            estudiantes_varones, estudiantes_hembras,
+            codigo_ano_escolar
+        ) VALUES (%s, %s, %s, %s, %s, %s, %s, 0, 0, 0, %s)
+    """, (codigo, letra, grado, turno, docente, aula, capacidad, ano))
+    cursor.execute(SQL_FILA_SECCION, (codigo,))
+    return None, codigo, aula, None, list(cursor.fetchone())
+
+def _actualizar_seccion_en_cliente(cursor, ano, codigo, grado, turno, docente, aula, capacidad):
+    codigo_error, detalle = _validar_seccion_en_cliente(cursor, ano, grado, None, turno, docente, aula, codigo)
+    if codigo_error is not None:
+        return codigo_error, None, None, detalle, None
+    cursor.execute("""
+        UPDATE SECCION SET cedula_docente_guia = %s, aula_asignada = %s, capacidad_maxima = %s
+        WHERE codigo = %s AND codigo_ano_escolar = %s
+    """, (docente, aula, capacidad, codigo, ano))
+    if cursor.rowcount == 0:
+        return "SECCION_NO_ENCONTRADA", None, None, None, None
+    cursor.execute(SQL_FILA_SECCION, (codigo,))
+    return None, codigo, aula, None, list(cursor.fetchone())
+
+def asignar_seccion_en_cliente(conn, ano, grado, letra, turno, docente, aula, capacidad):
+    """Mismos argumentos y resultado que SQL_ASIGNAR_SECCION, sin la rutina del servidor."""
+    return _ejecutar_en_transaccion(conn, _asignar_seccion_en_cliente, ano, grado, letra, turno, docente, aula, capacidad)
+
+def actualizar_seccion_en_cliente(conn, ano, codigo, grado, turno, docente, aula, capacidad):
+    """Mismos argumentos y resultado que SQL_ACTUALIZAR_SECCION, sin la rutina del servidor."""
+    return _ejecutar_en_transaccion(conn, _actualizar_seccion_en_cliente, ano, codigo, grado, turno, docente, aula, capacidad)
+
+_esquema_lock = threading.Lock()
+_esquema_verificado = False
+_esquema_instalado = False
+ESQUEMA_DISPONIBLE = set() # Claves de OBJETOS_ESQUEMA presentes y al día en el servidor
+
+def consultar_estado_esquema(cursor):
+    """
+    Retorna [(clave, descripcion, version, version_instalada, existe)] de OBJETOS_ESQUEMA.
+
+    version_instalada es la registrada en sigme_esquema; las entradas instaladas antes de que
+    existiera el registro cuentan como versión 1 si sus objetos existen, y como 0 si no.
+    """
+    verificaciones = ", ".join(f"({verificacion})" for _, _, _, verificacion, _ in OBJETOS_ESQUEMA)
+    cursor.execute(f"SELECT to_regclass('sigme_esquema') IS NOT NULL, {verificaciones}")
+    registro, *existentes = cursor.fetchone()
+    versiones = {}
+    if registro:
+        cursor.execute("SELECT clave, version FROM sigme_esquema")
+        versiones = dict(cursor.fetchall())
+    return [(clave, descripcion, version, versiones.get(clave, 1 if existe else 0), existe)
+            for (clave, version, descripcion, _, _), existe in zip(OBJETOS_ESQUEMA, existentes)]
+
+def verificar_esquema(conn):
+    """
+    Registra en ESQUEMA_DISPONIBLE las entradas de OBJETOS_ESQUEMA instaladas con su versión
+    actual (o una más nueva), sin modificar el servidor. Se ejecuta una vez por proceso.
+
+    Las funciones que dependen de una entrada pendiente usan su alternativa básica.
+    """
+    global _esquema_verificado
+    with _esquema_lock:
+        if _esquema_verificado:
+            return
+        cursor = conn.cursor()
+        try:
+            estado = consultar_estado_esquema(cursor)
+            conn.commit()
+            pendientes = []
+            for clave, descripcion, version, version_instalada, existe in estado:
+                if existe and version_instalada >= version:
+                    ESQUEMA_DISPONIBLE.add(clave)
+                else:
+                    pendientes.append(descripcion)
+            if pendientes:
+                logger.warning(f"Objetos de la base de datos pendientes de instalar: {'; '.join(pendientes)}. "
+                               f"Se usarán las alternativas básicas (instalar con: python sigme_cli.py esquema --instalar)")
+        except psycopg2.Error as e:
+            conn.rollback()
+            logger.error(f"No se pudo verificar el esquema de la base de datos, se usará la búsqueda básica: {e}", exc_info=True)
+        finally:
+            cursor.close()
+        _esquema_verificado = True
+
+def asegurar_esquema(conn):
+    """
+    Crea en el servidor los objetos de OBJETOS_ESQUEMA que falten o que tengan registrada una
+    versión anterior a la de la entrada, y actualiza ESQUEMA_DISPONIBLE. Se ejecuta una vez por
+    proceso y solo desde pasos explícitos (sigme_cli.py esquema --instalar, benchmarks y
+    pruebas): algunas entradas reescriben SECCION o bloquean tablas mientras se instalan.
+
+    Cada entrada se instala por separado, en una transacción que también registra su versión:
+    si una falla (por ejemplo, falta una extensión), las demás siguen disponibles y las
+    funciones que dependen de ella usan su alternativa básica. Una versión registrada mayor (la
+    instaló una versión más nueva de la aplicación) no se reemplaza.
+    """
+    global _esquema_verificado, _esquema_instalado
+    with _esquema_lock:
+        if _esquema_instalado:
+            return
+        cursor = conn.cursor()
+        try:
+            estado = consultar_estado_esquema(cursor)
+            conn.commit()
+            ddl_por_clave = {clave: ddl for clave, _, _, _, ddl in OBJETOS_ESQUEMA}
+            for clave, descripcion, version, version_instalada, existe in estado:
+                if not existe or version_instalada < version:
+                    try:
+                        logger.warning(f"Instalando en la base de datos: {descripcion} (versión {version})")
+                        cursor.execute(ddl_por_clave[clave])
+                        cursor.execute(SQL_REGISTRAR_VERSION_ESQUEMA, (clave, version))
+                        conn.commit()
+                    except psycopg2.Error as e:
+                        conn.rollback()
+                        logger.error(f"No se pudo instalar en la base de datos: {descripcion}: {e}", exc_info=True)
+                        continue
+                ESQUEMA_DISPONIBLE.add(clave)
+        except psycopg2.Error as e:
+            conn.rollback()
+            logger.error(f"No se pudo verificar el esquema de la base de datos, se usará la búsqueda básica: {e}", exc_info=True)
+        finally:
+            cursor.close()
+        _esquema_verificado = _esquema_instalado = True
+
+# Canales LISTEN/NOTIFY usados por la aplicación
+CANAL_ANO_ESCOLAR = "sigme_ano_escolar"
+CANAL_SECCIONES = "sigme_secciones" # Un aviso JSON por sección modificada (ver "notificaciones_secciones")
+CANAL_RECONEXION = "" # Aviso local: la escucha se restableció y pudo perder notificaciones
+
+class ContextoAnoEscolar:
+    """
+    Año escolar activo compartido por toda la aplicación.
+
+    Se consulta una sola vez y se conserva hasta que se invalida, normalmente al recibir
+    una notificación del canal CANAL_ANO_ESCOLAR.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._codigo = None
+        self._cargado = False
+        self._generacion = 0
+
+    SQL = "SELECT codigo FROM ANO_ESCOLAR WHERE activo = TRUE LIMIT 1"
+
+    def obtener(self, conn):
+        """
+        Retorna el código del año escolar activo (o None si no hay uno), consultándolo solo
+        si no está en caché. La conexión queda en el mismo estado de transacción que tenía.
+        """
+        cargado, codigo, generacion = self.en_cache()
+        if cargado:
+            return codigo
+        sin_transaccion = conn.get_transaction_status() == psycopg2.extensions.TRANSACTION_STATUS_IDLE
+        cursor = conn.cursor()
+        ejecutar_preparada(cursor, self.SQL)
+        fila = cursor.fetchone()
+        cursor.close()
+        if sin_transaccion and not conn.autocommit:
+            conn.rollback()
+        return self.guardar(generacion, fila[0] if fila else None)
+
+    def en_cache(self):
+        """Retorna (cargado, código, generación) del valor en caché."""
+        with self._lock:
+            return self._cargado, self._codigo, self._generacion
+
+    def guardar(self, generacion, codigo):
+        """Guarda el código consultado en la generación indicada y lo retorna."""
+        with self._lock:
+            # Si se invalidó durante la consulta, el valor leído puede estar desactualizado
+            if generacion == self._generacion:
+                self._codigo = codigo
+                self._cargado = True
+        return codigo
+
+    def invalidar(self):
+        with self._lock:
+            self._cargado = False
+            self._codigo = None
+            self._generacion += 1
+
+class EscuchaNotificaciones:
+    """
+    Recibe notificaciones LISTEN/NOTIFY de PostgreSQL en un hilo con una conexión dedicada.
+
+    al_notificar(canal, payload) se llama desde ese hilo. Si la conexión se pierde, se
+    reintenta y, al restablecerse, se llama con CANAL_RECONEXION.
+    """
+    def __init__(self, canales, al_notificar, intervalo_reintento=10, intervalo_verificacion=60):
+        self.canales = list(canales)
+        self.al_notificar = al_notificar
+        self.intervalo_reintento = intervalo_reintento
+        self.intervalo_verificacion = intervalo_verificacion # Segundos sin actividad antes de verificar la conexión
+        self._detenido = threading.Event()
+        self._hilo = None
+
+    def iniciar(self):
+        self._hilo = threading.Thread(target=self._ejecutar, name="EscuchaNotificaciones", daemon=True)
+        self._hilo.start()
+
+    def detener(self):
+        self._detenido.set()
+
+    def _ejecutar(self):
+        conectado_antes = False
+        while not self._detenido.is_set():
+            conn = None
+            try:
+                conn = conectar_db()
+                conn.autocommit = True
+                cursor = conn.cursor()
+                for canal in self.canales:
+                    cursor.execute(f"LISTEN {canal}")
+                if conectado_antes:
+                    self.al_notificar(CANAL_RECONEXION, "")
+                conectado_antes = True
+
+                ultima_actividad = time.monotonic()
+                while not self._detenido.is_set():
+                    if select.select([conn], [], [], 1.0) == ([], [], []):
+                        if time.monotonic() - ultima_actividad > self.intervalo_verificacion:
+                            cursor.execute("SELECT 1") # Detecta conexiones cortadas sin aviso
+                            ultima_actividad = time.monotonic()
+                        continue
+                    conn.poll()
+                    ultima_actividad = time.monotonic()
+                    while conn.notifies:
+                        notificacion = conn.notifies.pop(0)
+                        self.al_notificar(notificacion.channel, notificacion.payload)
+            except Exception as e:
+                logger.warning(f"Escucha de notificaciones interrumpida, se reintentará: {e}")
+                self._detenido.wait(self.intervalo_reintento)
+            finally:
+                if conn:
+                    try:
+                        conn.close()
+                    except psycopg2.Error:
+                        pass
+
+def normalizar_busqueda(texto):
+    """
+    Normaliza un texto igual que sigme_normalizar() en el servidor: sin acentos y en minúsculas.
+    """
+    descompuesto = unicodedata.normalize("NFKD", texto)
+    return "".join(c for c in descompuesto if not unicodedata.combining(c)).lower()
+
+def escapar_like(texto):
+    """
+    Escapa los comodines de LIKE para buscar el texto de forma literal.
+    """
+    return texto.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+def construir_filtro_busqueda(search_term):
+    """
+    Retorna (condiciones, params, expresion_relevancia) para filtrar secciones por un término.
+
+    Con el esquema de búsqueda disponible, cada palabra del término debe aparecer en el
+    documento normalizado de la sección (índice trigram) y los resultados se ordenan por
+    relevancia. Si no, se usa la búsqueda ILIKE por columnas.
+    """
+    if not search_term:
+        return [], {}, None
+    if "busqueda" not in ESQUEMA_DISPONIBLE:
+        condicion = """
+            (s.codigo ILIKE %(patron)s OR s.codigo_grado::text ILIKE %(patron)s OR s.letra ILIKE %(patron)s
+             OR s.aula_asignada ILIKE %(patron)s OR p.nombres ILIKE %(patron)s OR p.apellidos ILIKE %(patron)s)
+        """
+        return [condicion], {"patron": f"%{search_term}%"}, None
+
+    termino = normalizar_busqueda(search_term)
+    condiciones = []
+    params = {"termino": termino}
+    for i, palabra in enumerate(termino.split()):
+        condiciones.append(f"s.busqueda LIKE %(palabra{i})s")
+        params[f"palabra{i}"] = f"%{escapar_like(palabra)}%"
+    # Relevancia negada y redondeada para usarla como clave ascendente exacta en la paginación
+    relevancia = "-ROUND(word_similarity(%(termino)s, s.busqueda)::numeric, 4)"
+    return condiciones, params, relevancia
+
+def ejecutar_pasos(cursor, pasos):
+    """
+    Ejecuta una consulta escrita como generador de pasos: cada paso produce (sql, params) y
+    recibe las filas obtenidas. Retorna el valor final del generador.
+
+    Así la misma lógica de consulta sirve para este cursor de psycopg2 y para el motor
+    asíncrono de sigme_async.py.
+    """
+    try:
+        sql, params = next(pasos)
+        while True:
+            ejecutar_preparada(cursor, sql, params)
+            sql, params = pasos.send(cursor.fetchall())
+    except StopIteration as fin:
+        return fin.value
+
+def buscar_docentes(cursor, texto, limite=20):
+    """
+    Retorna hasta `limite` docentes (cedula, nombres, apellidos) cuya cédula, nombre completo o
+    apellidos comienzan con el texto indicado.
+    """
+    return ejecutar_pasos(cursor, pasos_buscar_docentes(texto, limite))
+
+def pasos_buscar_docentes(texto, limite=20):
+    if "docentes" in ESQUEMA_DISPONIBLE:
+        condicion = """
+            p.cedula LIKE %(prefijo)s
+            OR sigme_normalizar(p.nombres || ' ' || p.apellidos) LIKE %(prefijo_normalizado)s
+            OR sigme_normalizar(p.apellidos) LIKE %(prefijo_normalizado)s
+        """
+    else:
+        condicion = """
+            p.cedula ILIKE %(prefijo)s
+            OR (p.nombres || ' ' || p.apellidos) ILIKE %(prefijo)s
+            OR p.apellidos ILIKE %(prefijo)s
+        """
+    return (yield f"""
+        SELECT p.cedula, p.nombres, p.apellidos
+        FROM PERSONAL p
+        WHERE {condicion}
+        ORDER BY p.nombres, p.apellidos, p.cedula
+        LIMIT %(limite)s
+    """, {
+        "prefijo": f"{escapar_like(texto)}%",
+        "prefijo_normalizado": f"{escapar_like(normalizar_busqueda(texto))}%",
+        "limite": limite,
+    })
+
+def consultar_pagina_secciones(cursor, search_term, ano_escolar, direccion, clave, limit, total_records):
+    """
+    Obtiene una página de secciones con paginación por clave (keyset).
+
+    ano_escolar limita la lista a ese año (None: todos los años). total_records es el total
+    en caché o None si debe calcularse. Retorna un diccionario con las filas de la página,
+    el total y las claves de la primera y última fila.
+    """
+    return ejecutar_pasos(cursor, pasos_pagina_secciones(search_term, ano_escolar, direccion, clave, limit, total_records))
+
+def pasos_pagina_secciones(search_term, ano_escolar, direccion, clave, limit, total_records):
+    condiciones, params, relevancia = construir_filtro_busqueda(search_term)
+    # Sin búsqueda el total sale del resumen que mantienen los disparadores de SECCION
+    if not condiciones and "resumen" in ESQUEMA_DISPONIBLE:
+        expresion_total = f"""(SELECT COALESCE(SUM(secciones), 0) FROM sigme_resumen_secciones
+                               {"WHERE codigo_ano_escolar = %(ano_escolar)s" if ano_escolar is not None else ""})"""
+    else:
+        expresion_total = None
+    if ano_escolar is not None:
+        condiciones.append("s.codigo_ano_escolar = %(ano_escolar)s")
+        params["ano_escolar"] = ano_escolar
+    columnas_clave = ((relevancia,) if relevancia else ()) + COLUMNAS_ORDEN_SECCIONES
+    if clave is not None and len(clave) != len(columnas_clave):
+        # Clave de otro orden (de la réplica local o de una búsqueda sin relevancia): empezar desde el principio
+        clave, direccion = None, "primera"
+
+    # El total se calcula solo si no está en caché. En la primera página se obtiene en la
+    # misma consulta (del resumen o con COUNT(*) OVER ()); en otro caso con una consulta aparte.
+    contar_en_consulta = total_records is None and direccion == "primera"
+    if total_records is None and not contar_en_consulta and expresion_total:
+        filas = yield f"SELECT {expresion_total}", params
+        total_records = filas[0][0]
+    elif total_records is None and not contar_en_consulta:
+        where_clause = f"WHERE {' AND '.join(condiciones)}" if condiciones else ""
+        filas = yield f"""
+            SELECT COUNT(*)
+            FROM SECCION s
+            LEFT JOIN PERSONAL p ON s.cedula_docente_guia = p.cedula
+            {where_clause}
+        """, params
+        total_records = filas[0][0]
+
+    if direccion == "ultima":
+        # La última página contiene el resto de la división (o una página completa)
+        limit = total_records % limit or limit
+
+    columnas_orden = ", ".join(columnas_clave)
+    descendente = direccion in ("anterior", "ultima")
+    condiciones_pagina = list(condiciones)
+    params_pagina = dict(params, limit=limit)
+    if clave is not None and direccion in ("anterior", "siguiente", "actual"):
+        operador = {"anterior": "<", "siguiente": ">", "actual": ">="}[direccion]
+        marcadores = ", ".join(f"%(clave{i})s" for i in range(len(clave)))
+        condiciones_pagina.append(f"({columnas_orden}) {operador} ({marcadores})")
+        params_pagina.update((f"clave{i}", valor) for i, valor in enumerate(clave))
+    where_clause = f"WHERE {' AND '.join(condiciones_pagina)}" if condiciones_pagina else ""
+    if descendente:
+        order_by = ", ".join(f"{columna} DESC" for columna in columnas_clave)
+    else:
+        order_by = columnas_orden
+
+    # Consulta para obtener los registros de la página: un recorrido por rango sobre la clave única
+    filas = yield f"""
+        SELECT {COLUMNAS_TABLA_SECCIONES},
+               {columnas_orden}
+               {f", {expresion_total or 'COUNT(*) OVER ()'}" if contar_en_consulta else ""}
+        FROM SECCION s
+        {JOIN_DOCENTE_PAGINA}
+        {where_clause}
+        ORDER BY {order_by}
+        LIMIT %(limit)s
+    """, params_pagina
+    filas = list(filas)
+    if descendente:
+        filas.reverse()
+
+    if direccion == "anterior" and len(filas) < limit:
+        # Se alcanzó el inicio antes de completar la página: mostrar la primera página completa
+        return (yield from pasos_pagina_secciones(search_term, ano_escolar, "primera", None, limit, total_records))
+
+    if contar_en_consulta:
+        total_records = filas[0][-1] if filas else 0
+        filas = [fila[:-1] for fila in filas]
+
+    num_claves = len(columnas_clave)
+    return {
+        "secciones": [fila[:-num_claves] for fila in filas],
+        "total_records": total_records,
+        "search_term": search_term,
+        "ano_escolar": ano_escolar,
+        "direccion": direccion,
+        "primera_clave": tuple(filas[0][-num_claves:]) if filas else None,
+        "ultima_clave": tuple(filas[-1][-num_claves:]) if filas else None,
+    }
+
+def consultar_resumen_secciones(cursor, ano_escolar):
+    """
+    Retorna las filas (grado, turno, secciones, capacidad, estudiantes, aulas) del año escolar.
+    """
+    return ejecutar_pasos(cursor, pasos_resumen_secciones(ano_escolar))
+
+def pasos_resumen_secciones(ano_escolar):
+    if "resumen" in ESQUEMA_DISPONIBLE:
+        # A lo sumo una fila por grado y turno, sin recorrer SECCION
+        return (yield """
+            SELECT codigo_grado, turno, secciones, capacidad_total, estudiantes_total, aulas_usadas
+            FROM sigme_resumen_secciones
+            WHERE codigo_ano_escolar = %s AND secciones > 0
+            ORDER BY codigo_grado, turno
+        """, (ano_escolar,))
+    return (yield """
+        SELECT codigo_grado, turno, COUNT(*), COALESCE(SUM(capacidad_maxima), 0),
+               COALESCE(SUM(total_estudiantes), 0), COUNT(aula_asignada)
+        FROM SECCION
+        WHERE codigo_ano_escolar = %s
+        GROUP BY codigo_grado, turno
+        ORDER BY codigo_grado, turno
+    """, (ano_escolar,))
+
+def exportar_secciones(conn, escritor, search_term="", ano_escolar=None, tamano_lote=2000, progreso=None, token=None):
+    """
+    Escribe en escritor las secciones que cumplen el filtro de la tabla y retorna cuántas exportó.
+
+    ano_escolar=None exporta todos los años. Las filas se leen con un cursor del servidor en
+    lotes de tamano_lote, así la memoria usada no depende de la cantidad de secciones. Entre
+    lotes se revisa el token para detener la exportación si fue cancelada.
+    """
+    progreso = progreso or (lambda valor, mensaje: None)
+    condiciones, params, _ = construir_filtro_busqueda(search_term)
+    if ano_escolar is not None:
+        condiciones.append("s.codigo_ano_escolar = %(ano_escolar)s")
+        params["ano_escolar"] = ano_escolar
+    where_clause = f"WHERE {' AND '.join(condiciones)}" if condiciones else ""
+    origen = f"""
+        FROM SECCION s
+        LEFT JOIN PERSONAL p ON s.cedula_docente_guia = p.cedula
+        {where_clause}
+    """
+    try:
+        cursor = conn.cursor()
+        # Una sola instantánea para el conteo y la lectura: el progreso coincide con lo exportado
+        cursor.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ READ ONLY")
+        cursor.execute(f"SELECT COUNT(*) {origen}", params)
+        total = cursor.fetchone()[0]
+        cursor.close()
+
+        lector = conn.cursor(name="sigme_exportacion")
+        lector.execute(f"""
+            SELECT {COLUMNAS_TABLA_SECCIONES}, s.codigo_ano_escolar
+            {origen}
+            ORDER BY s.codigo_ano_escolar, {", ".join(COLUMNAS_ORDEN_SECCIONES)}
+        """, params)
+        exportadas = 0
+        while True:
+            if token and token.cancelado:
+                raise OperacionCancelada()
+            filas = lector.fetchmany(tamano_lote)
+            if not filas:
+                break
+            escritor.escribir(filas)
+            exportadas += len(filas)
+            progreso(min(99, exportadas * 100 // max(total, 1)), f"Exportadas {exportadas} de {total} secciones...")
+        lector.close()
+        conn.commit()
+        return exportadas
+    except Exception:
+        conn.rollback()
+        raise
+
+class EscritorCSV:
+    """
+    Escribe la exportación de secciones como CSV (UTF-8 con BOM para que Excel reconozca los acentos).
+    """
+    def __init__(self, ruta, encabezados):
+        self._archivo = open(ruta, "w", newline="", encoding="utf-8-sig")
+        self._escritor = csv.writer(self._archivo)
+        self._escritor.writerow(encabezados)
+
+    def escribir(self, filas):
+        self._escritor.writerows(filas)
+
+    def cerrar(self, guardar=True):
+        self._archivo.close()
+
+class EscritorXLSX:
+    """
+    Escribe la exportación de secciones como libro de Excel en modo de solo escritura de openpyxl,
+    que vuelca las filas a disco a medida que se agregan.
+    """
+    def __init__(self, ruta, encabezados):
+        if not EXCEL_DISPONIBLE:
+            raise ValueError("Para exportar a Excel instale el paquete openpyxl.")
+        openpyxl = importlib.import_module("openpyxl")
+        self._ruta = ruta
+        self._libro = openpyxl.Workbook(write_only=True)
+        self._hoja = self._libro.create_sheet("Secciones")
+        self._hoja.append(encabezados)
+
+    def escribir(self, filas):
+        for fila in filas:
+            self._hoja.append(fila)
+
+    def cerrar(self, guardar=True):
+        if guardar:
+            self._libro.save(self._ruta)
+        else:
+            self._libro.close()
+
+ESCRITORES_EXPORTACION = {"csv": EscritorCSV, "xlsx": EscritorXLSX}
+ENCABEZADOS_EXPORTACION = ENCABEZADOS_SECCIONES + ["Año Escolar"]
+
+SQL_ELIMINAR_SECCIONES = """
+    DELETE FROM SECCION WHERE codigo = ANY(%s)
+    RETURNING codigo, codigo_grado, letra, turno, codigo_ano_escolar
+"""
+
+def eliminar_secciones(cursor, codigos):
+    """
+    Elimina las secciones indicadas con sentencias por conjunto dentro de la transacción actual.
+
+    Si el lote viola una clave foránea, se revierte a un punto de guardado y se divide a la
+    mitad hasta aislar las secciones con datos relacionados; los lotes sin conflictos se
+    eliminan en una sola sentencia. Retorna (filas eliminadas, códigos con dependencias); cada
+    fila eliminada es (código, grado, letra, turno, año escolar).
+    """
+    eliminadas = []
+    con_dependencias = []
+    pendientes = [list(dict.fromkeys(codigos))] # Sin duplicados, conservando el orden
+    while pendientes:
+        lote = pendientes.pop()
+        cursor.execute("SAVEPOINT eliminar_lote")
+        try:
+            cursor.execute(SQL_ELIMINAR_SECCIONES, (lote,))
+            eliminadas.extend(cursor.fetchall())
+        except psycopg2.errors.ForeignKeyViolation:
+            cursor.execute("ROLLBACK TO SAVEPOINT eliminar_lote")
+            if len(lote) == 1:
+                con_dependencias.append(lote[0])
+            else:
+                mitad = len(lote) // 2
+                pendientes.extend([lote[mitad:], lote[:mitad]])
+        cursor.execute("RELEASE SAVEPOINT eliminar_lote")
+    return eliminadas, con_dependencias
+
+# Valores aceptados por el formulario y por la importación de secciones
+LETRAS_SECCION = ["A", "B", "C", "D", "E"]
+TURNOS_SECCION = ["M", "T"]
+COLUMNAS_IMPORTACION = ("grado", "letra", "turno", "docente", "aula", "capacidad")
+
+class OcupacionAulas:
+    """
+    Aulas ocupadas por grado y turno en un año escolar, para validar y asignar aulas en memoria.
+
+    Las aulas de la banda del grado (grado*100 .. grado*100+99) se guardan como bits de un
+    entero, así la menor libre se obtiene igual que sigme_aula_disponible() sin recorrerlas.
+    Las aulas fuera de la banda (p. ej. "Lab") se guardan como texto.
+    """
+    def __init__(self):
+        self._bandas = defaultdict(int)
+        self._otras = defaultdict(set)
+
+    def _bit(self, grado, aula):
+        if aula.isdigit() and str(int(aula)) == aula and 0 <= int(aula) - grado * 100 < 100:
+            return int(aula) - grado * 100
+        return None
+
+    def ocupada(self, grado, turno, aula):
+        bit = self._bit(grado, aula)
+        if bit is None:
+            return aula in self._otras[(grado, turno)]
+        return bool(self._bandas[(grado, turno)] >> bit & 1)
+
+    def reservar(self, grado, turno, aula):
+        bit = self._bit(grado, aula)
+        if bit is None:
+            self._otras[(grado, turno)].add(aula)
+        else:
+            self._bandas[(grado, turno)] |= 1 << bit
+
+    def siguiente_libre(self, grado, turno):
+        """Retorna la menor aula libre de la banda del grado, o None si está completa."""
+        ocupadas = self._bandas[(grado, turno)]
+        libre = (~ocupadas & (ocupadas + 1)).bit_length() - 1
+        return str(grado * 100 + libre) if libre < 100 else None
+
+def leer_csv_secciones(archivo):
+    """
+    Lee un CSV de secciones (separado por comas o punto y coma) con las COLUMNAS_IMPORTACION.
+
+    Retorna una lista de (numero_linea, fila) donde fila es un diccionario con esas columnas.
+    """
+    muestra = archivo.readline()
+    try:
+        dialecto = csv.Sniffer().sniff(muestra, delimiters=",;")
+    except csv.Error:
+        dialecto = csv.excel
+    lector = csv.reader(itertools.chain([muestra], archivo), dialecto)
+    encabezado = [columna.strip().lower() for columna in next(lector, [])]
+    faltantes = [columna for columna in COLUMNAS_IMPORTACION if columna not in encabezado]
+    if faltantes:
+        raise ValueError(f"Al archivo le faltan las columnas: {', '.join(faltantes)}.")
+    filas = []
+    for valores in lector:
+        if not any(valor.strip() for valor in valores):
+            continue
+        fila = dict(zip(encabezado, (valor.strip() for valor in valores)))
+        filas.append((lector.line_num, {columna: fila.get(columna, "") for columna in COLUMNAS_IMPORTACION}))
+    return filas
+
+def validar_campos_seccion(fila):
+    """Valida una fila de COLUMNAS_IMPORTACION con las reglas del formulario. Retorna (seccion, None) o (None, mensaje)."""
+    try:
+        grado = int(fila["grado"])
+    except ValueError:
+        return None, "El grado debe ser un número entero."
+    if grado < 1 or grado > 6:
+        return None, "El grado debe ser un número entero entre 1 y 6."
+    letra = fila["letra"].upper()
+    if letra not in LETRAS_SECCION:
+        return None, f"La letra debe ser una de: {', '.join(LETRAS_SECCION)}."
+    turno = fila["turno"][:1].upper()
+    if turno not in TURNOS_SECCION:
+        return None, "El turno debe ser M (mañana) o T (tarde)."
+    if not fila["docente"]:
+        return None, "Falta la cédula del docente guía."
+    try:
+        capacidad = int(fila["capacidad"])
+    except ValueError:
+        return None, "La capacidad máxima debe ser un número entero."
+    if capacidad <= 0:
+        return None, "La capacidad máxima debe ser un número entero positivo."
+    return {"grado": grado, "letra": letra, "turno": turno, "docente": fila["docente"],
+            "aula": fila["aula"] or None, "capacidad": capacidad}, None
+
+def validar_lote_secciones(filas, secciones_existentes, docentes_asignados, docentes_registrados, ocupacion,
+                           codigos_ocupados):
+    """
+    Valida un lote completo contra el estado del año escolar y contra las filas anteriores del lote.
+
+    secciones_existentes es un conjunto de (grado, letra, turno), docentes_asignados un diccionario
+    cedula -> código de sección y ocupacion una OcupacionAulas; los tres se actualizan con las filas
+    válidas. codigos_ocupados (consultar_codigos_ocupados) tiene los códigos que ya usan secciones
+    de cualquier año escolar, porque el código es la clave primaria de SECCION.
+
+    Primero se reservan las aulas indicadas en el archivo y después se asignan las que faltan,
+    para que una asignación automática no tome el aula que otra fila pide explícitamente.
+    Retorna (secciones, errores) con errores como lista de (numero_linea, mensaje).
+    """
+    secciones = []
+    errores = []
+    for numero_linea, fila in filas:
+        seccion, error = validar_campos_seccion(fila)
+        if error is None:
+            grado, letra, turno, docente, aula = (seccion[c] for c in ("grado", "letra", "turno", "docente", "aula"))
+            codigo = f"{grado}{letra}-{turno}"
+            if (grado, letra, turno) in secciones_existentes:
+                error = mensaje_error_seccion("SECCION_EXISTENTE", grado=grado, letra=letra, turno=turno)
+            elif codigo in codigos_ocupados:
+                error = mensaje_error_seccion("CODIGO_EXISTENTE", codigo_seccion=codigo, detalle=codigos_ocupados[codigo])
+            elif docente not in docentes_registrados:
+                error = f"No se encontró el docente con cédula {docente}."
+            elif docente in docentes_asignados:
+                error = mensaje_error_seccion("DOCENTE_ASIGNADO", detalle=docentes_asignados[docente])
+            elif aula is not None and ocupacion.ocupada(grado, turno, aula):
+                error = mensaje_error_seccion("AULA_OCUPADA", aula=aula)
+        if error is not None:
+            errores.append((numero_linea, error))
+            continue
+        secciones_existentes.add((grado, letra, turno))
+        docentes_asignados[docente] = codigo
+        if aula is not None:
+            ocupacion.reservar(grado, turno, aula)
+        seccion["codigo"] = codigo
+        secciones.append((numero_linea, seccion))
+
+    for numero_linea, seccion in secciones:
+        if seccion["aula"] is None:
+            seccion["aula"] = ocupacion.siguiente_libre(seccion["grado"], seccion["turno"])
+            if seccion["aula"] is None:
+                errores.append((numero_linea, mensaje_error_seccion("SIN_AULAS")))
+                continue
+            ocupacion.reservar(seccion["grado"], seccion["turno"], seccion["aula"])
+    errores.sort()
+    return [seccion for _, seccion in secciones], errores
+
+SQL_ESTADO_SECCIONES = """
+    SELECT codigo, codigo_grado, letra, turno, cedula_docente_guia, aula_asignada
+    FROM SECCION WHERE codigo_ano_escolar = %s
+"""
+
+def consultar_estado_secciones(cursor, ano_escolar):
+    """
+    Retorna (secciones_existentes, docentes_asignados, ocupacion) del año escolar, con los
+    formatos de validar_lote_secciones(), en una sola consulta.
+    """
+    cursor.execute(SQL_ESTADO_SECCIONES, (ano_escolar,))
+    secciones_existentes = set()
+    docentes_asignados = {}
+    ocupacion = OcupacionAulas()
+    for codigo, grado, letra, turno, docente, aula in cursor:
+        secciones_existentes.add((int(grado), letra, turno))
+        if docente:
+            docentes_asignados.setdefault(docente, codigo)
+        if aula:
+            ocupacion.reservar(int(grado), turno, aula)
+    return secciones_existentes, docentes_asignados, ocupacion
+
+SQL_DOCENTES_REGISTRADOS = "SELECT cedula FROM PERSONAL WHERE cedula = ANY(%s)"
+SQL_CODIGOS_OCUPADOS = "SELECT codigo, codigo_ano_escolar FROM SECCION WHERE codigo = ANY(%s)"
+
+def consultar_docentes_registrados(cursor, cedulas):
+    """Retorna el subconjunto de cedulas registradas en PERSONAL."""
+    cursor.execute(SQL_DOCENTES_REGISTRADOS, (list(cedulas),))
+    return {cedula for cedula, in cursor}
+
+def consultar_codigos_ocupados(cursor, codigos):
+    """Retorna {codigo: año escolar} de los codigos que ya usa alguna sección, de cualquier año escolar."""
+    cursor.execute(SQL_CODIGOS_OCUPADOS, (list(codigos),))
+    return dict(cursor.fetchall())
+
+def docente_guia_obligatorio(cursor):
+    """Indica si SECCION.cedula_docente_guia es NOT NULL (depende de la instalación de la base de datos)."""
+    cursor.execute("""
+        SELECT is_nullable = 'NO' FROM information_schema.columns
+        WHERE table_schema = ANY(current_schemas(false)) AND table_name = 'seccion'
+          AND column_name = 'cedula_docente_guia'
+        LIMIT 1
+    """)
+    fila = cursor.fetchone()
+    return fila is not None and fila[0]
+
+def importar_secciones(conn, ano_escolar, filas, progreso=None):
+    """
+    Valida e inserta un lote de secciones en el año escolar indicado, en una sola transacción.
+
+    La tabla SECCION se bloquea contra escrituras concurrentes mientras se valida, y las filas se
+    cargan con un único COPY. Si alguna fila es inválida no se inserta ninguna. Retorna un
+    diccionario con "codigo_error" (año escolar inactivo), "errores" [(numero_linea, mensaje)]
+    y "secciones" (las insertadas).
+    """
+    progreso = progreso or (lambda valor, mensaje: None)
+    cursor = conn.cursor()
+    try:
+        progreso(10, "Bloqueando la tabla de secciones...")
+        cursor.execute("LOCK TABLE SECCION IN SHARE ROW EXCLUSIVE MODE")
+        cursor.execute("SELECT 1 FROM ANO_ESCOLAR WHERE codigo = %s AND activo", (ano_escolar,))
+        if cursor.fetchone() is None:
+            conn.rollback()
+            return {"codigo_error": "ANO_ESCOLAR_INACTIVO", "errores": [], "secciones": []}
+
+        progreso(20, "Consultando las secciones del año escolar...")
+        secciones_existentes, docentes_asignados, ocupacion = consultar_estado_secciones(cursor, ano_escolar)
+        docentes_registrados = consultar_docentes_registrados(cursor, {fila["docente"] for _, fila in filas})
+        validas = [seccion for seccion, _ in (validar_campos_seccion(fila) for _, fila in filas) if seccion is not None]
+        codigos_ocupados = consultar_codigos_ocupados(
+            cursor, {f"{s['grado']}{s['letra']}-{s['turno']}" for s in validas})
+
+        progreso(40, f"Validando {len(filas)} filas...")
+        secciones, errores = validar_lote_secciones(filas, secciones_existentes, docentes_asignados,
+                                                    docentes_registrados, ocupacion, codigos_ocupados)
+        if errores or not secciones:
+            conn.rollback()
+            return {"codigo_error": None, "errores": errores, "secciones": []}
+
+        progreso(70, f"Insertando {len(secciones)} secciones...")
+        datos = io.StringIO()
+        escritor = csv.writer(datos)
+        for s in secciones:
+            escritor.writerow((s["codigo"], s["letra"], s["grado"], s["turno"], s["docente"], s["aula"],
+                               s["capacidad"], 0, 0, 0, ano_escolar))
+        datos.seek(0)
+        cursor.copy_expert("""
+            COPY SECCION (
+                codigo, letra, codigo_grado, turno,
+                cedula_docente_guia, aula_asignada,
+                capacidad_maxima, total_estudiantes,
+                estudiantes_varones, estudiantes_hembras,
+                codigo_ano_escolar
+            ) FROM STDIN WITH (FORMAT csv)
+        """, datos)
+        conn.commit()
+        progreso(100, f"{len(secciones)} secciones importadas.")
+        return {"codigo_error": None, "errores": [], "secciones": secciones}
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+TAMANO_LOTE_GRILLA = 500 # Secciones por INSERT de varias filas al generar una grilla
+
+def validar_grilla(grados, letras, turnos, capacidad):
+    """Valida la especificación de una grilla de secciones; lanza ValueError con el primer problema."""
+    if not grados or not letras or not turnos:
+        raise ValueError("Seleccione al menos un grado, una letra y un turno.")
+    if any(grado < 1 or grado > 6 for grado in grados):
+        raise ValueError("El grado debe ser un número entero entre 1 y 6.")
+    if any(letra not in LETRAS_SECCION for letra in letras):
+        raise ValueError(f"La letra debe ser una de: {', '.join(LETRAS_SECCION)}.")
+    if any(turno not in TURNOS_SECCION for turno in turnos):
+        raise ValueError("El turno debe ser M (mañana) o T (tarde).")
+    if capacidad <= 0:
+        raise ValueError("La capacidad máxima debe ser un número entero positivo.")
+
+def planificar_grilla_secciones(grados, letras, turnos, capacidad, docentes, secciones_existentes,
+                                docentes_asignados, docentes_registrados, ocupacion, codigos_ocupados,
+                                docente_obligatorio=False):
+    """
+    Planifica en memoria las secciones de la grilla grados × letras × turnos, en el orden de la tabla.
+
+    Los docentes se asignan en ese orden a las secciones que se van a crear; si hay menos docentes
+    que secciones, las restantes quedan sin docente guía, o en conflicto si docente_obligatorio
+    (docente_guia_obligatorio). Cada sección recibe la menor aula libre
+    de su grado y turno según ocupacion. Los argumentos de estado son los de validar_lote_secciones()
+    y se actualizan con el plan. Retorna (secciones, conflictos) con conflictos como lista de
+    (codigo, mensaje); las secciones en conflicto no se planifican.
+    """
+    secciones = []
+    conflictos = []
+    pendientes = iter(docentes)
+    for grado, letra, turno in itertools.product(sorted(set(grados)), sorted(set(letras)), sorted(set(turnos))):
+        codigo = f"{grado}{letra}-{turno}"
+        if (grado, letra, turno) in secciones_existentes:
+            conflictos.append((codigo, mensaje_error_seccion("SECCION_EXISTENTE", grado=grado, letra=letra, turno=turno)))
+            continue
+        if codigo in codigos_ocupados:
+            conflictos.append((codigo, mensaje_error_seccion("CODIGO_EXISTENTE", codigo_seccion=codigo,
+                                                             detalle=codigos_ocupados[codigo])))
+            continue
+        docente = next(pendientes, None)
+        if docente is None and docente_obligatorio:
+            conflictos.append((codigo, mensaje_error_seccion("SIN_DOCENTE_GUIA")))
+            continue
+        if docente is not None and docente not in docentes_registrados:
+            conflictos.append((codigo, f"No se encontró el docente con cédula {docente}."))
+            continue
+        if docente is not None and docente in docentes_asignados:
+            conflictos.append((codigo, mensaje_error_seccion("DOCENTE_ASIGNADO", detalle=docentes_asignados[docente])))
+            continue
+        aula = ocupacion.siguiente_libre(grado, turno)
+        if aula is None:
+            conflictos.append((codigo, mensaje_error_seccion("SIN_AULAS")))
+            continue
+        secciones_existentes.add((grado, letra, turno))
+        if docente is not None:
+            docentes_asignados[docente] = codigo
+        ocupacion.reservar(grado, turno, aula)
+        secciones.append({"codigo": codigo, "grado": grado, "letra": letra, "turno": turno,
+                          "docente": docente, "aula": aula, "capacidad": capacidad})
+    return secciones, conflictos
+
+def generar_grilla_secciones(conn, ano_escolar, grados, letras, turnos, capacidad, docentes,
+                             confirmar=False, plan_previsto=None, progreso=None):
+    """
+    Planifica (planificar_grilla_secciones) y, con confirmar, inserta la grilla en una sola transacción.
+
+    Sin confirmar solo consulta el estado del año escolar: es la vista previa. Al confirmar, la
+    tabla SECCION se bloquea contra escrituras concurrentes, se vuelve a planificar y las
+    secciones se insertan con INSERT de varias filas (TAMANO_LOTE_GRILLA por sentencia). Si se
+    indica plan_previsto (las secciones de la vista previa) y el nuevo plan difiere, no se
+    inserta nada y se retorna el plan nuevo con "plan_cambiado". Retorna un diccionario con
+    "codigo_error" (año escolar inactivo), "secciones", "conflictos", "insertadas" y "plan_cambiado".
+    """
+    progreso = progreso or (lambda valor, mensaje: None)
+    cursor = conn.cursor()
+    try:
+        if confirmar:
+            progreso(10, "Bloqueando la tabla de secciones...")
+            cursor.execute("LOCK TABLE SECCION IN SHARE ROW EXCLUSIVE MODE")
+        cursor.execute("SELECT 1 FROM ANO_ESCOLAR WHERE codigo = %s AND activo", (ano_escolar,))
+        if cursor.fetchone() is None:
+            conn.rollback()
+            return {"codigo_error": "ANO_ESCOLAR_INACTIVO", "secciones": [], "conflictos": [],
+                    "insertadas": False, "plan_cambiado": False}
+
+        progreso(20, "Consultando las secciones del año escolar...")
+        secciones_existentes, docentes_asignados, ocupacion = consultar_estado_secciones(cursor, ano_escolar)
+        docentes_registrados = consultar_docentes_registrados(cursor, docentes)
+        codigos_ocupados = consultar_codigos_ocupados(
+            cursor, {f"{grado}{letra}-{turno}" for grado, letra, turno in itertools.product(grados, letras, turnos)})
+        progreso(40, "Planificando la grilla...")
+        secciones, conflictos = planificar_grilla_secciones(
+            grados, letras, turnos, capacidad, docentes, secciones_existentes, docentes_asignados,
+            docentes_registrados, ocupacion, codigos_ocupados, docente_guia_obligatorio(cursor))
+        resultado = {"codigo_error": None, "secciones": secciones, "conflictos": conflictos,
+                     "insertadas": False, "plan_cambiado": plan_previsto is not None and plan_previsto != secciones}
+        if not confirmar or not secciones or resultado["plan_cambiado"]:
+            conn.rollback()
+            return resultado
+
+        progreso(60, f"Insertando {len(secciones)} secciones...")
+        psycopg2.extras.execute_values(cursor, """
+            INSERT INTO SECCION (
+                codigo, letra, codigo_grado, turno,
+                cedula_docente_guia, aula_asignada,
+                capacidad_maxima, total_estudiantes,
+                estudiantes_varones, estudiantes_hembras,
+                codigo_ano_escolar
+            ) VALUES %s
+        """, [(s["codigo"], s["letra"], s["grado"], s["turno"], s["docente"], s["aula"], s["capacidad"],
+               0, 0, 0, ano_escolar) for s in secciones], page_size=TAMANO_LOTE_GRILLA)
+        conn.commit()
+        resultado["insertadas"] = True
+        progreso(100, f"{len(secciones)} secciones creadas.")
+        return resultado
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+SQL_CARGAR_SECCION = """
+    SELECT s.codigo_grado, s.letra, s.turno, s.cedula_docente_guia, s.aula_asignada, s.capacidad_maxima,
+           p.nombres, p.apellidos
+    FROM SECCION s
+    LEFT JOIN PERSONAL p ON p.cedula = s.cedula_docente_guia
+    WHERE s.codigo = %s
+"""
+
+SQL_CONSULTAR_SECCIONES = """
+    SELECT codigo, codigo_grado, letra, turno, cedula_docente_guia, aula_asignada, capacidad_maxima
+    FROM SECCION
+    WHERE codigo = ANY(%s) AND codigo_ano_escolar = %s
+"""
+
+# Rutinas del servidor (OBJETOS_ESQUEMA, "rutinas"); retornan (codigo_error, codigo_seccion, aula, detalle, fila)
+SQL_ASIGNAR_SECCION = """
+    SELECT codigo_error, codigo_seccion, aula, detalle, fila
+    FROM sigme_asignar_seccion(%s, %s, %s, %s, %s, %s, %s)
+"""
+SQL_ACTUALIZAR_SECCION = """
+    SELECT codigo_error, codigo_seccion, aula, detalle, fila
+    FROM sigme_actualizar_seccion(%s, %s, %s, %s, %s, %s, %s)
+"""
+
+def _sin_progreso(valor, mensaje):
+    pass
+
+class ServicioSecciones:
+    """
+    Operaciones de secciones, docentes y años escolares sobre un PoolConexiones.
+
+    No depende de Qt: la interfaz gráfica y el modo por lotes (sigme_cli.py) la usan igual.
+    Los métodos aceptan un callback opcional progreso(valor, mensaje) y, si la operación falla,
+    lanzan una excepción cuyo mensaje se puede mostrar directamente al usuario. Las escrituras
+    de secciones retornan en "cambios" las filas afectadas, con el formato de los avisos de
+    CANAL_SECCIONES.
+    """
+    def __init__(self, pool):
+        self.pool = pool
+        self.contexto_ano = ContextoAnoEscolar()
+
+    def ano_escolar_activo(self):
+        conn = self.pool.obtener()
+        try:
+            return self.contexto_ano.obtener(conn)
+        finally:
+            self.pool.devolver(conn)
+
+    def estado_esquema(self, instalar=False):
+        """
+        Retorna las filas de consultar_estado_esquema() con una columna más: si la entrada quedó
+        disponible en este proceso. Con instalar, antes instala las pendientes (asegurar_esquema).
+        """
+        conn = self.pool.obtener()
+        try:
+            if instalar:
+                asegurar_esquema(conn)
+            cursor = conn.cursor()
+            estado = consultar_estado_esquema(cursor)
+            conn.commit()
+            return [fila + (fila[0] in ESQUEMA_DISPONIBLE,) for fila in estado]
+        finally:
+            self.pool.devolver(conn)
+
+    def buscar_docentes(self, texto, limite=20):
+        conn = None
+        try:
+            conn = self.pool.obtener()
+            cursor = conn.cursor()
+            docentes = buscar_docentes(cursor, texto, limite)
+            conn.commit()
+            return docentes
+        finally:
+            if conn:
+                self.pool.devolver(conn)
+
+    def cargar_pagina(self, search_term, direccion, clave, limit, total_records, progreso=None, token=None):
+        progreso = progreso or _sin_progreso
+        conn = None
+        try:
+            conn = self.pool.obtener()
+            if token:
+                token.vincular(conn)
+            cursor = conn.cursor()
+            progreso(20, "Cargando secciones...")
+            ano_escolar = self.contexto_ano.obtener(conn)
+            resultado = consultar_pagina_secciones(cursor, search_term, ano_escolar, direccion, clave, limit, total_records)
+            progreso(100, "Secciones cargadas.")
+            return resultado
+        except OperacionCancelada:
+            raise
+        except psycopg2.Error as e:
+            if token and token.cancelado:
+                raise OperacionCancelada()
+            logger.error(f"Error de PostgreSQL al cargar secciones: {e}", exc_info=True)
+            raise Exception(f"Error en la base de datos al cargar las secciones: {e.pgerror or e}")
+        except Exception as e:
+            logger.error(f"Error inesperado al cargar secciones: {e}", exc_info=True)
+            raise Exception(f"Ocurrió un error inesperado al cargar las secciones: {e}")
+        finally:
+            if token:
+                token.desvincular()
+            if conn:
+                self.pool.devolver(conn)
+
+    def cargar_seccion(self, codigo_seccion, progreso=None):
+        """Retorna (grado, letra, turno, cedula, aula, capacidad, nombres, apellidos) de la sección."""
+        progreso = progreso or _sin_progreso
+        conn = None
+        try:
+            conn = self.pool.obtener()
+            cursor = conn.cursor()
+            progreso(10, "Cargando datos de la sección...")
+            ejecutar_preparada(cursor, SQL_CARGAR_SECCION, (codigo_seccion,))
+            seccion_data = cursor.fetchone()
+            if not seccion_data:
+                raise ValueError(f"No se encontró la sección con código {codigo_seccion}.")
+            progreso(100, "Datos de la sección cargados.")
+            return seccion_data
+        finally:
+            if conn:
+                self.pool.devolver(conn)
+
+    def consultar_secciones(self, codigos):
+        """Retorna {codigo: (grado, letra, turno, cedula, aula, capacidad)} de las secciones del año activo."""
+        conn = self.pool.obtener()
+        try:
+            codigo_ano_escolar = self.contexto_ano.obtener(conn)
+            cursor = conn.cursor()
+            cursor.execute(SQL_CONSULTAR_SECCIONES, (list(codigos), codigo_ano_escolar))
+            secciones = {fila[0]: fila[1:] for fila in cursor}
+            conn.commit()
+            return secciones
+        finally:
+            self.pool.devolver(conn)
+
+    def resumen_secciones(self):
+        """
+        Retorna (ano_escolar, filas) con los totales por grado y turno del año escolar activo:
+        (grado, turno, secciones, capacidad, estudiantes, aulas).
+        """
+        conn = self.pool.obtener()
+        try:
+            ano_escolar = self.contexto_ano.obtener(conn)
+            filas = consultar_resumen_secciones(conn.cursor(), ano_escolar) if ano_escolar is not None else []
+            conn.commit()
+            return ano_escolar, filas
+        finally:
+            self.pool.devolver(conn)
+
+    def asignar_seccion(self, grado, letra, turno, docente, aula_manual, capacidad_maxima, progreso=None):
+        progreso = progreso or _sin_progreso
+        conn = None
+        try:
+            conn = self.pool.obtener()
+            codigo_ano_escolar = self.contexto_ano.obtener(conn)
+            if codigo_ano_escolar is None:
+                raise ValueError(mensaje_error_seccion("SIN_ANO_ACTIVO"))
+
+            progreso(30, "Asignando sección...")
+            # La rutina del servidor valida, asigna el aula e inserta en una sola transacción (mientras
+            # no esté instalada, asignar_seccion_en_cliente hace lo mismo en varias sentencias)
+            params = (codigo_ano_escolar, int(grado), letra, turno, docente, aula_manual or None, capacidad_maxima)
+            if "rutinas" in ESQUEMA_DISPONIBLE:
+                codigo_error, codigo_seccion, aula, detalle, fila = ejecutar_rutina(conn, SQL_ASIGNAR_SECCION, params)
+            else:
+                codigo_error, codigo_seccion, aula, detalle, fila = asignar_seccion_en_cliente(conn, *params)
+            if codigo_error == "ANO_ESCOLAR_INACTIVO":
+                self.contexto_ano.invalidar()
+            if codigo_error:
+                raise ValueError(mensaje_error_seccion(codigo_error, grado=grado, letra=letra, turno=turno,
+                                                       codigo_seccion=f"{grado}{letra}-{turno}",
+                                                       aula=aula_manual, detalle=detalle))
+
+            progreso(100, "Sección asignada correctamente.")
+            return {"codigo_seccion": codigo_seccion, "aula": aula, "ano_escolar": codigo_ano_escolar,
+                    "clave": (int(grado), letra, turno, codigo_seccion),
+                    "cambios": [{"op": "I", "ano": codigo_ano_escolar, "fila": fila}]}
+
+        except psycopg2.Error as e:
+            logger.error(f"Error de PostgreSQL al asignar sección: {e}", exc_info=True)
+            raise Exception(f"Error en la base de datos al asignar la sección: {e.pgerror or e}")
+        except Exception as e:
+            logger.error(f"Error inesperado al asignar sección: {e}", exc_info=True)
+            raise Exception(f"Ocurrió un error inesperado: {e}")
+        finally:
+            if conn:
+                self.pool.devolver(conn)
+
+    def actualizar_seccion(self, codigo_seccion, grado, letra, turno, docente, aula_manual, capacidad_maxima, progreso=None):
+        progreso = progreso or _sin_progreso
+        conn = None
+        try:
+            conn = self.pool.obtener()
+            codigo_ano_escolar = self.contexto_ano.obtener(conn)
+            if codigo_ano_escolar is None:
+                raise ValueError(mensaje_error_seccion("SIN_ANO_ACTIVO"))
+
+            progreso(30, "Actualizando sección...")
+            params = (codigo_ano_escolar, codigo_seccion, int(grado), turno, docente, aula_manual or None, capacidad_maxima)
+            if "rutinas" in ESQUEMA_DISPONIBLE:
+                codigo_error, _, _, detalle, fila = ejecutar_rutina(conn, SQL_ACTUALIZAR_SECCION, params)
+            else:
+                codigo_error, _, _, detalle, fila = actualizar_seccion_en_cliente(conn, *params)
+            if codigo_error == "ANO_ESCOLAR_INACTIVO":
+                self.contexto_ano.invalidar()
+            if codigo_error:
+                raise ValueError(mensaje_error_seccion(codigo_error, codigo_seccion=codigo_seccion,
+                                                       aula=aula_manual, detalle=detalle))
+
+            progreso(100, "Sección actualizada correctamente.")
+            return {"codigo_seccion": codigo_seccion, "ano_escolar": codigo_ano_escolar,
+                    "cambios": [{"op": "U", "ano": codigo_ano_escolar, "fila": fila}]}
+
+        except psycopg2.Error as e:
+            logger.error(f"Error de PostgreSQL al actualizar sección: {e}", exc_info=True)
+            raise Exception(f"Error en la base de datos al actualizar la sección: {e.pgerror or e}")
+        except Exception as e:
+            logger.error(f"Error inesperado al actualizar sección: {e}", exc_info=True)
+            raise Exception(f"Ocurrió un error inesperado: {e}")
+        finally:
+            if conn:
+                self.pool.devolver(conn)
+
+    def eliminar_secciones(self, codigos_seccion, progreso=None):
+        progreso = progreso or _sin_progreso
+        conn = None
+        try:
+            conn = self.pool.obtener()
+            cursor = conn.cursor()
+
+            progreso(10, f"Eliminando {len(codigos_seccion)} sección(es)...")
+            eliminadas, con_dependencias = eliminar_secciones(cursor, codigos_seccion)
+            conn.commit()
+            progreso(100, "Operación de eliminación completada.")
+
+            codigos = [codigo for codigo, _, _, _, _ in eliminadas]
+            no_encontradas = [codigo for codigo in codigos_seccion
+                              if codigo not in codigos and codigo not in con_dependencias]
+            return {
+                "deleted_count": len(eliminadas),
+                "codigos": codigos,
+                "con_dependencias": con_dependencias,
+                "no_encontradas": no_encontradas,
+                "cambios": [{"op": "D", "ano": ano, "clave": [grado, letra, turno, codigo]}
+                            for codigo, grado, letra, turno, ano in eliminadas],
+            }
+
+        except psycopg2.Error as e:
+            if conn:
+                conn.rollback()
+            logger.error(f"Error de PostgreSQL al eliminar secciones: {e}", exc_info=True)
+            raise Exception(f"Error en la base de datos al eliminar las secciones: {e.pgerror or e}")
+        except Exception as e:
+            if conn:
+                conn.rollback()
+            logger.error(f"Error inesperado al eliminar secciones: {e}", exc_info=True)
+            raise Exception(f"Ocurrió un error inesperado durante la eliminación: {e}")
+        finally:
+            if conn:
+                self.pool.devolver(conn)
+
+    def importar_csv(self, ruta, progreso=None):
+        """Lee un CSV de secciones e importa sus filas con importar_filas()."""
+        progreso = progreso or _sin_progreso
+        try:
+            progreso(5, "Leyendo el archivo...")
+            with open(ruta, newline="", encoding="utf-8-sig") as archivo:
+                filas = leer_csv_secciones(archivo)
+        except (OSError, UnicodeDecodeError, csv.Error) as e:
+            logger.error(f"Error al leer el archivo de importación: {e}", exc_info=True)
+            raise Exception(f"No se pudo leer el archivo: {e}")
+        return self.importar_filas(filas, progreso)
+
+    def importar_filas(self, filas, progreso=None):
+        """Importa en el año escolar activo las filas de leer_csv_secciones() (ver importar_secciones)."""
+        progreso = progreso or _sin_progreso
+        conn = None
+        try:
+            if not filas:
+                raise ValueError("El archivo no contiene secciones.")
+
+            conn = self.pool.obtener()
+            codigo_ano_escolar = self.contexto_ano.obtener(conn)
+            if codigo_ano_escolar is None:
+                raise ValueError(mensaje_error_seccion("SIN_ANO_ACTIVO"))
+            resultado = importar_secciones(conn, codigo_ano_escolar, filas, progreso)
+            if resultado["codigo_error"] == "ANO_ESCOLAR_INACTIVO":
+                self.contexto_ano.invalidar()
+            if resultado["codigo_error"]:
+                raise ValueError(mensaje_error_seccion(resultado["codigo_error"]))
+            resultado["ano_escolar"] = codigo_ano_escolar
+            return resultado
+
+        except psycopg2.Error as e:
+            logger.error(f"Error de PostgreSQL al importar secciones: {e}", exc_info=True)
+            raise Exception(f"Error en la base de datos al importar las secciones: {e.pgerror or e}")
+        except Exception as e:
+            logger.error(f"Error inesperado al importar secciones: {e}", exc_info=True)
+            raise Exception(f"Ocurrió un error inesperado: {e}")
+        finally:
+            if conn:
+                self.pool.devolver(conn)
+
+    def generar_grilla(self, grados, letras, turnos, capacidad, docentes=(), confirmar=False,
+                       plan_previsto=None, progreso=None):
+        """
+        Genera la grilla de secciones en el año escolar activo (ver generar_grilla_secciones).
+
+        Sin confirmar retorna la vista previa: las secciones planificadas y los conflictos.
+        """
+        progreso = progreso or _sin_progreso
+        conn = None
+        try:
+            grados = [int(grado) for grado in grados]
+            letras = [letra.upper() for letra in letras]
+            turnos = [turno[:1].upper() for turno in turnos]
+            capacidad = int(capacidad)
+            validar_grilla(grados, letras, turnos, capacidad)
+            docentes = [docente for docente in docentes if docente]
+
+            conn = self.pool.obtener()
+            codigo_ano_escolar = self.contexto_ano.obtener(conn)
+            if codigo_ano_escolar is None:
+                raise ValueError(mensaje_error_seccion("SIN_ANO_ACTIVO"))
+            resultado = generar_grilla_secciones(conn, codigo_ano_escolar, grados, letras, turnos, capacidad,
+                                                 docentes, confirmar, plan_previsto, progreso)
+            if resultado["codigo_error"] == "ANO_ESCOLAR_INACTIVO":
+                self.contexto_ano.invalidar()
+            if resultado["codigo_error"]:
+                raise ValueError(mensaje_error_seccion(resultado["codigo_error"]))
+            resultado["ano_escolar"] = codigo_ano_escolar
+            return resultado
+
+        except psycopg2.Error as e:
+            logger.error(f"Error de PostgreSQL al generar secciones: {e}", exc_info=True)
+            raise Exception(f"Error en la base de datos al generar las secciones: {e.pgerror or e}")
+        except Exception as e:
+            logger.error(f"Error inesperado al generar secciones: {e}", exc_info=True)
+            raise Exception(f"Ocurrió un error inesperado: {e}")
+        finally:
+            if conn:
+                self.pool.devolver(conn)
+
+    def escribir_secciones(self, escritor, search_term="", ano_escolar=None, progreso=None, token=None):
+        """Escribe las secciones filtradas en escritor (ver exportar_secciones) y retorna cuántas escribió."""
+        token = token or TokenCancelacion()
+        conn = None
+        try:
+            conn = self.pool.obtener()
+            token.vincular(conn)
+            return exportar_secciones(conn, escritor, search_term, ano_escolar, progreso=progreso, token=token)
+        except OperacionCancelada:
+            raise
+        except psycopg2.Error as e:
+            if token.cancelado:
+                raise OperacionCancelada()
+            logger.error(f"Error de PostgreSQL al exportar secciones: {e}", exc_info=True)
+            raise Exception(f"Error en la base de datos al exportar las secciones: {e.pgerror or e}")
+        finally:
+            token.desvincular()
+            if conn:
+                self.pool.devolver(conn)
+
+    def exportar(self, ruta, formato, search_term="", ano_escolar=None, progreso=None, token=None):
+        progreso = progreso or _sin_progreso
+        escritor = None
+        temporal = f"{ruta}.parcial" # El archivo final solo aparece si la exportación termina
+        try:
+            escritor = ESCRITORES_EXPORTACION[formato](temporal, ENCABEZADOS_EXPORTACION)
+            progreso(0, "Contando secciones...")
+            exportadas = self.escribir_secciones(escritor, search_term, ano_escolar, progreso, token)
+            progreso(99, "Guardando el archivo...")
+            escritor.cerrar()
+            escritor = None
+            os.replace(temporal, ruta)
+            progreso(100, "Exportación completada.")
+            return {"ruta": ruta, "exportadas": exportadas}
+
+        except OperacionCancelada:
+            raise
+        except OSError as e:
+            logger.error(f"Error al escribir el archivo de exportación: {e}", exc_info=True)
+            raise Exception(f"No se pudo escribir el archivo: {e}")
+        except Exception as e:
+            logger.error(f"Error inesperado al exportar secciones: {e}", exc_info=True)
+            raise Exception(f"Ocurrió un error inesperado: {e}")
+        finally:
+            if escritor:
+                escritor.cerrar(guardar=False)
+            if os.path.exists(temporal):
+                os.remove(temporal)
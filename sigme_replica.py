@@ -0,0 +1,432 @@
+"""
+Réplica local de solo lectura de SECCION, PERSONAL y ANO_ESCOLAR en un archivo SQLite.
+
+La tabla de secciones, la búsqueda, la paginación y el selector de docentes se consultan en
+la réplica, sin viajes al servidor. La réplica se actualiza de forma incremental con el
+registro de cambios del servidor (sigme_cambios, ver OBJETOS_ESQUEMA): cada sincronización
+lee las claves modificadas desde la última transacción vista y vuelve a consultar solo esas
+filas. Las escrituras siguen yendo al servidor y la réplica las trae en la sincronización
+siguiente, que ServicioConReplica ejecuta justo después de cada escritura.
+"""
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+
+import psycopg2
+
+from sigme_datos import DB_PARAMS, ESQUEMA_DISPONIBLE, escapar_like, normalizar_busqueda
+
+logger = logging.getLogger(__name__)
+
+VERSION_REPLICA = 1
+DIAS_RESINCRONIZAR = 7 # Sin sincronizar por más tiempo, la réplica se recarga completa
+RETENCION_CAMBIOS = "30 days" # Antigüedad a partir de la cual se depura sigme_cambios
+INTERVALO_DEPURACION = 3600 # Segundos entre depuraciones de sigme_cambios desde esta réplica
+TAMANO_LOTE_CARGA = 5000
+
+# tabla -> (columna clave, columnas copiadas del servidor)
+TABLAS_REPLICA = {
+    "ano_escolar": ("codigo", ("codigo", "activo")),
+    "personal": ("cedula", ("cedula", "nombres", "apellidos")),
+    "seccion": ("codigo", ("codigo", "letra", "codigo_grado", "turno", "cedula_docente_guia", "aula_asignada",
+                           "capacidad_maxima", "total_estudiantes", "codigo_ano_escolar")),
+}
+
+ESQUEMA_REPLICA = """
+    CREATE TABLE IF NOT EXISTS meta (clave TEXT PRIMARY KEY, valor TEXT);
+    CREATE TABLE IF NOT EXISTS ano_escolar (codigo TEXT PRIMARY KEY, activo INTEGER NOT NULL);
+    CREATE TABLE IF NOT EXISTS personal (
+        cedula TEXT PRIMARY KEY, nombres TEXT, apellidos TEXT,
+        nombre_normalizado TEXT, apellidos_normalizado TEXT
+    );
+    CREATE INDEX IF NOT EXISTS idx_personal_nombre ON personal (nombre_normalizado);
+    CREATE INDEX IF NOT EXISTS idx_personal_apellidos ON personal (apellidos_normalizado);
+    CREATE TABLE IF NOT EXISTS seccion (
+        codigo TEXT PRIMARY KEY, letra TEXT, codigo_grado INTEGER, turno TEXT,
+        cedula_docente_guia TEXT, aula_asignada TEXT, capacidad_maxima INTEGER,
+        total_estudiantes INTEGER, codigo_ano_escolar TEXT,
+        busqueda TEXT -- Documento normalizado, como sigme_documento_seccion() en el servidor
+    );
+    CREATE INDEX IF NOT EXISTS idx_seccion_ano_orden ON seccion (codigo_ano_escolar, codigo_grado, letra, turno, codigo);
+    CREATE INDEX IF NOT EXISTS idx_seccion_orden ON seccion (codigo_grado, letra, turno, codigo);
+    CREATE INDEX IF NOT EXISTS idx_seccion_docente ON seccion (cedula_docente_guia);
+    CREATE INDEX IF NOT EXISTS idx_seccion_sin_busqueda ON seccion (codigo) WHERE busqueda IS NULL;
+"""
+
+# Mismas columnas y orden que COLUMNAS_TABLA_SECCIONES y COLUMNAS_ORDEN_SECCIONES
+COLUMNAS_TABLA_REPLICA = """
+    s.codigo, s.codigo_grado, s.letra, s.turno, s.aula_asignada,
+    p.nombres || ' ' || p.apellidos || ' (' || s.cedula_docente_guia || ')',
+    s.capacidad_maxima
+"""
+COLUMNAS_ORDEN_REPLICA = ("s.codigo_grado", "s.letra", "s.turno", "s.codigo")
+
+def documento_seccion(*valores):
+    """Equivalente local de sigme_documento_seccion(): concat_ws(' ', ...) normalizado."""
+    return normalizar_busqueda(" ".join(str(valor) for valor in valores if valor is not None))
+
+def base_datos_actual():
+    return f"{DB_PARAMS['host']}:{DB_PARAMS['port']}/{DB_PARAMS['dbname']}"
+
+class ReplicaLocal:
+    """
+    Archivo SQLite con la réplica y su sincronización desde el PoolConexiones del servidor.
+
+    Cada hilo usa su propia conexión SQLite; el modo WAL permite leer mientras otro hilo
+    sincroniza. Las sincronizaciones se serializan con un candado.
+    """
+    def __init__(self, ruta, pool):
+        self.ruta = ruta
+        self.pool = pool
+        self._local = threading.local()
+        self._conexiones = []
+        self._candado_conexiones = threading.Lock()
+        self._candado_sincronizacion = threading.Lock()
+        self._ultima_depuracion = 0.0
+        os.makedirs(os.path.dirname(ruta) or ".", exist_ok=True)
+        conn = self._conexion()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(ESQUEMA_REPLICA)
+
+    def _conexion(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # isolation_level=None: las transacciones de la sincronización se abren explícitamente
+            conn = sqlite3.connect(self.ruta, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.create_function("sigme_documento", 6, documento_seccion, deterministic=True)
+            self._local.conn = conn
+            with self._candado_conexiones:
+                self._conexiones.append(conn)
+        return conn
+
+    def cerrar(self):
+        with self._candado_conexiones:
+            conexiones, self._conexiones = self._conexiones, []
+        for conn in conexiones:
+            conn.close()
+
+    def _meta(self):
+        return dict(self._conexion().execute("SELECT clave, valor FROM meta"))
+
+    @property
+    def lista(self):
+        """True si la réplica tiene datos de esta base de datos (aunque estén algo atrasados)."""
+        meta = self._meta()
+        return meta.get("base_datos") == base_datos_actual() and meta.get("version") == str(VERSION_REPLICA)
+
+    # --- Sincronización ---
+
+    def sincronizar(self):
+        """
+        Trae los cambios del servidor desde la última sincronización y retorna
+        {"completa": bool, "filas": filas actualizadas o eliminadas}.
+
+        La réplica se recarga completa si está vacía, es de otra base de datos, lleva más de
+        DIAS_RESINCRONIZAR sin sincronizar o el servidor no tiene el registro de cambios.
+        """
+        with self._candado_sincronizacion:
+            conn = self.pool.obtener()
+            local = self._conexion()
+            try:
+                cursor = conn.cursor()
+                # Una sola instantánea para la marca y las filas leídas
+                cursor.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ")
+                cursor.execute("SELECT txid_snapshot_xmin(txid_current_snapshot()), now()")
+                marca, ahora = cursor.fetchone()
+                meta = self._meta()
+                completa = (not self.lista or "marca" not in meta or "cambios" not in ESQUEMA_DISPONIBLE
+                            or ahora.timestamp() - float(meta.get("sincronizada", 0)) > DIAS_RESINCRONIZAR * 86400)
+
+                local.execute("BEGIN IMMEDIATE")
+                try:
+                    if completa:
+                        filas = self._cargar_todo(conn, local)
+                    else:
+                        filas = self._aplicar_cambios(cursor, local, int(meta["marca"]))
+                    local.executemany("INSERT OR REPLACE INTO meta (clave, valor) VALUES (?, ?)", [
+                        ("base_datos", base_datos_actual()), ("version", str(VERSION_REPLICA)),
+                        # Las transacciones desde la marca pudieron no estar confirmadas: se releen la próxima vez
+                        ("marca", str(marca)), ("sincronizada", str(ahora.timestamp())),
+                    ])
+                    local.execute("COMMIT")
+                except BaseException:
+                    local.execute("ROLLBACK")
+                    raise
+                conn.commit()
+                self._depurar_cambios(conn)
+                return {"completa": completa, "filas": filas}
+            except psycopg2.Error as e:
+                conn.rollback()
+                logger.error(f"Error de PostgreSQL al sincronizar la réplica local: {e}", exc_info=True)
+                raise Exception(f"Error en la base de datos al sincronizar la réplica local: {e.pgerror or e}")
+            finally:
+                self.pool.devolver(conn)
+
+    def _cargar_todo(self, conn, local):
+        filas = 0
+        for tabla in TABLAS_REPLICA:
+            local.execute(f"DELETE FROM {tabla}")
+            filas += self._copiar_tabla(conn, local, tabla)
+        local.execute("UPDATE seccion SET busqueda = NULL")
+        self._completar_busqueda(local)
+        return filas
+
+    def _copiar_tabla(self, conn, local, tabla, claves=None):
+        """Copia las filas de la tabla (o solo las de esas claves) del servidor a la réplica."""
+        clave, columnas = TABLAS_REPLICA[tabla]
+        # Cursor del servidor con nombre: la carga completa no necesita toda la tabla en memoria
+        cursor = conn.cursor(name=f"sigme_replica_{tabla}")
+        cursor.itersize = TAMANO_LOTE_CARGA
+        if claves is None:
+            cursor.execute(f"SELECT {', '.join(columnas)} FROM {tabla}")
+        else:
+            cursor.execute(f"SELECT {', '.join(columnas)} FROM {tabla} WHERE {clave} = ANY(%s)", (list(claves),))
+        filas = 0
+        while True:
+            lote = cursor.fetchmany(TAMANO_LOTE_CARGA)
+            if not lote:
+                break
+            self._guardar_filas(local, tabla, lote)
+            filas += len(lote)
+        cursor.close()
+        return filas
+
+    def _guardar_filas(self, local, tabla, filas):
+        clave, columnas = TABLAS_REPLICA[tabla]
+        if tabla == "personal":
+            columnas = columnas + ("nombre_normalizado", "apellidos_normalizado")
+            filas = [fila + (normalizar_busqueda(f"{fila[1]} {fila[2]}"), normalizar_busqueda(fila[2] or ""))
+                     for fila in filas]
+        elif tabla == "seccion":
+            columnas = columnas + ("busqueda",)
+            filas = [fila + (None,) for fila in filas] # Se completa con _completar_busqueda()
+        actualizar = ", ".join(f"{columna} = excluded.{columna}" for columna in columnas if columna != clave)
+        local.executemany(f"""
+            INSERT INTO {tabla} ({', '.join(columnas)}) VALUES ({', '.join('?' * len(columnas))})
+            ON CONFLICT ({clave}) DO UPDATE SET {actualizar}
+        """, filas)
+
+    def _aplicar_cambios(self, cursor, local, marca):
+        cursor.execute("SELECT DISTINCT tabla, clave FROM sigme_cambios WHERE transaccion >= %s", (marca,))
+        claves_por_tabla = defaultdict(set)
+        for tabla, clave in cursor.fetchall():
+            claves_por_tabla[tabla].add(clave)
+        if not claves_por_tabla:
+            return 0
+        filas = 0
+        for tabla, claves in claves_por_tabla.items():
+            if tabla not in TABLAS_REPLICA:
+                continue
+            if "*" in claves: # TRUNCATE: recargar la tabla entera
+                local.execute(f"DELETE FROM {tabla}")
+                filas += self._copiar_tabla(cursor.connection, local, tabla)
+                continue
+            clave, _ = TABLAS_REPLICA[tabla]
+            # Las claves que ya no existen en el servidor fueron eliminadas
+            local.execute(f"DELETE FROM {tabla} WHERE {clave} IN (SELECT value FROM json_each(?))",
+                          (json.dumps(sorted(claves)),))
+            filas += max(self._copiar_tabla(cursor.connection, local, tabla, claves), len(claves))
+        if claves_por_tabla.get("personal"):
+            # El documento de búsqueda incluye el nombre del docente guía
+            local.execute("UPDATE seccion SET busqueda = NULL WHERE cedula_docente_guia IN (SELECT value FROM json_each(?))",
+                          (json.dumps(sorted(claves_por_tabla["personal"])),))
+        self._completar_busqueda(local)
+        return filas
+
+    def _completar_busqueda(self, local):
+        local.execute("""
+            UPDATE seccion SET busqueda = sigme_documento(
+                codigo, codigo_grado, letra, aula_asignada,
+                (SELECT nombres FROM personal WHERE cedula = seccion.cedula_docente_guia),
+                (SELECT apellidos FROM personal WHERE cedula = seccion.cedula_docente_guia)
+            )
+            WHERE busqueda IS NULL
+        """)
+
+    def _depurar_cambios(self, conn):
+        """Borra del servidor los cambios más antiguos que RETENCION_CAMBIOS, a lo sumo una vez por hora."""
+        if "cambios" not in ESQUEMA_DISPONIBLE or time.monotonic() - self._ultima_depuracion < INTERVALO_DEPURACION:
+            return
+        self._ultima_depuracion = time.monotonic()
+        try:
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM sigme_cambios WHERE registrado < now() - %s::interval", (RETENCION_CAMBIOS,))
+            conn.commit()
+        except psycopg2.Error as e:
+            conn.rollback()
+            logger.warning(f"No se pudo depurar el registro de cambios: {e}")
+
+    # --- Consultas ---
+
+    def ano_escolar_activo(self):
+        fila = self._conexion().execute("SELECT codigo FROM ano_escolar WHERE activo LIMIT 1").fetchone()
+        return fila[0] if fila else None
+
+    def buscar_docentes(self, texto, limite=20):
+        """Docentes cuya cédula, nombre completo o apellidos comienzan con el texto, como buscar_docentes()."""
+        prefijo = normalizar_busqueda(texto)
+        # Rango [prefijo, prefijo + U+10FFFF): usa los índices, a diferencia de LIKE
+        return self._conexion().execute("""
+            SELECT cedula, nombres, apellidos FROM personal
+            WHERE cedula >= :texto AND cedula < :texto || char(1114111)
+               OR nombre_normalizado >= :prefijo AND nombre_normalizado < :prefijo || char(1114111)
+               OR apellidos_normalizado >= :prefijo AND apellidos_normalizado < :prefijo || char(1114111)
+            ORDER BY nombres, apellidos, cedula
+            LIMIT :limite
+        """, {"texto": texto, "prefijo": prefijo, "limite": limite}).fetchall()
+
+    def cargar_seccion(self, codigo_seccion):
+        """Retorna (grado, letra, turno, cedula, aula, capacidad, nombres, apellidos) o None."""
+        return self._conexion().execute("""
+            SELECT s.codigo_grado, s.letra, s.turno, s.cedula_docente_guia, s.aula_asignada, s.capacidad_maxima,
+                   p.nombres, p.apellidos
+            FROM seccion s LEFT JOIN personal p ON p.cedula = s.cedula_docente_guia
+            WHERE s.codigo = ?
+        """, (codigo_seccion,)).fetchone()
+
+    def resumen_secciones(self, ano_escolar):
+        return self._conexion().execute("""
+            SELECT codigo_grado, turno, COUNT(*), COALESCE(SUM(capacidad_maxima), 0),
+                   COALESCE(SUM(total_estudiantes), 0), COUNT(aula_asignada)
+            FROM seccion WHERE codigo_ano_escolar = ?
+            GROUP BY codigo_grado, turno ORDER BY codigo_grado, turno
+        """, (ano_escolar,)).fetchall()
+
+    def consultar_pagina(self, search_term, ano_escolar, direccion, clave, limit, total_records):
+        """
+        Versión local de consultar_pagina_secciones(): mismos parámetros y mismo resultado.
+
+        Cada palabra del término debe aparecer en el documento de búsqueda normalizado; los
+        resultados se ordenan por la clave de la tabla (sin relevancia).
+        """
+        conn = self._conexion()
+        condiciones, params = [], []
+        for palabra in normalizar_busqueda(search_term or "").split():
+            condiciones.append("s.busqueda LIKE ? ESCAPE '\\'")
+            params.append(f"%{escapar_like(palabra)}%")
+        if ano_escolar is not None:
+            condiciones.append("s.codigo_ano_escolar = ?")
+            params.append(ano_escolar)
+        if clave is not None and len(clave) != len(COLUMNAS_ORDEN_REPLICA):
+            # Clave de una página leída del servidor (ordenada por relevancia): empezar desde el principio
+            clave, direccion = None, "primera"
+
+        if total_records is None:
+            where_clause = f"WHERE {' AND '.join(condiciones)}" if condiciones else ""
+            total_records = conn.execute(f"""
+                SELECT COUNT(*) FROM seccion s LEFT JOIN personal p ON s.cedula_docente_guia = p.cedula {where_clause}
+            """, params).fetchone()[0]
+        if direccion == "ultima":
+            limit = total_records % limit or limit
+
+        columnas_orden = ", ".join(COLUMNAS_ORDEN_REPLICA)
+        descendente = direccion in ("anterior", "ultima")
+        condiciones_pagina, params_pagina = list(condiciones), list(params)
+        if clave is not None and direccion in ("anterior", "siguiente", "actual"):
+            operador = {"anterior": "<", "siguiente": ">", "actual": ">="}[direccion]
+            condiciones_pagina.append(f"({columnas_orden}) {operador} ({', '.join('?' * len(clave))})")
+            params_pagina.extend(clave)
+        where_clause = f"WHERE {' AND '.join(condiciones_pagina)}" if condiciones_pagina else ""
+        order_by = ", ".join(f"{columna} DESC" for columna in COLUMNAS_ORDEN_REPLICA) if descendente else columnas_orden
+        filas = conn.execute(f"""
+            SELECT {COLUMNAS_TABLA_REPLICA}, {columnas_orden}
+            FROM seccion s LEFT JOIN personal p ON s.cedula_docente_guia = p.cedula
+            {where_clause}
+            ORDER BY {order_by}
+            LIMIT ?
+        """, params_pagina + [limit]).fetchall()
+        if descendente:
+            filas.reverse()
+        if direccion == "anterior" and len(filas) < limit:
+            return self.consultar_pagina(search_term, ano_escolar, "primera", None, limit, total_records)
+
+        num_claves = len(COLUMNAS_ORDEN_REPLICA)
+        return {
+            "secciones": [fila[:-num_claves] for fila in filas],
+            "total_records": total_records,
+            "search_term": search_term,
+            "ano_escolar": ano_escolar,
+            "direccion": direccion,
+            "primera_clave": tuple(filas[0][-num_claves:]) if filas else None,
+            "ultima_clave": tuple(filas[-1][-num_claves:]) if filas else None,
+        }
+
+class ServicioConReplica:
+    """
+    ServicioSecciones que lee de una ReplicaLocal.
+
+    La tabla, la búsqueda, el selector de docentes, la carga de una sección y el resumen se
+    consultan en la réplica (en el servidor mientras la réplica no tenga datos). Las escrituras
+    van al servidor y, si tienen éxito, se sincroniza la réplica antes de retornar. El resto
+    de los métodos son los del servicio del servidor.
+    """
+    def __init__(self, servicio, replica):
+        self.servicio = servicio
+        self.replica = replica
+
+    def __getattr__(self, nombre):
+        return getattr(self.servicio, nombre)
+
+    def _escribir(self, metodo, *args, **kwargs):
+        resultado = metodo(*args, **kwargs)
+        try:
+            self.replica.sincronizar()
+        except Exception as e:
+            logger.warning(f"La réplica local se actualizará en la próxima sincronización: {e}")
+        return resultado
+
+    def ano_escolar_activo(self):
+        if not self.replica.lista:
+            return self.servicio.ano_escolar_activo()
+        return self.replica.ano_escolar_activo()
+
+    def buscar_docentes(self, texto, limite=20):
+        if not self.replica.lista:
+            return self.servicio.buscar_docentes(texto, limite)
+        return self.replica.buscar_docentes(texto, limite)
+
+    def cargar_pagina(self, search_term, direccion, clave, limit, total_records, progreso=None, token=None):
+        if not self.replica.lista:
+            return self.servicio.cargar_pagina(search_term, direccion, clave, limit, total_records, progreso, token)
+        return self.replica.consultar_pagina(search_term, self.replica.ano_escolar_activo(), direccion, clave,
+                                             limit, total_records)
+
+    def cargar_seccion(self, codigo_seccion, progreso=None):
+        if not self.replica.lista:
+            return self.servicio.cargar_seccion(codigo_seccion, progreso)
+        seccion_data = self.replica.cargar_seccion(codigo_seccion)
+        if not seccion_data:
+            raise ValueError(f"No se encontró la sección con código {codigo_seccion}.")
+        return seccion_data
+
+    def resumen_secciones(self):
+        if not self.replica.lista:
+            return self.servicio.resumen_secciones()
+        ano_escolar = self.replica.ano_escolar_activo()
+        return ano_escolar, self.replica.resumen_secciones(ano_escolar) if ano_escolar is not None else []
+
+    def asignar_seccion(self, *args, **kwargs):
+        return self._escribir(self.servicio.asignar_seccion, *args, **kwargs)
+
+    def actualizar_seccion(self, *args, **kwargs):
+        return self._escribir(self.servicio.actualizar_seccion, *args, **kwargs)
+
+    def eliminar_secciones(self, *args, **kwargs):
+        return self._escribir(self.servicio.eliminar_secciones, *args, **kwargs)
+
+    def importar_csv(self, *args, **kwargs):
+        return self._escribir(self.servicio.importar_csv, *args, **kwargs)
+
+    def importar_filas(self, *args, **kwargs):
+        return self._escribir(self.servicio.importar_filas, *args, **kwargs)
+
+    def generar_grilla(self, *args, **kwargs):
+        return self._escribir(self.servicio.generar_grilla, *args, **kwargs)
+
+    def sincronizar(self):
+        return self.replica.sincronizar()
@@ -0,0 +1,206 @@
+"""
+Pruebas de índices: fallan si alguna consulta frecuente deja de usar un índice.
+
+Las sentencias que envía el cliente (constantes SQL_* y generadores pasos_* de sigme_datos) se
+verifican con EXPLAIN; las que ejecutan por dentro las rutinas, los disparadores y las claves
+foráneas del servidor no se pueden explicar desde el cliente, así que se ejecutan de verdad en
+una transacción que se revierte y se cuentan sus recorridos secuenciales en
+pg_stat_xact_user_tables. Se usan las opciones normales del planificador, por lo que solo se
+verifican las tablas con al menos FILAS_MINIMAS filas: en una tabla más pequeña el recorrido
+secuencial es el plan correcto.
+
+Usan la base sintética de benchmarks/generador.py (escala de SIGME_PLANES_ESCALA, 100000 por
+defecto) o la indicada en SIGME_PLANES_BASE_DATOS (p. ej. una copia de producción), y se omiten
+si no hay un servidor disponible.
+
+    python -m unittest discover -s tests
+    SIGME_PLANES_BASE_DATOS=copia_produccion python -m unittest discover -s tests
+"""
+import os
+import sys
+import unittest
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+sys.path.insert(0, os.path.join(RAIZ, "benchmarks"))
+
+import psycopg2
+
+import sigme_datos
+from sigme_datos import (DB_PARAMS, LETRAS_SECCION, OBJETOS_ESQUEMA, SQL_ACTUALIZAR_SECCION, SQL_ASIGNAR_SECCION,
+                         SQL_CARGAR_SECCION, SQL_CODIGOS_OCUPADOS, SQL_CONSULTAR_SECCIONES, SQL_DOCENTES_REGISTRADOS,
+                         SQL_ESTADO_SECCIONES, TURNOS_SECCION, PoolConexiones, ServicioSecciones, asegurar_esquema,
+                         consultar_estado_secciones, eliminar_secciones, pasos_buscar_docentes, pasos_pagina_secciones,
+                         pasos_resumen_secciones)
+from generador import preparar_base_datos
+
+TABLAS_VERIFICADAS = ["seccion", "personal", "estudiante"]
+FILAS_MINIMAS = 1000
+# Entradas de OBJETOS_ESQUEMA que necesitan extensiones del servidor; docentes usa sigme_normalizar,
+# que crea la entrada busqueda
+EXTENSIONES_REQUERIDAS = {"busqueda": ("unaccent", "pg_trgm"), "docentes": ("unaccent", "pg_trgm")}
+
+def nodos(plan):
+    yield plan
+    for hijo in plan.get("Plans", []):
+        yield from nodos(hijo)
+
+class PlanesConsultasFrecuentes(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        try:
+            dbname = os.environ.get("SIGME_PLANES_BASE_DATOS") or preparar_base_datos(
+                int(os.environ.get("SIGME_PLANES_ESCALA", "100000")))
+        except psycopg2.OperationalError as e:
+            raise unittest.SkipTest(f"No hay un servidor PostgreSQL disponible: {e}")
+        DB_PARAMS.update(dbname=dbname)
+        cls.pool = PoolConexiones(1, intervalo_verificacion=float("inf"), inicializar_conexion=asegurar_esquema)
+        cls.servicio = ServicioSecciones(cls.pool)
+
+        cls.ano = cls.servicio.ano_escolar_activo()
+        if cls.ano is None:
+            raise RuntimeError(f"La base de datos {dbname} no tiene un año escolar activo.")
+        cls.primera = cls.servicio.cargar_pagina("", "primera", None, 50, None)
+        conn = cls.pool.obtener()
+        try:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT relname FROM pg_class
+                WHERE relname = ANY(%s) AND relkind = 'r' AND reltuples >= %s
+            """, (TABLAS_VERIFICADAS, FILAS_MINIMAS))
+            cls.tablas_grandes = sorted(relname for relname, in cursor)
+            cursor.execute("SELECT name FROM pg_available_extensions")
+            cls.extensiones_disponibles = {name for name, in cursor}
+            cursor.execute("""
+                SELECT codigo, codigo_grado, turno, cedula_docente_guia, aula_asignada, capacidad_maxima
+                FROM SECCION WHERE codigo_ano_escolar = %s AND cedula_docente_guia IS NOT NULL
+                ORDER BY codigo LIMIT 1
+            """, (cls.ano,))
+            cls.seccion = cursor.fetchone()
+            cursor.execute("""
+                SELECT p.cedula FROM PERSONAL p
+                WHERE NOT EXISTS (SELECT 1 FROM SECCION s WHERE s.cedula_docente_guia = p.cedula AND s.codigo_ano_escolar = %s)
+                ORDER BY p.cedula LIMIT 1
+            """, (cls.ano,))
+            cls.docente_libre = cursor.fetchone()[0]
+            secciones_existentes, _, _ = consultar_estado_secciones(cursor, cls.ano)
+            cls.combinacion_libre = next(
+                ((grado, letra, turno) for grado in range(1, 7) for letra in LETRAS_SECCION for turno in TURNOS_SECCION
+                 if (grado, letra, turno) not in secciones_existentes), None)
+            cls.con_estudiantes = []
+            if cls._existe_tabla(cursor, "estudiante"):
+                cursor.execute("SELECT codigo_seccion FROM ESTUDIANTE WHERE codigo_seccion IS NOT NULL LIMIT 1")
+                cls.con_estudiantes = [codigo for codigo, in cursor]
+            conn.commit()
+        finally:
+            cls.pool.devolver(conn)
+        if cls.seccion is None:
+            raise RuntimeError(f"El año escolar {cls.ano} no tiene secciones con docente guía.")
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.pool.cerrar()
+
+    @staticmethod
+    def _existe_tabla(cursor, tabla):
+        cursor.execute("SELECT to_regclass(%s) IS NOT NULL", (tabla,))
+        return cursor.fetchone()[0]
+
+    def requerir_entrada(self, clave, mensaje):
+        """La entrada debe estar instalada; si no lo está porque el servidor no tiene sus extensiones, se omite la prueba."""
+        faltantes = [extension for extension in EXTENSIONES_REQUERIDAS[clave] if extension not in self.extensiones_disponibles]
+        if clave not in sigme_datos.ESQUEMA_DISPONIBLE and faltantes:
+            self.skipTest(f"El servidor no tiene las extensiones {', '.join(faltantes)} que requiere la entrada {clave}")
+        self.assertIn(clave, sigme_datos.ESQUEMA_DISPONIBLE, mensaje)
+
+    def verificar_plan(self, sql, params):
+        """Falla si el plan de la sentencia recorre secuencialmente alguna de las tablas grandes."""
+        conn = self.pool.obtener()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+            (plan,) = cursor.fetchone()[0]
+        finally:
+            conn.rollback()
+            self.pool.devolver(conn)
+        recorridas = sorted({nodo["Relation Name"].lower() for nodo in nodos(plan["Plan"])
+                             if nodo["Node Type"] == "Seq Scan" and nodo["Relation Name"].lower() in self.tablas_grandes})
+        self.assertEqual(recorridas, [], f"Recorrido secuencial en el plan de:\n{sql}")
+
+    def verificar_ejecucion(self, ejecutar):
+        """
+        Ejecuta ejecutar(cursor) en una transacción que se revierte y falla si alguna sentencia
+        (incluidas las de rutinas, disparadores y claves foráneas) recorrió secuencialmente una tabla grande.
+        """
+        conn = self.pool.obtener()
+        try:
+            cursor = conn.cursor()
+            consulta = "SELECT relname, seq_scan FROM pg_stat_xact_user_tables WHERE relname = ANY(%s)"
+            cursor.execute(consulta, (self.tablas_grandes,))
+            antes = dict(cursor.fetchall())
+            ejecutar(cursor)
+            cursor.execute(consulta, (self.tablas_grandes,))
+            despues = dict(cursor.fetchall())
+        finally:
+            conn.rollback()
+            self.pool.devolver(conn)
+        recorridas = [tabla for tabla in self.tablas_grandes if despues.get(tabla, 0) > antes.get(tabla, 0)]
+        self.assertEqual(recorridas, [], "Recorrido secuencial al ejecutar la operación")
+
+    def test_esquema_instalado(self):
+        # Las entradas que dependen de extensiones se verifican en test_buscar y test_buscar_docentes
+        faltantes = [clave for clave, *_ in OBJETOS_ESQUEMA
+                     if clave not in EXTENSIONES_REQUERIDAS and clave not in sigme_datos.ESQUEMA_DISPONIBLE]
+        self.assertEqual(faltantes, [], "Entradas de OBJETOS_ESQUEMA sin instalar (ver `python sigme_cli.py esquema --instalar`)")
+
+    def test_paginas(self):
+        total = self.primera["total_records"]
+        for direccion, clave in (("primera", None), ("siguiente", self.primera["ultima_clave"]),
+                                 ("anterior", self.primera["ultima_clave"]), ("ultima", None)):
+            with self.subTest(direccion=direccion):
+                self.verificar_plan(*next(pasos_pagina_secciones("", self.ano, direccion, clave, 50, total)))
+
+    def test_buscar(self):
+        self.requerir_entrada("busqueda", "Sin la búsqueda indexada se usa ILIKE")
+        self.verificar_plan(*next(pasos_pagina_secciones(self.seccion[0][:2], self.ano, "primera", None, 50, None)))
+
+    def test_buscar_docentes(self):
+        self.requerir_entrada("docentes", "Sin la búsqueda de docentes se usa ILIKE")
+        self.verificar_plan(*next(pasos_buscar_docentes(self.seccion[3][:4])))
+
+    def test_resumen(self):
+        self.verificar_plan(*next(pasos_resumen_secciones(self.ano)))
+
+    def test_consultas_de_secciones(self):
+        codigo = self.seccion[0]
+        for sql, params in ((SQL_CARGAR_SECCION, (codigo,)),
+                            (SQL_CONSULTAR_SECCIONES, ([codigo], self.ano)),
+                            (SQL_ESTADO_SECCIONES, (self.ano,)),
+                            (SQL_CODIGOS_OCUPADOS, ([codigo],)),
+                            (SQL_DOCENTES_REGISTRADOS, ([self.seccion[3]],))):
+            with self.subTest(sql=sql.split("FROM")[1].split()[0]):
+                self.verificar_plan(sql, params)
+
+    def test_asignar_seccion(self):
+        self.assertIsNotNone(self.combinacion_libre, f"El año escolar {self.ano} no tiene combinaciones libres")
+        grado, letra, turno = self.combinacion_libre
+        for aula in (None, str(grado * 100 + 99)):
+            with self.subTest(aula=aula):
+                self.verificar_ejecucion(lambda cursor: cursor.execute(
+                    SQL_ASIGNAR_SECCION, (self.ano, grado, letra, turno, self.docente_libre, aula, 30)))
+
+    def test_actualizar_seccion(self):
+        codigo, grado, turno, docente, aula, capacidad = self.seccion
+        self.verificar_ejecucion(lambda cursor: cursor.execute(
+            SQL_ACTUALIZAR_SECCION, (self.ano, codigo, grado, turno, docente, aula, capacidad)))
+
+    def test_eliminar_secciones(self):
+        self.verificar_ejecucion(lambda cursor: eliminar_secciones(cursor, self.con_estudiantes + [self.seccion[0]]))
+
+    def test_renombrar_docente(self):
+        # Dispara la actualización del documento de búsqueda de sus secciones (trg_personal_busqueda)
+        self.verificar_ejecucion(lambda cursor: cursor.execute(
+            "UPDATE PERSONAL SET nombres = nombres WHERE cedula = %s", (self.seccion[3],)))
+
+if __name__ == "__main__":
+    unittest.main()